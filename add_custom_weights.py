@@ -1,5 +1,6 @@
 from app import db, create_app
 from app.models import Food, FoodMeasure
+from app.services.food_cache import bump_food_version
 
 app = create_app()
 
@@ -116,6 +117,8 @@ def add_custom_measures():
                 print(f"✗ NOT FOUND: {food_name}")
                 print()
         
+        if measures_added or measures_updated:
+            bump_food_version()
         db.session.commit()
         
         # Summary
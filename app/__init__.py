@@ -21,6 +21,14 @@ def create_app():
     login_manager.login_view = "auth.login_member"
     login_manager.login_message_category = "warning"
 
+    from app.services.query_stats import init_query_stats
+
+    init_query_stats(app)
+
+    from app.services.food_autocomplete import init_food_autocomplete
+
+    init_food_autocomplete(app)
+
     from app.models import User
 
     @login_manager.user_loader
@@ -88,6 +88,10 @@ def load_user(user_id):
     return User.query.get(int(user_id))
             
 class Food(db.Model):
+    __table_args__ = (
+        db.Index('ix_food_source_id', 'source_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     calories = db.Column(db.Float)
@@ -127,8 +131,14 @@ UNIT_TO_GRAMS = {
 }
 
 class UserFoodLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_user_food_log_user_id_log_date', 'user_id', 'log_date'),
+        db.UniqueConstraint('user_id', 'client_id', name='uq_user_food_log_user_client'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    client_id = db.Column(db.String(64))  # id given by an offline client, so replayed uploads are skipped
     food_id = db.Column(db.Integer, db.ForeignKey("food.id"), nullable=False)
     quantity = db.Column(db.Float, nullable=False)
     unit = db.Column(db.String(20), default="g")  # <--- add this column
@@ -139,27 +149,16 @@ class UserFoodLog(db.Model):
 
     def quantity_in_grams(self):
         """Convert the logged quantity to grams based on the unit."""
-        quantity = self.quantity or 0
-        unit = (self.unit or "g").lower()
-
-        if unit == "g":
-            return quantity
-        
-        measure = FoodMeasure.query.filter_by(food_id=self.food_id, measure_name=unit).first()
-        if measure:
-            return quantity * measure.grams
-        
-        grams_per_unit = UNIT_TO_GRAMS.get(unit)
-        if grams_per_unit:
-            return quantity * grams_per_unit
-        
-        return quantity  # Fallback to original quantity if unit is unknown
+        from app.services.food_cache import grams_for
+        # Unknown units fall back to the original quantity
+        return grams_for(self.food_id, self.quantity or 0, self.unit)
     
     @property
     def scaled(self):
+        from app.services.food_cache import get_food_profile
         from app.services.nutrition import scale_food_nutrients
         quantity_in_grams = self.quantity_in_grams()
-        scaled = scale_food_nutrients(self.food, quantity_in_grams)
+        scaled = scale_food_nutrients(get_food_profile(self.food_id), quantity_in_grams)
 
         return {
             "calories": round(scaled["calories"], 1),
@@ -169,6 +168,40 @@ class UserFoodLog(db.Model):
         }
 
 
+class UserFoodStats(db.Model):
+    """Per-member usage of each food, maintained alongside UserFoodLog writes."""
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'food_id', name='uq_user_food_stats_user_food'),
+        db.Index('ix_user_food_stats_user_id_last_logged_at', 'user_id', 'last_logged_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    food_id = db.Column(db.Integer, db.ForeignKey('food.id'), nullable=False)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    last_logged_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # What the member entered last time (e.g. 1 cup), not the stored grams.
+    last_quantity = db.Column(db.Float)
+    last_unit = db.Column(db.String(20))
+
+
+class DailyNutritionTotal(db.Model):
+    """Per-member, per-day macro rollup maintained alongside UserFoodLog writes."""
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uq_daily_nutrition_total_user_day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    calories = db.Column(db.Float, nullable=False, default=0.0)
+    protein = db.Column(db.Float, nullable=False, default=0.0)
+    carbs = db.Column(db.Float, nullable=False, default=0.0)
+    fats = db.Column(db.Float, nullable=False, default=0.0)
+    entry_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class TrainerMeal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -176,6 +209,12 @@ class TrainerMeal(db.Model):
     name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=True)
     meal_slot = db.Column(db.String(20), nullable=False, default='meal1')
+    # Macro totals across all ingredients, refreshed whenever the ingredients are saved.
+    # NULL means not computed yet (rows older than the column); readers fall back to the ingredients.
+    total_calories = db.Column(db.Float, nullable=True)
+    total_protein_g = db.Column(db.Float, nullable=True)
+    total_carbs_g = db.Column(db.Float, nullable=True)
+    total_fats_g = db.Column(db.Float, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -219,6 +258,11 @@ class MemberMeal(db.Model):
     name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=True)
     meal_slot = db.Column(db.String(20), nullable=False, default='meal1')
+    # Cached macro totals, same semantics as on TrainerMeal.
+    total_calories = db.Column(db.Float, nullable=True)
+    total_protein_g = db.Column(db.Float, nullable=True)
+    total_carbs_g = db.Column(db.Float, nullable=True)
+    total_fats_g = db.Column(db.Float, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -244,14 +288,22 @@ class MemberMealIngredient(db.Model):
 
     food = db.relationship('Food')
 class Progress(db.Model):
+    __table_args__ = (
+        db.Index('ix_progress_user_id_date', 'user_id', 'date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
     weight = db.Column(db.Float, nullable=True)
     notes = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class FoodMeasure(db.Model):
+    __table_args__ = (
+        db.Index('ix_food_measure_food_id_measure_name', 'food_id', 'measure_name'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     food_id = db.Column(db.Integer, db.ForeignKey('food.id'))
     measure_name = db.Column(db.String(50))  # "cup", "tbsp", "tsp", "slice"
@@ -311,6 +363,13 @@ class ExerciseCatalog(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class CatalogVersion(db.Model):
+    """Bumped by catalog imports so each process knows when to reload its in-memory copy."""
+    name = db.Column(db.String(50), primary_key=True)  # e.g. "exercise"
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 
 class AssignedTemplate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -325,13 +384,21 @@ class AssignedTemplate(db.Model):
 
 
 class WorkoutSession(db.Model):
+    __table_args__ = (
+        db.Index('ix_workout_session_user_id_started_at', 'user_id', 'started_at'),
+        db.Index('ix_workout_session_user_id_updated_at', 'user_id', 'updated_at'),
+        db.UniqueConstraint('user_id', 'client_id', name='uq_workout_session_user_client'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    client_id = db.Column(db.String(64))  # id given by an offline client, so replayed uploads are skipped
     template_id = db.Column(db.Integer, db.ForeignKey('exercise_template.id'))
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
     summary = db.Column(db.String(255), nullable=True)
     notes = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # sync cursor
 
     user = db.relationship('User', backref=db.backref('workout_sessions', lazy='dynamic'))
     template = db.relationship('ExerciseTemplate')
@@ -339,8 +406,15 @@ class WorkoutSession(db.Model):
 
 
 class WorkoutSet(db.Model):
+    __table_args__ = (
+        db.Index('ix_workout_set_session_id', 'session_id'),
+        db.UniqueConstraint('session_id', 'client_id', name='uq_workout_set_session_client'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('workout_session.id'), nullable=False)
+    # Id the browser gave the set while autosaving, so retried saves update instead of duplicating.
+    client_id = db.Column(db.String(64))
     template_exercise_id = db.Column(db.Integer, db.ForeignKey('template_exercise.id'))
     exercise_name = db.Column(db.String(200), nullable=False)
     set_number = db.Column(db.Integer, nullable=False, default=1)
@@ -350,7 +424,69 @@ class WorkoutSet(db.Model):
     template_exercise = db.relationship('TemplateExercise')
 
 
+class PersonalRecord(db.Model):
+    """A member's best lifts per exercise, maintained as workouts are saved."""
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'exercise_key', name='uq_personal_record_user_exercise'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    exercise_key = db.Column(db.String(200), nullable=False)  # normalised exercise name
+    exercise_name = db.Column(db.String(200), nullable=False)
+    best_weight = db.Column(db.Float)
+    best_weight_reps = db.Column(db.Integer)  # most reps done at best_weight
+    best_weight_at = db.Column(db.DateTime)
+    best_e1rm = db.Column(db.Float)  # estimated one-rep max (Epley)
+    best_e1rm_at = db.Column(db.DateTime)
+    best_volume = db.Column(db.Float)  # most weight x reps for the exercise in one session
+    best_volume_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class WorkoutSnapshot(db.Model):
+    """What a member did the last time they ran a template, stored when the session is saved."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    template_id = db.Column(db.Integer, db.ForeignKey('exercise_template.id'), primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('workout_session.id'), nullable=False)
+    performed_at = db.Column(db.DateTime, nullable=False)
+    # [{"templateExerciseId": int | None, "name": str, "sets": [{"reps": int, "weight": float}]}]
+    exercises = db.Column(db.JSON, nullable=False)
+
+
+class ExerciseSnapshot(db.Model):
+    """The last sets a member logged for an exercise, whichever template it was in."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    exercise_key = db.Column(db.String(200), primary_key=True)  # normalised exercise name
+    exercise_name = db.Column(db.String(200), nullable=False)
+    session_id = db.Column(db.Integer, db.ForeignKey('workout_session.id'), nullable=False)
+    template_name = db.Column(db.String(120))
+    performed_at = db.Column(db.DateTime, nullable=False)
+    sets = db.Column(db.JSON, nullable=False)  # [{"reps": int, "weight": float}]
+
+
+class WeeklyMuscleVolume(db.Model):
+    """Per-member, per-week training volume by muscle group, maintained as workouts are saved."""
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'week_start', 'muscle', name='uq_weekly_muscle_volume_user_week_muscle'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    week_start = db.Column(db.Date, nullable=False)  # Sunday, Eastern
+    muscle = db.Column(db.String(100), nullable=False)  # lower case, e.g. "chest"
+    # Secondary muscles are credited half a set, so these are fractional.
+    sets = db.Column(db.Float, nullable=False, default=0.0)
+    reps = db.Column(db.Float, nullable=False, default=0.0)
+    tonnage = db.Column(db.Float, nullable=False, default=0.0)  # weight x reps
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class Message(db.Model):
+    __table_args__ = (
+        db.Index('ix_message_client_id_read_at', 'client_id', 'read_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     client_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
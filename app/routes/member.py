@@ -5,36 +5,73 @@ from app.models import (
     Progress,
     Food,
     UserFoodLog,
-    FoodMeasure,
     WorkoutSession,
     WorkoutSet,
     TrainerMeal,
+    TrainerMealIngredient,
     MemberMeal,
     MemberMealIngredient,
     Message,
+    UNIT_TO_GRAMS,
 )
 from app.services.nutrition import (
     scale_food_nutrients,
     calculate_meal_macros,
     group_meals_by_slot,
     serialize_meal,
+    refresh_meal_macros,
     convert_to_grams,
     derive_macro_targets,
     MEAL_SLOT_LABELS,
 )
+from app.services.food_autocomplete import autocomplete_foods, refresh_food_autocomplete
+from app.services.food_cache import get_food_profile, get_food_profiles, grams_for
+from app.services.food_stats import discard_food_stats, quick_log_foods, record_food_stats
+from app.services.food_recommender import recommend_foods
+from app.services.muscle_volume import muscle_volume_history, muscle_volume_rows
+from app.services.personal_records import personal_records_for
+from app.services.food_search import find_foods
+from app.services.meal_logging import (
+    MealLogEntry,
+    copy_food_logs,
+    load_requested_meals,
+    log_meals,
+    parse_day_copy_request,
+    parse_meal_log_requests,
+    totals_for_days,
+)
+from app.services.nutrition_totals import (
+    daily_totals,
+    daily_totals_range,
+    discard_food_logs,
+    record_food_logs,
+)
+from app.services.offline_sync import (
+    apply_sync,
+    changed_food_days,
+    changed_sessions,
+    format_cursor,
+    is_replay_conflict,
+    parse_sync_request,
+)
+from app.services.summary_charts import invalidate_member_charts, member_summary_charts
+from app.services.calendar_summary import (
+    load_calendar_days,
+    month_bounds,
+    rounded_food_totals,
+)
+from app.services.local_time import EASTERN_TZ, eastern_date
 from sqlalchemy import or_, and_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 from flask_login import current_user, login_required, logout_user
 from datetime import datetime, date, timedelta, timezone
-from collections import Counter, defaultdict
+from collections import Counter
 from typing import Dict, Optional
 import math
 import calendar as _calendar
-import pandas as pd
-import plotly.graph_objs as go
-from zoneinfo import ZoneInfo
 
 member_bp = Blueprint('member', __name__, url_prefix='/member')
-EASTERN_TZ = ZoneInfo("America/New_York")
 
 
 def _now_eastern() -> datetime:
@@ -53,16 +90,6 @@ def _as_eastern(dt: Optional[datetime]) -> Optional[datetime]:
     return dt.astimezone(EASTERN_TZ)
 
 
-def _eastern_date(value: Optional[object]) -> Optional[date]:
-    """Normalize a stored date/datetime value into an Eastern-localized date."""
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        localized = _as_eastern(value)
-        return localized.date() if localized else None
-    return value
-
-
 def _week_start_sunday(value: date) -> date:
     """Return the Sunday (start of week) for a given date."""
     return value - timedelta(days=(value.weekday() + 1) % 7)
@@ -224,9 +251,9 @@ def dashboard():
         # If user just types a name and clicks Add → use top match
         # -----------------------------
         if not food_id and search_query:
-            top_result = Food.query.filter(Food.name.ilike(f"%{search_query}%")).first()
-            if top_result:
-                food_id = top_result.id
+            top_results = find_foods(search_query, limit=1)
+            if top_results:
+                food_id = top_results[0].id
 
         # -----------------------------
         # Add a food log
@@ -237,20 +264,13 @@ def dashboard():
                 if quantity <= 0:
                     raise ValueError
 
-                food = Food.query.get(int(food_id))
+                food = get_food_profile(food_id)
                 if not food:
                     flash("Selected food not found.", "danger")
                     return redirect(url_for("member.dashboard"))
 
-                # Check if this food has a specific measure (cup, tbsp, tsp, etc.)
-                measure = FoodMeasure.query.filter_by(food_id=food.id, measure_name=unit_input).first()
-
-                if measure:
-                    grams = quantity * measure.grams
-                elif unit_input in UNIT_TO_GRAMS:
-                    grams = quantity * UNIT_TO_GRAMS[unit_input]
-                else:
-                    grams = quantity  # assume grams by default
+                # Food-specific measure (cup, tbsp, tsp, etc.), then global units, else grams
+                grams = grams_for(food.id, quantity, unit_input)
 
                 log = UserFoodLog(
                     user_id=user.id,
@@ -260,6 +280,9 @@ def dashboard():
                     log_date=today
                 )
                 db.session.add(log)
+                db.session.flush()
+                record_food_logs([log])
+                record_food_stats(user.id, [(food.id, quantity, unit_input)])
                 db.session.commit()
 
                 flash(f"Added {quantity} {unit_input} of {food.name}!", "success")
@@ -273,7 +296,7 @@ def dashboard():
         # Search foods without adding
         # -----------------------------
         elif search_query:
-            search_results = Food.query.filter(Food.name.ilike(f"%{search_query}%")).limit(10).all()
+            search_results = find_foods(search_query, limit=10)
             if not search_results:
                 flash("No matching foods found.", "warning")
         else:
@@ -290,6 +313,7 @@ def dashboard():
     if user.trainer_id:
         trainer_meals = (
             TrainerMeal.query
+            .options(selectinload(TrainerMeal.ingredients).joinedload(TrainerMealIngredient.food))
             .filter(
                 or_(
                     TrainerMeal.member_id == user.id,
@@ -305,6 +329,7 @@ def dashboard():
     else:
         trainer_meals = (
             TrainerMeal.query
+            .options(selectinload(TrainerMeal.ingredients).joinedload(TrainerMealIngredient.food))
             .filter(TrainerMeal.member_id == user.id)
             .order_by(TrainerMeal.meal_slot.asc(), TrainerMeal.name.asc())
             .all()
@@ -312,11 +337,13 @@ def dashboard():
     meal_plan = group_meals_by_slot(trainer_meals) if trainer_meals else {slot: [] for slot in MEAL_SLOT_LABELS}
     member_meals = (
         MemberMeal.query
+        .options(selectinload(MemberMeal.ingredients).joinedload(MemberMealIngredient.food))
         .filter_by(user_id=user.id)
         .order_by(MemberMeal.meal_slot.asc(), MemberMeal.name.asc())
         .all()
     )
     member_meal_plan = group_meals_by_slot(member_meals) if member_meals else {slot: [] for slot in MEAL_SLOT_LABELS}
+    quick_log = quick_log_foods(user.id)
 
     # ----------
     # Calendar support (server-rendered, no JS required)
@@ -338,13 +365,6 @@ def dashboard():
     selected_food_fats = None
     selected_workouts = []
 
-    workout_sessions = (
-        WorkoutSession.query
-        .filter_by(user_id=user.id)
-        .order_by(WorkoutSession.started_at.desc())
-        .all()
-    )
-
     if view == 'calendar':
         # default to current month if not provided
         if not cal_year or not cal_month:
@@ -357,20 +377,13 @@ def dashboard():
         except Exception:
             selected_date = today
 
-        workout_map = {}
-        for sess in workout_sessions:
-            dt_value = getattr(sess, 'completed_at', None) or getattr(sess, 'started_at', None)
-            if not dt_value:
-                continue
-            try:
-                day = _eastern_date(dt_value)
-            except Exception:
-                day = None
-            if not day:
-                continue
-            workout_map.setdefault(day, []).append(sess)
+        # One bounded pass per table for the whole month instead of per-cell scans
+        month_start, month_end = month_bounds(cal_year, cal_month)
+        day_buckets = load_calendar_days(user.id, month_start, month_end)
+        if not (month_start <= selected_date <= month_end):
+            day_buckets.update(load_calendar_days(user.id, selected_date, selected_date))
 
-        def _build_calendar_weeks(year, month, user_obj):
+        def _build_calendar_weeks(year, month):
             weeks = []
             cal = _calendar.Calendar(firstweekday=6)  # start on Sunday
             for week in cal.monthdatescalendar(year, month):
@@ -381,173 +394,55 @@ def dashboard():
                         week_list.append({'iso': '', 'day': '', 'in_month': False, 'data': None})
                         continue
 
-                    iso = d.strftime('%Y-%m-%d')
-
-                    # weight: pick most-recent Progress/WeightLog entry for that date
-                    weight_val = None
-                    try:
-                        # compute per-macro totals for selected day
-                        rows = Progress.query.filter_by(user_id=user_obj.id).all()
-                        day_rows = []
-                        for r in rows:
-                            dt = getattr(r, 'date', None) or getattr(r, 'log_date', None)
-                            compare_date = _eastern_date(dt)
-                            match = (compare_date == d)
-                            if match:
-                                day_rows.append(r)
-                        if day_rows:
-                            def _ord_key(x):
-                                return getattr(x, 'created_at', None) or getattr(x, 'id', 0)
-                            weight_entry = max(day_rows, key=_ord_key)
-                            weight_val = float(getattr(weight_entry, 'weight')) if getattr(weight_entry, 'weight', None) is not None else None
-                    except Exception:
-                        weight_val = None
-
-                    # food calories: sum UserFoodLog.quantity (grams) scaled by food.calories per serving
-                    food_calories = None
-                    try:
-                        # robust per-row date matching (support Date and DateTime columns)
-                        all_fls = UserFoodLog.query.filter_by(user_id=user_obj.id).all()
-                        fls = []
-                        for f in all_fls:
-                            dt = getattr(f, 'date', None) or getattr(f, 'log_date', None)
-                            compare_date = _eastern_date(dt)
-                            match = (compare_date == d)
-                            if match:
-                                fls.append(f)
-
-                        if fls:
-                            total_cals = 0.0
-                            total_protein = 0.0
-                            total_carbs = 0.0
-                            total_fats = 0.0
-                            for fl in fls:
-                                if getattr(fl, 'food', None):
-                                    grams_logged = fl.quantity_in_grams() if hasattr(fl, 'quantity_in_grams') else getattr(fl, 'quantity', 0)
-                                    scaled = scale_food_nutrients(fl.food, grams_logged)
-                                    total_cals += scaled["calories"]
-                                    total_protein += scaled["protein"]
-                                    total_carbs += scaled["carbs"]
-                                    total_fats += scaled["fats"]
-
-                            food_calories = round(total_cals, 1) if total_cals else None
-                            food_protein = round(total_protein, 1) if total_protein else None
-                            food_carbs = round(total_carbs, 1) if total_carbs else None
-                            food_fats = round(total_fats, 1) if total_fats else None
-                        else:
-                            food_calories = None
-                            food_protein = None
-                            food_carbs = None
-                            food_fats = None
-                    except Exception:
-                        food_calories = None
-                        items = []
+                    bucket = day_buckets.get(d)
+                    food_totals = rounded_food_totals(bucket)
+                    food_cell = None
+                    if food_totals and any(food_totals.values()):
+                        food_cell = {key: (value or None) for key, value in food_totals.items()}
 
                     workouts_for_day = []
-                    for sess in workout_map.get(d, []):
+                    for sess in (bucket["workouts"] if bucket else []):
                         workouts_for_day.append({
                             'id': sess.id,
-                            'template': sess.template.name if getattr(sess, 'template', None) else None,
+                            'template': sess.template.name if sess.template else None,
                             'duration': _format_duration_display(sess.started_at, sess.completed_at),
                         })
 
                     data = {
-                        'weight': weight_val,
-                        'food': {
-                            'calories': food_calories,
-                            'protein': food_protein if 'food_protein' in locals() else None,
-                            'carbs': food_carbs if 'food_carbs' in locals() else None,
-                            'fats': food_fats if 'food_fats' in locals() else None,
-                        } if (food_calories or (('food_protein' in locals() and food_protein) or ('food_carbs' in locals() and food_carbs) or ('food_fats' in locals() and food_fats))) else None,
+                        'weight': bucket["weight"] if bucket else None,
+                        'food': food_cell,
                         'workouts': workouts_for_day if workouts_for_day else None,
                     }
 
-                    week_list.append({'iso': iso, 'day': d.day, 'in_month': True, 'data': data})
+                    week_list.append({'iso': d.strftime('%Y-%m-%d'), 'day': d.day, 'in_month': True, 'data': data})
                 weeks.append(week_list)
             return weeks
 
-        calendar_weeks = _build_calendar_weeks(cal_year, cal_month, user)
-
-        # selected-day details: weight and totals for the selected_date
-        try:
-            # selected weight (robust match)
-            sel_weight = None
-            try:
-                rows = Progress.query.filter_by(user_id=user.id).all()
-                day_rows = []
-                for r in rows:
-                    dt = getattr(r, 'date', None) or getattr(r, 'log_date', None)
-                    compare_date = _eastern_date(dt)
-                    if compare_date == selected_date:
-                        day_rows.append(r)
-                if day_rows:
-                    def _ord_key(x):
-                        return getattr(x, 'created_at', None) or getattr(x, 'id', 0)
-                    weight_entry = max(day_rows, key=_ord_key)
-                    sel_weight = float(getattr(weight_entry, 'weight')) if getattr(weight_entry, 'weight', None) is not None else None
-            except Exception:
-                sel_weight = None
-            selected_weight = sel_weight
-
-            # selected food totals (robust per-row matching)
-            try:
-                all_fls = UserFoodLog.query.filter_by(user_id=user.id).all()
-                tot = 0.0
-                total_protein = 0.0
-                total_carbs = 0.0
-                total_fats = 0.0
-                matched_any = False
-                for fl in all_fls:
-                    dt = getattr(fl, 'date', None) or getattr(fl, 'log_date', None)
-                    compare_date = _eastern_date(dt)
-                    if compare_date != selected_date:
-                        continue
-                    if getattr(fl, 'food', None):
-                        grams_logged = fl.quantity_in_grams() if hasattr(fl, 'quantity_in_grams') else getattr(fl, 'quantity', 0)
-                        scaled = scale_food_nutrients(fl.food, grams_logged)
-                        tot += scaled["calories"]
-                        total_protein += scaled["protein"]
-                        total_carbs += scaled["carbs"]
-                        total_fats += scaled["fats"]
-                        matched_any = True
-                if matched_any:
-                    selected_food_calories = round(tot, 1)
-                    selected_food_protein = round(total_protein, 1)
-                    selected_food_carbs = round(total_carbs, 1)
-                    selected_food_fats = round(total_fats, 1)
-                else:
-                    selected_food_calories = None
-                    selected_food_protein = None
-                    selected_food_carbs = None
-                    selected_food_fats = None
-                selected_food_items = []
-            except Exception:
-                selected_food_calories = None
-                selected_food_items = []
-                selected_food_protein = None
-                selected_food_carbs = None
-                selected_food_fats = None
-
-            try:
-                selected_workouts = []
-                for sess in workout_map.get(selected_date, []):
-                    workout_sets = (
-                        WorkoutSet.query
-                        .filter_by(session_id=sess.id)
-                        .order_by(WorkoutSet.exercise_name.asc(), WorkoutSet.set_number.asc())
-                        .all()
-                    )
-                    selected_workouts.append({
-                        'session': sess,
-                        'template_name': sess.template.name if sess.template else 'Workout',
-                        'duration': _format_duration_display(sess.started_at, sess.completed_at),
-                        'sets': workout_sets,
-                    })
-            except Exception:
-                selected_workouts = []
-        except Exception:
-            selected_weight = None
-            selected_food_calories = None
+        calendar_weeks = _build_calendar_weeks(cal_year, cal_month)
+
+        # selected-day details: weight, macro totals and workouts for the selected_date
+        selected_bucket = day_buckets.get(selected_date)
+        selected_weight = selected_bucket["weight"] if selected_bucket else None
+        selected_totals = rounded_food_totals(selected_bucket)
+        if selected_totals:
+            selected_food_calories = selected_totals["calories"]
+            selected_food_protein = selected_totals["protein"]
+            selected_food_carbs = selected_totals["carbs"]
+            selected_food_fats = selected_totals["fats"]
+
+        for sess in (selected_bucket["workouts"] if selected_bucket else []):
+            workout_sets = (
+                WorkoutSet.query
+                .filter_by(session_id=sess.id)
+                .order_by(WorkoutSet.exercise_name.asc(), WorkoutSet.set_number.asc())
+                .all()
+            )
+            selected_workouts.append({
+                'session': sess,
+                'template_name': sess.template.name if sess.template else 'Workout',
+                'duration': _format_duration_display(sess.started_at, sess.completed_at),
+                'sets': workout_sets,
+            })
 
     latest_weight_lbs = _latest_weight_lbs(user)
     goal_weight_lbs = _kg_to_pounds(user.goal_weight_kg)
@@ -584,6 +479,7 @@ def dashboard():
         user_food_logs=user_food_logs,
         totals=totals,
         search_results=search_results,
+        quick_log_foods=quick_log,
         UNIT_TO_GRAMS=UNIT_TO_GRAMS,
         # calendar context (may be None when not requested)
         view=view,
@@ -593,10 +489,10 @@ def dashboard():
         selected_date=selected_date,
         selected_weight=selected_weight,
         selected_food_calories=selected_food_calories,
-        selected_food_protein=selected_food_protein if 'selected_food_protein' in locals() else None,
-        selected_food_carbs=selected_food_carbs if 'selected_food_carbs' in locals() else None,
-        selected_food_fats=selected_food_fats if 'selected_food_fats' in locals() else None,
-        selected_food_items=selected_food_items if 'selected_food_items' in locals() else [],
+        selected_food_protein=selected_food_protein,
+        selected_food_carbs=selected_food_carbs,
+        selected_food_fats=selected_food_fats,
+        selected_food_items=[],
         selected_workouts=selected_workouts,
         activity_levels=ACTIVITY_LEVELS,
         latest_weight_lbs=latest_weight_lbs,
@@ -616,33 +512,139 @@ def dashboard():
     )
 
 
-UNIT_TO_GRAMS = {
-    "g": 1,
-    "kg": 1000,
-    "oz": 28.35,
-    "lb": 453.592,
-    "tsp": 4.2,   # approximate
-    "tbsp": 14.3,
-    "cup": 240
-}
-def _calculate_daily_totals(user_id: int, target_date: date) -> dict:
-    logs = UserFoodLog.query.filter_by(user_id=user_id, log_date=target_date).all()
-    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
-
-    for log in logs:
-        scaled = scale_food_nutrients(log.food, log.quantity_in_grams())
-        totals["calories"] += scaled["calories"]
-        totals["protein"] += scaled["protein"]
-        totals["carbs"] += scaled["carbs"]
-        totals["fat"] += scaled["fats"]
-
-    totals = {key: round(value, 1) for key, value in totals.items()}
+def _format_daily_totals(rollup: dict) -> dict:
+    totals = {
+        "calories": round(rollup["calories"], 1),
+        "protein": round(rollup["protein"], 1),
+        "carbs": round(rollup["carbs"], 1),
+        "fat": round(rollup["fats"], 1),
+    }
     totals["macro_calories"] = round(
         totals["protein"] * 4 + totals["carbs"] * 4 + totals["fat"] * 9, 1
     )
     return totals
 
 
+def _calculate_daily_totals(user_id: int, target_date: date) -> dict:
+    return _format_daily_totals(daily_totals(user_id, target_date))
+
+
+def _days_totals_payload(user_id: int, days) -> dict:
+    """``{"YYYY-MM-DD": totals}`` for each day, in the get-totals format."""
+    payload = {}
+    for day, rollup in totals_for_days(user_id, days).items():
+        totals = _format_daily_totals(rollup)
+        totals["fats"] = totals["fat"]
+        payload[day.isoformat()] = totals
+    return payload
+
+
+def log_meal_batch(user_id: int, payload: dict, can_use_trainer_meal):
+    """Log a batch of (meal, day, servings) entries for ``user_id`` and return a JSON response.
+
+    ``can_use_trainer_meal(meal)`` decides which trainer meals the caller may
+    log; member meals must belong to ``user_id``. Either every entry is
+    logged or none is.
+    """
+    try:
+        requests = parse_meal_log_requests(payload.get("entries"))
+    except ValueError as exc:
+        return jsonify({"status": "error", "message": str(exc)}), 400
+
+    meals = load_requested_meals(requests)
+    entries = []
+    for req in requests:
+        meal = meals.get((req.owner, req.meal_id))
+        allowed = meal is not None and (
+            can_use_trainer_meal(meal) if req.owner == "trainer" else meal.user_id == user_id
+        )
+        if not allowed:
+            return jsonify({"status": "error", "message": f"Meal {req.meal_id} not found or unauthorized."}), 404
+        entries.append(MealLogEntry(meal, req.day, req.servings))
+
+    logged = log_meals(user_id, entries)
+    if not logged:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": "The selected meals have no ingredients to log."}), 400
+    db.session.commit()
+
+    days = _days_totals_payload(user_id, (entry.day for entry in entries))
+    return jsonify({"status": "success", "logged": logged, "days": days})
+
+
+@member_bp.route("/food-logs/copy", methods=["POST"])
+def copy_food_log_days():
+    """Copy a day (or range, or selected logs) of food logs onto other days.
+
+    An empty body repeats yesterday's logs today. Responds with the totals
+    of every day that received logs.
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"status": "error", "message": "Please log in first."}), 403
+
+    try:
+        copy_request = parse_day_copy_request(request.get_json(silent=True) or {}, _today_eastern())
+    except ValueError as exc:
+        return jsonify({"status": "error", "message": str(exc)}), 400
+
+    target_days = copy_food_logs(user_id, copy_request)
+    if not target_days:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": "There are no logged foods to copy."}), 404
+    db.session.commit()
+
+    return jsonify({"status": "success", "days": _days_totals_payload(user_id, target_days)})
+
+
+@member_bp.route("/sync", methods=["POST"])
+def sync():
+    """Upload workouts and food logs recorded offline, and download what changed since ``cursor``.
+
+    Uploads carry client ids, so a replayed upload stores nothing twice.
+    Everything in one upload is stored or nothing is. The response's
+    ``cursor`` goes in the next request to fetch only later changes.
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"status": "error", "message": "Please log in first."}), 403
+
+    try:
+        sync_request = parse_sync_request(request.get_json(silent=True) or {})
+    except ValueError as exc:
+        return jsonify({"status": "error", "message": str(exc)}), 400
+
+    try:
+        result = apply_sync(user_id, sync_request)
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        if not is_replay_conflict(exc):
+            raise
+        # The same upload arrived twice at once; the other copy was stored.
+        return jsonify({"status": "error", "message": "This upload is already being saved. Please retry."}), 409
+    if result.sessions:
+        invalidate_member_charts(user_id)
+
+    now = datetime.utcnow()
+    food_days = changed_food_days(user_id, sync_request.cursor, _today_eastern())
+    day_totals = _days_totals_payload(user_id, food_days)
+    return jsonify({
+        "status": "success",
+        "cursor": format_cursor(now),
+        "stored": {"sessions": result.sessions, "food_logs": result.food_logs},
+        "duplicates": result.duplicates,
+        "rejected": result.rejected,
+        "changes": {
+            "sessions": changed_sessions(user_id, sync_request.cursor, now),
+            "food_days": [
+                {"date": day.isoformat(), "logs": logs, "totals": day_totals[day.isoformat()]}
+                for day, logs in sorted(food_days.items())
+            ],
+        },
+    })
+
+
 @member_bp.route("/get-totals")
 def get_totals():
     user_id = session.get("user_id")
@@ -655,6 +657,49 @@ def get_totals():
     return jsonify(totals)
 
 
+@member_bp.route("/recommend-foods")
+def recommend_foods_for_remaining():
+    """Foods and portions that best fill what is left of today's macro targets.
+
+    Any of ``calories``/``protein``/``carbs``/``fats`` in the query string
+    overrides the computed remaining amount for that macro.
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"status": "error", "message": "Please log in first."}), 403
+
+    user = User.query.get(user_id)
+    targets = _user_macro_targets(user)
+    targets["calories"] = targets["calories"] or user.calorie_goal or 2000
+    totals = daily_totals(user_id, _today_eastern())
+    remaining = {
+        key: None if targets.get(key) is None else round(max(targets[key] - totals[key], 0.0), 1)
+        for key in ("calories", "protein", "carbs", "fats")
+    }
+    for key in remaining:
+        override = _safe_float(request.args.get(key))
+        if override is not None:
+            remaining[key] = max(override, 0.0)
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+
+    return jsonify({
+        "remaining": remaining,
+        "results": [
+            {
+                "id": rec.food_id,
+                "name": rec.name,
+                "grams": rec.grams,
+                "calories": rec.nutrients["calories"],
+                "protein": rec.nutrients["protein"],
+                "carbs": rec.nutrients["carbs"],
+                "fats": rec.nutrients["fats"],
+                "score": rec.score,
+            }
+            for rec in recommend_foods(remaining, limit=limit)
+        ],
+    })
+
+
 def _format_duration_display(started_at, completed_at):
     start_time = _as_eastern(started_at)
     if not start_time:
@@ -687,14 +732,9 @@ def scaled_macros(food: Food, quantity_in_grams: float):
     }
 
 def scale_nutrients(food_id, quantity, unit):
-    measure = FoodMeasure.query.filter_by(food_id=food_id, measure_name=unit).first()
-    if measure:
-        grams = quantity * measure.grams
-    else:
-        # fallback to 100g base if unit is unknown
-        grams = quantity
+    grams = grams_for(food_id, quantity, unit)
 
-    food = Food.query.get(food_id)
+    food = get_food_profile(food_id)
     scaled = scaled_macros(food, grams)  # assuming macros stored per 100g
 
     return {
@@ -719,21 +759,10 @@ def search_foods():
 
     results = []
     if query:
-        foods = (
-            Food.query
-            .filter(Food.name != None)
-            .filter(Food.name.ilike(f"%{query}%"))
-            .limit(10)
-            .all()
-        )
+        foods = find_foods(query, limit=10)
         for food in foods:
             # Scale nutrients using food-specific measure if exists
-            grams_per_unit = UNIT_TO_GRAMS.get(unit.lower(), 1)
-            measure = FoodMeasure.query.filter_by(food_id=food.id, measure_name=unit.lower()).first()
-            if measure:
-                grams_per_unit = measure.grams
-
-            quantity_in_grams = quantity * grams_per_unit
+            quantity_in_grams = grams_for(food.id, quantity, unit)
             scaled = scaled_macros(food, quantity_in_grams) 
 
             results.append({
@@ -750,6 +779,42 @@ def search_foods():
     return jsonify({"results": results})
 
 
+@member_bp.route("/food-autocomplete")
+def food_autocomplete():
+    """Typeahead suggestions from the in-memory name index, recent foods first.
+
+    Returns the same fields as ``search_foods`` plus ``recent``.
+    """
+    query = (request.args.get("q") or "").strip()
+    unit = request.args.get("unit", "g")
+    quantity = _safe_float(request.args.get("quantity")) or 1
+    limit = min(max(request.args.get("limit", 8, type=int), 1), 20)
+
+    user_id = session.get("user_id")
+    matches = autocomplete_foods(query, limit=limit, user_id=user_id, today=_today_eastern()) if query else []
+    profiles = get_food_profiles(match.food_id for match in matches)
+
+    results = []
+    for match in matches:
+        food = profiles.get(match.food_id)
+        if food is None:
+            continue
+        scaled = scaled_macros(food, grams_for(food.id, quantity, unit))
+        results.append({
+            "id": food.id,
+            "name": food.name,
+            "calories": scaled["calories"],
+            "protein_g": scaled["protein"],
+            "carbs": scaled["carbs"],
+            "fats": scaled["fats"],
+            "serving_size": food.serving_size,
+            "serving_unit": food.serving_unit,
+            "recent": match.recent,
+        })
+
+    return jsonify({"results": results})
+
+
 @member_bp.route("/add-meal/<int:meal_id>", methods=["POST"])
 def add_meal_to_log(meal_id: int):
     user_id = session.get("user_id")
@@ -770,6 +835,7 @@ def add_meal_to_log(meal_id: int):
             return jsonify({"status": "error", "message": "A trainer is required to use this meal."}), 403
 
     logs_payload = []
+    new_logs = []
 
     for ingredient in meal.ingredients:
         grams = float(ingredient.quantity_grams or 0.0)
@@ -785,6 +851,7 @@ def add_meal_to_log(meal_id: int):
         )
         db.session.add(log)
         db.session.flush()
+        new_logs.append(log)
 
         scaled = scale_food_nutrients(log.food, grams)
         logs_payload.append({
@@ -802,6 +869,8 @@ def add_meal_to_log(meal_id: int):
         db.session.rollback()
         return jsonify({"status": "error", "message": "Meal has no ingredients to log."}), 400
 
+    record_food_logs(new_logs)
+    record_food_stats(user_id, [(log.food_id, log.quantity, log.unit) for log in new_logs])
     db.session.commit()
 
     totals = _calculate_daily_totals(user_id, today)
@@ -815,6 +884,23 @@ def add_meal_to_log(meal_id: int):
     })
 
 
+@member_bp.route("/meals/log-batch", methods=["POST"])
+def log_meals_batch():
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"status": "error", "message": "Please log in first."}), 403
+
+    member = User.query.get(user_id)
+
+    def can_use(meal):
+        # Same rule as add_meal_to_log.
+        if meal.member_id:
+            return meal.member_id == user_id
+        return bool(member and member.trainer_id)
+
+    return log_meal_batch(user_id, request.get_json(silent=True) or {}, can_use)
+
+
 @member_bp.route("/meals", methods=["POST"])
 def create_member_meal():
     user_id = session.get("user_id")
@@ -888,6 +974,7 @@ def create_member_meal():
 
         if not meal.ingredients:
             return jsonify({"status": "error", "message": "Add at least one valid ingredient."}), 400
+        refresh_meal_macros(meal)
 
         db.session.add(meal)
         db.session.commit()
@@ -937,6 +1024,7 @@ def add_member_meal_to_log(meal_id: int):
         return jsonify({"status": "error", "message": "Meal not found."}), 404
 
     logs_payload = []
+    new_logs = []
     for ingredient in meal.ingredients:
         grams = float(ingredient.quantity_grams or 0.0)
         if grams <= 0:
@@ -951,6 +1039,7 @@ def add_member_meal_to_log(meal_id: int):
         )
         db.session.add(log)
         db.session.flush()
+        new_logs.append(log)
 
         scaled = scale_food_nutrients(log.food, grams)
         logs_payload.append({
@@ -968,6 +1057,8 @@ def add_member_meal_to_log(meal_id: int):
         db.session.rollback()
         return jsonify({"status": "error", "message": "Meal has no ingredients to log."}), 400
 
+    record_food_logs(new_logs)
+    record_food_stats(user_id, [(log.food_id, log.quantity, log.unit) for log in new_logs])
     db.session.commit()
     totals = _calculate_daily_totals(user_id, today)
     totals["fats"] = totals["fat"]
@@ -1003,7 +1094,7 @@ def log_food():
     created_food = False
 
     if food_id:
-        food = Food.query.get(int(food_id))
+        food = get_food_profile(food_id)
         if not food:
             return jsonify({"status": "error", "message": "Selected food not found."}), 404
     else:
@@ -1036,22 +1127,15 @@ def log_food():
             )
             db.session.add(food)
             db.session.commit()
+            refresh_food_autocomplete()
             created_food = True
         else:
-            food = Food.query.filter(Food.name.ilike(f"%{search_name}%")).first()
-            if not food:
+            matches = find_foods(search_name, limit=1)
+            if not matches:
                 return jsonify({"status": "error", "message": "No matching foods found."}), 404
+            food = matches[0]
 
-    measure = None
-    if food and food.id:
-        measure = FoodMeasure.query.filter_by(food_id=food.id, measure_name=unit_input).first()
-
-    if measure:
-        grams = quantity * measure.grams
-    elif unit_input in UNIT_TO_GRAMS:
-        grams = quantity * UNIT_TO_GRAMS[unit_input]
-    else:
-        grams = quantity
+    grams = grams_for(food.id, quantity, unit_input)
 
     log = UserFoodLog(
         user_id=user_id,
@@ -1061,6 +1145,9 @@ def log_food():
         log_date=today
     )
     db.session.add(log)
+    db.session.flush()
+    record_food_logs([log])
+    record_food_stats(user_id, [(food.id, quantity, unit_input)])
     db.session.commit()
 
     scaled = scale_food_nutrients(food, grams)
@@ -1242,6 +1329,7 @@ def log_weight():
 
     _update_user_calorie_targets(user, weight_lbs=weight_lbs)
     db.session.commit()
+    invalidate_member_charts(user.id)
 
     flash("Weight logged successfully.", "success")
     return redirect(url_for('member.dashboard', view='profile'))
@@ -1282,18 +1370,16 @@ def exercise_plan():
 
 @member_bp.route("/get-measures/<int:food_id>")
 def get_measures(food_id):
-    measures = FoodMeasure.query.filter_by(food_id=food_id).all()
+    profile = get_food_profile(food_id)
     payload = []
     seen = set()
 
-    for measure in measures:
-        if not measure or not measure.grams:
-            continue
-        name = (measure.measure_name or "").strip().lower()
+    for measure_name, grams in (profile.measures if profile else ()):
+        name = measure_name.strip().lower()
         if not name or name in seen:
             continue
         seen.add(name)
-        payload.append({"measure_name": measure.measure_name, "grams": measure.grams})
+        payload.append({"measure_name": measure_name, "grams": grams})
 
     # Always ensure grams and ounces are available as fallbacks
     if "g" not in seen:
@@ -1318,6 +1404,9 @@ def delete_food_log(log_id):
 
     food_name = log.food.name
     db.session.delete(log)
+    db.session.flush()
+    discard_food_logs([log])
+    discard_food_stats(user_id, [log.food_id])
     db.session.commit()
 
     return jsonify({"status": "success", "message": f"Removed {food_name} from your log."})
@@ -1330,128 +1419,14 @@ def build_member_summary_context(client: User, macro_week_param: Optional[int] =
 
     macro_targets = _user_macro_targets(client)
 
-    # ----- WEIGHT TREND -----
-    weights = (
-        db.session.query(Progress.date, Progress.weight)
-        .filter(Progress.user_id == client.id)
-        .order_by(Progress.date)
-        .all()
-    )
-    df_weights = pd.DataFrame(weights, columns=["date", "weight"]) if weights else pd.DataFrame()
-    weight_span = None
-    if weights:
-        first_entry_date, first_entry_weight = weights[0]
-        first_entry_date_str = first_entry_date.strftime("%b %d, %Y") if first_entry_date else "--"
-        last_entry_date, last_entry_weight = weights[-1]
-        last_entry_date_str = last_entry_date.strftime("%b %d, %Y") if last_entry_date else "--"
-        weight_span = {
-            "start_weight": round(first_entry_weight, 1) if first_entry_weight is not None else "--",
-            "start_date": first_entry_date_str,
-            "end_weight": round(last_entry_weight, 1) if last_entry_weight is not None else "--",
-            "end_date": last_entry_date_str,
-        }
-
-    chart_config = {"displayModeBar": False, "responsive": True}
-
-    weight_chart = None
-    if not df_weights.empty:
-        df_weights["date"] = pd.to_datetime(df_weights["date"]).dt.date
-        weights_series = pd.to_numeric(df_weights["weight"], errors="coerce").dropna()
-        y_min = weights_series.min() if not weights_series.empty else 0
-        y_max = weights_series.max() if not weights_series.empty else 0
-        padding = max(1, (y_max - y_min) * 0.1) if y_max != y_min else 5
-        y_axis_range = [max(0, y_min - padding), y_max + padding]
-
-        fig = go.Figure()
-        fig.add_trace(
-            go.Scatter(
-                x=df_weights["date"],
-                y=df_weights["weight"],
-                mode="lines+markers",
-                line=dict(color="#3c7df2", width=3),
-                marker=dict(size=7, color="#0b5394"),
-                fill="tozeroy",
-                fillcolor="rgba(60,125,242,0.18)",
-            )
-        )
-        fig.update_layout(
-            yaxis_title="Weight (lbs)",
-            yaxis=dict(range=y_axis_range, gridcolor="rgba(12,38,77,0.08)"),
-            xaxis=dict(title="", showgrid=False, zeroline=False, showticklabels=False),
-            template="plotly_white",
-            margin=dict(l=36, r=24, t=20, b=4),
-            plot_bgcolor="rgba(248,249,255,0.95)",
-            paper_bgcolor="rgba(248,249,255,0.95)",
-        )
-        weight_chart = fig.to_html(full_html=False, config=chart_config)
-
-    # ----- WEEKLY WORKOUTS (LAST 5 WEEKS) -----
-    weeks_to_show = 5
-
-    current_week_start = _week_start_sunday(now.date())
-    week_starts = [
-        current_week_start - timedelta(weeks=offset)
-        for offset in reversed(range(weeks_to_show))
-    ]
-
-    weekly_workout_chart = None
-    if week_starts:
-        chart_window_start = datetime.combine(
-            week_starts[0],
-            datetime.min.time(),
-            tzinfo=EASTERN_TZ,
-        )
-        chart_start = chart_window_start.astimezone(timezone.utc).replace(tzinfo=None)
-        weekly_sessions = (
-            db.session.query(WorkoutSession.started_at)
-            .filter(WorkoutSession.user_id == client.id)
-            .filter(WorkoutSession.started_at.isnot(None))
-            .filter(WorkoutSession.started_at >= chart_start)
-            .all()
-        )
-
-        weekly_counts = defaultdict(int)
-        for (started_at,) in weekly_sessions:
-            session_date = _eastern_date(started_at)
-            if not session_date:
-                continue
-            session_week_start = _week_start_sunday(session_date)
-            weekly_counts[session_week_start] += 1
-
-        week_labels = []
-        week_values = []
-        for week_start in week_starts:
-            week_labels.append(f"{week_start.month}/{week_start.day:02d}")
-            week_values.append(weekly_counts.get(week_start, 0))
-
-        fig_weekly = go.Figure(
-            [
-                go.Bar(
-                    x=week_labels,
-                    y=week_values,
-                    marker=dict(
-                        color=["#0d6efd", "#5a8dee", "#8bb7ff", "#0a58ca", "#1c7ed6"][: len(week_values)]
-                    ),
-                )
-            ]
-        )
-        fig_weekly.update_layout(
-            title="Weekly Workouts (Last 5 Weeks)",
-            xaxis_title="Week Starting",
-            yaxis_title="Workouts",
-            template="plotly_white",
-            margin=dict(l=36, r=24, t=30, b=20),
-            yaxis=dict(dtick=1, tickmode="linear", tick0=0),
-            plot_bgcolor="rgba(248,249,255,0.95)",
-            paper_bgcolor="rgba(248,249,255,0.95)",
-        )
-        weekly_workout_chart = fig_weekly.to_html(full_html=False, config=chart_config)
+    charts = member_summary_charts(client.id, now.date())
 
     # ----- WORKOUT HISTORY -----
     history_limit = 10
     history_sessions = (
         WorkoutSession.query
-        .filter(WorkoutSession.user_id == client.id)
+        .options(selectinload(WorkoutSession.sets), joinedload(WorkoutSession.template))
+        .filter(WorkoutSession.user_id == client.id, WorkoutSession.completed_at.isnot(None))
         .order_by(WorkoutSession.started_at.desc())
         .limit(history_limit)
         .all()
@@ -1526,7 +1501,7 @@ def build_member_summary_context(client: User, macro_week_param: Optional[int] =
     )
     earliest_log_date = None
     if earliest_log_entry:
-        earliest_log_date = earliest_log_entry.log_date or _eastern_date(earliest_log_entry.created_at)
+        earliest_log_date = earliest_log_entry.log_date or eastern_date(earliest_log_entry.created_at)
     if not earliest_log_date:
         earliest_log_date = current_week_start
     earliest_week_start = _week_start_sunday(earliest_log_date)
@@ -1539,39 +1514,7 @@ def build_member_summary_context(client: User, macro_week_param: Optional[int] =
     macro_week_start = current_week_start - timedelta(weeks=requested_offset)
     macro_week_end = macro_week_start + timedelta(days=6)
 
-    week_start_dt = datetime.combine(macro_week_start, datetime.min.time())
-    week_end_dt = datetime.combine(macro_week_end + timedelta(days=1), datetime.min.time())
-
-    logs_for_macros = (
-        UserFoodLog.query
-        .filter(UserFoodLog.user_id == client.id)
-        .filter(
-            or_(
-                and_(
-                    UserFoodLog.log_date >= macro_week_start,
-                    UserFoodLog.log_date <= macro_week_end,
-                ),
-                and_(
-                    UserFoodLog.log_date.is_(None),
-                    UserFoodLog.created_at >= week_start_dt,
-                    UserFoodLog.created_at < week_end_dt,
-                ),
-            )
-        )
-        .all()
-    )
-    daily_macro_totals = defaultdict(lambda: {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0})
-    for log in logs_for_macros:
-        day = log.log_date or _eastern_date(log.created_at)
-        if not day:
-            continue
-        if day < earliest_week_start or day > current_week_start + timedelta(days=6):
-            continue
-        scaled = scale_food_nutrients(log.food, log.quantity_in_grams())
-        daily_macro_totals[day]["calories"] += scaled["calories"]
-        daily_macro_totals[day]["protein"] += scaled["protein"]
-        daily_macro_totals[day]["carbs"] += scaled["carbs"]
-        daily_macro_totals[day]["fats"] += scaled["fats"]
+    daily_macro_totals = daily_totals_range(client.id, macro_week_start, macro_week_end)
 
     week_sums = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0}
     for day_offset in range(7):
@@ -1644,10 +1587,12 @@ def build_member_summary_context(client: User, macro_week_param: Optional[int] =
 
     return {
         "client": client,
-        "weight_span": weight_span,
-        "weight_chart": weight_chart,
-        "weekly_workout_chart": weekly_workout_chart,
+        "weight_span": charts["weight_span"],
+        "weight_chart": charts["weight_chart"],
+        "weekly_workout_chart": charts["weekly_workout_chart"],
         "workout_history": workout_history,
+        "personal_records": personal_records_for(client.id),
+        "muscle_volume": muscle_volume_rows(muscle_volume_history(client.id, now.date())),
         "macro_week_summary": macro_week_summary,
         "macro_week_prev": macro_week_prev,
         "macro_week_next": macro_week_next,
@@ -1678,6 +1623,15 @@ def member_summary():
     })
     return render_template("member-summary.html", **context)
 
+
+@member_bp.route('/summary/charts')
+@login_required
+def member_summary_charts_data():
+    """Return the summary chart series as JSON for client-side rendering."""
+    if current_user.role != 'member':
+        return jsonify({"error": "Access denied."}), 403
+    return jsonify(member_summary_charts(current_user.id, _today_eastern(), fmt="json"))
+
 # -----------------------------
 # Log out
 # -----------------------------
@@ -5,47 +5,51 @@ from app.models import (
     User,
     ExerciseTemplate,
     TemplateExercise,
-    ExerciseCatalog,
     AssignedTemplate,
     WorkoutSession,
     WorkoutSet,
+    WorkoutSnapshot,
+)
+from app.services.exercise_catalog import exercise_catalog
+from app.services.exercise_search import FILTER_FIELDS, SEARCH_LIMIT, search_exercises
+from app.services.live_workouts import (
+    complete_live_session,
+    delete_live_set,
+    finish_workout,
+    live_session_for,
+    live_set_payload,
+    parse_client_id,
+    parse_live_sets,
+    parse_set_changes,
+    save_live_sets,
+    stored_sets,
+    update_live_set,
+)
+from app.services.personal_records import exercise_key
+from app.services.summary_charts import invalidate_member_charts
+from app.services.workout_snapshots import (
+    last_exercise_performances,
+    last_workout,
+    session_exercises,
 )
 from datetime import datetime
 import json
-from sqlalchemy import or_, func
 
 
 template_bp = Blueprint('template', __name__, url_prefix='/templates')
 
 
-def _search_exercises(term):
-    if not term:
-        return []
-
-    like_term = f"%{term}%"
-    rows = (
-        ExerciseCatalog.query
-        .filter(
-            or_(
-                ExerciseCatalog.name.ilike(like_term),
-                ExerciseCatalog.primary_muscles.ilike(like_term),
-                ExerciseCatalog.secondary_muscles.ilike(like_term),
-                ExerciseCatalog.equipment.ilike(like_term),
-                ExerciseCatalog.category.ilike(like_term),
-            )
-        )
-        .order_by(ExerciseCatalog.name.asc())
-        .limit(25)
-        .all()
-    )
-
+def _search_exercises(term, filters=None, limit=SEARCH_LIMIT):
     results = []
-    for row in rows:
+    for row in search_exercises(term, filters, limit):
         muscle = row.primary_muscles or row.secondary_muscles or (row.category.title() if row.category else None)
         results.append({
             "name": row.name,
             "muscle": muscle,
             "equipment": row.equipment,
+            "level": row.level,
+            "force": row.force,
+            "mechanic": row.mechanic,
         })
     return results
 
@@ -72,10 +76,15 @@ def _human_duration(started_at, completed_at):
 @login_required
 def search_exercises_api():
     query = (request.args.get('q') or '').strip()
-    if not query:
+    filters = {field: request.args.get(field) for field in FILTER_FIELDS}
+    if not query and not any(filters.values()):
         return jsonify({"results": []})
 
-    matches = _search_exercises(query)
+    try:
+        limit = min(max(int(request.args.get('limit', SEARCH_LIMIT)), 1), 100)
+    except (TypeError, ValueError):
+        limit = SEARCH_LIMIT
+    matches = _search_exercises(query, filters, limit)
     return jsonify({"results": matches or []})
 
 
@@ -138,14 +147,10 @@ def view_template(template_id):
             flash('Template updated.', 'success')
             return redirect(url_for('template.list_templates'))
 
-    # ✅ Build catalog_map here in Python
-    catalog_rows = ExerciseCatalog.query.all()
-    catalog_map = {row.name: row for row in catalog_rows}
-
     return render_template(
         'template-detail.html',
         template=tpl,
-        catalog_map=catalog_map
+        catalog_map=exercise_catalog()
     )
 
 
@@ -220,15 +225,11 @@ def add_exercise_page(template_id):
         flash("You do not have access to this template.", "danger")
         return redirect(url_for("template.list_templates"))
 
-    # Build catalog map: { exercise_name : ExerciseCatalog row }
-    catalog_rows = ExerciseCatalog.query.all()
-    catalog_map = { row.name: row for row in catalog_rows }
-
     return render_template(
         "add_exercise.html",
         template=tpl,
         exercises=None,      # no search yet
-        catalog_map=catalog_map
+        catalog_map=exercise_catalog()
     )
 
 @template_bp.route('/<int:template_id>/delete', methods=['POST'])
@@ -241,6 +242,7 @@ def delete_template(template_id):
 
     AssignedTemplate.query.filter_by(template_id=tpl.id).delete(synchronize_session=False)
     WorkoutSession.query.filter_by(template_id=tpl.id).update({"template_id": None}, synchronize_session=False)
+    WorkoutSnapshot.query.filter_by(template_id=tpl.id).delete(synchronize_session=False)
     db.session.delete(tpl)
     db.session.commit()
 
@@ -287,41 +289,59 @@ def assign_template(template_id):
     return render_template('assign-template.html', template=tpl, clients=clients, assigned_ids=assigned_ids)
 
 
-@template_bp.route('/workouts/start/<int:template_id>', methods=['GET', 'POST'])
-@login_required
-def start_workout(template_id):
-    tpl = ExerciseTemplate.query.get_or_404(template_id)
+def _workout_target(tpl, for_user_id_value):
+    """Who a workout of ``tpl`` is logged for: ``(user, None)`` or ``(None, (message, redirect_url))``."""
     # Members can use assigned templates or their own; trainers can use any they own
     if tpl.owner_id != current_user.id and current_user.role == 'member':
         assigned = AssignedTemplate.query.filter_by(template_id=tpl.id, member_id=current_user.id).first()
         if not assigned:
-            flash('You do not have access to this template.', 'danger')
-            return redirect(url_for('template.list_templates'))
+            return None, ('You do not have access to this template.', url_for('template.list_templates'))
+
+    if for_user_id_value in (None, ''):
+        return current_user, None
+    try:
+        for_user_id = int(for_user_id_value)
+    except (TypeError, ValueError):
+        for_user_id = None
+    if not for_user_id or for_user_id == current_user.id:
+        return current_user, None
+    if current_user.role != 'trainer':
+        return None, ('You do not have access to that client.', url_for('template.list_templates'))
+    target_user = User.query.filter_by(id=for_user_id, trainer_id=current_user.id, role='member').first()
+    if not target_user:
+        return None, ('Client not found.', url_for('template.list_templates'))
+    assignment = AssignedTemplate.query.filter_by(template_id=tpl.id, trainer_id=current_user.id, member_id=target_user.id).first()
+    if not assignment and tpl.owner_id != current_user.id:
+        return None, ('Template is not assigned to this client.', url_for('trainer.client_detail', member_id=target_user.id))
+    return target_user, None
 
+
+def _finished_redirect(workout_session):
+    if workout_session.user_id != current_user.id:
+        return url_for('trainer.client_detail', member_id=workout_session.user_id, view='calendar')
+    return url_for('template.view_session', session_id=workout_session.id)
+
+
+def _flash_finished(new_records):
+    flash('Workout logged.', 'success')
+    if new_records:
+        flash(f"New personal record: {', '.join(new_records)}!", 'success')
+
+
+@template_bp.route('/workouts/start/<int:template_id>', methods=['GET', 'POST'])
+@login_required
+def start_workout(template_id):
+    tpl = ExerciseTemplate.query.get_or_404(template_id)
     for_user_id_value = request.form.get('for_user_id') if request.method == 'POST' else request.args.get('for_user_id')
-    target_user = current_user
-    redirect_kwargs = {'template_id': template_id}
+    target_user, error = _workout_target(tpl, for_user_id_value)
+    if error:
+        message, redirect_url = error
+        flash(message, 'danger')
+        return redirect(redirect_url)
 
-    if for_user_id_value not in (None, ''):
-        try:
-            for_user_id = int(for_user_id_value)
-        except (TypeError, ValueError):
-            for_user_id = None
-        if for_user_id and for_user_id != current_user.id:
-            if current_user.role != 'trainer':
-                flash('You do not have access to that client.', 'danger')
-                return redirect(url_for('template.list_templates'))
-            target_user = User.query.filter_by(id=for_user_id, trainer_id=current_user.id, role='member').first()
-            if not target_user:
-                flash('Client not found.', 'danger')
-                return redirect(url_for('template.list_templates'))
-            assignment = AssignedTemplate.query.filter_by(template_id=tpl.id, trainer_id=current_user.id, member_id=target_user.id).first()
-            if not assignment and tpl.owner_id != current_user.id:
-                flash('Template is not assigned to this client.', 'danger')
-                return redirect(url_for('trainer.client_detail', member_id=target_user.id))
-            redirect_kwargs['for_user_id'] = target_user.id
-    else:
-        for_user_id = None
+    redirect_kwargs = {'template_id': template_id}
+    if target_user.id != current_user.id:
+        redirect_kwargs['for_user_id'] = target_user.id
 
     if request.method == 'POST':
         payload_raw = request.form.get('workout_payload')
@@ -346,7 +366,8 @@ def start_workout(template_id):
         db.session.flush()
 
         total_sets = 0
-        summary_parts = []
+        logged_sets = []
+        performed = []
 
         for exercise in payload:
             name = (exercise.get('name') or '').strip()
@@ -384,6 +405,7 @@ def start_workout(template_id):
                     continue
 
                 clean_sets.append({"reps": reps_val, "weight": weight_val})
+                logged_sets.append((name, reps_val, weight_val))
                 db.session.add(WorkoutSet(
                     session_id=workout_session.id,
                     template_exercise_id=template_ex_id,
@@ -396,67 +418,70 @@ def start_workout(template_id):
             if not clean_sets:
                 continue
 
+            performed.append({"templateExerciseId": template_ex_id, "name": name, "sets": clean_sets})
             total_sets += len(clean_sets)
-            first = clean_sets[0]
-            rep_part = f"{first['reps']}" if first['reps'] is not None else '—'
-            weight_part = ''
-            if first['weight'] is not None:
-                weight_part = f" @ {round(first['weight'], 1)} lbs"
-            summary_parts.append(f"{name}: {len(clean_sets)} set(s) × {rep_part}{weight_part}")
 
         if total_sets == 0:
             db.session.rollback()
             flash('No sets were logged. Please add at least one set.', 'warning')
             return redirect(url_for('template.start_workout', **redirect_kwargs))
 
-        workout_session.completed_at = datetime.utcnow()
-        summary_text = '; '.join(summary_parts)
-        if len(summary_text) > 250:
-            summary_text = summary_text[:247] + '...'
-        workout_session.summary = summary_text
-
+        new_records = finish_workout(workout_session, tpl, performed, logged_sets)
         db.session.commit()
-        flash('Workout logged.', 'success')
-        if target_user.id != current_user.id:
-            return redirect(url_for('trainer.client_detail', member_id=target_user.id, view='calendar'))
-        return redirect(url_for('template.view_session', session_id=workout_session.id))
-
-    # Build initial data using latest session as defaults
-    last_session = (
-        WorkoutSession.query
-        .filter_by(user_id=target_user.id, template_id=tpl.id)
-        .order_by(WorkoutSession.completed_at.desc().nullslast(), WorkoutSession.started_at.desc())
-        .first()
-    )
+        invalidate_member_charts(target_user.id)
+        _flash_finished(new_records)
+        return redirect(_finished_redirect(workout_session))
+
+    # Prefill from the snapshot stored when this template was last saved.
+    snapshot = last_workout(target_user.id, tpl.id)
+    if snapshot:
+        previous_exercises = snapshot.exercises
+    else:
+        # Sessions saved before snapshots existed (until rebuild_workout_snapshots runs).
+        last_session = (
+            WorkoutSession.query
+            .filter(
+                WorkoutSession.user_id == target_user.id,
+                WorkoutSession.template_id == tpl.id,
+                WorkoutSession.completed_at.isnot(None),
+            )
+            .order_by(WorkoutSession.completed_at.desc(), WorkoutSession.started_at.desc())
+            .first()
+        )
+        previous_exercises = session_exercises(last_session.sets) if last_session else []
 
     last_sets_map = {}
-    if last_session:
-        previous_sets = (
-            WorkoutSet.query
-            .filter_by(session_id=last_session.id)
-            .order_by(WorkoutSet.exercise_name.asc(), WorkoutSet.set_number.asc())
-            .all()
-        )
-        for s in previous_sets:
-            if s.template_exercise_id:
-                key = f"tpl:{s.template_exercise_id}"
-            else:
-                key = f"custom:{s.exercise_name.lower()}"
-            entry = last_sets_map.setdefault(key, {
-                "templateExerciseId": s.template_exercise_id,
-                "name": s.exercise_name,
-                "sets": []
-            })
-            entry["sets"].append({
-                "reps": s.reps,
-                "weight": s.weight
-            })
+    for exercise in previous_exercises:
+        if exercise.get("templateExerciseId"):
+            key = f"tpl:{exercise['templateExerciseId']}"
+        else:
+            key = f"custom:{exercise['name'].lower()}"
+        last_sets_map.setdefault(key, exercise)
+
+    template_exercises = list(tpl.exercises)
+    names = [ex.exercise_name for ex in template_exercises] + [data["name"] for data in last_sets_map.values()]
+    elsewhere = last_exercise_performances(target_user.id, names)
+
+    def _last_time(name):
+        performance = elsewhere.get(exercise_key(name))
+        if not performance:
+            return None
+        performed_at = performance.performed_at
+        return {
+            "date": performed_at.strftime('%b %d, %Y') if performed_at else None,
+            "template": performance.template_name,
+            "sets": performance.sets,
+        }
 
     initial_payload = []
-    for ex in tpl.exercises:
+    for ex in template_exercises:
         key = f"tpl:{ex.id}"
         prev = last_sets_map.pop(key, None)
+        last_time = _last_time(ex.exercise_name)
         sets_payload = prev["sets"] if prev else []
+        if not sets_payload and last_time:
+            # Never done in this template: start from the last time it was done anywhere.
+            sets_payload = [dict(item) for item in last_time["sets"]]
         if not sets_payload:
             sets_payload = [{"reps": ex.default_reps, "weight": None}]
 
@@ -465,7 +490,8 @@ def start_workout(template_id):
             "name": ex.exercise_name,
             "muscle": ex.muscle,
             "equipment": ex.equipment,
-            "sets": sets_payload
+            "sets": sets_payload,
+            "lastTime": last_time,
         })
 
     # Include custom exercises from last session
@@ -475,7 +501,8 @@ def start_workout(template_id):
             "name": data.get('name'),
             "muscle": None,
             "equipment": None,
-            "sets": data.get('sets') or [{"reps": None, "weight": None}]
+            "sets": data.get('sets') or [{"reps": None, "weight": None}],
+            "lastTime": _last_time(data.get('name')),
         })
 
     for item in initial_payload:
@@ -496,6 +523,141 @@ def start_workout(template_id):
     )
 
 
+def _json_error(message, status=400):
+    return jsonify({"status": "error", "message": message}), status
+
+
+def _live_session(session_id, allow_completed=False):
+    """A session the current user may log into: ``(session, None)`` or ``(None, error_response)``.
+
+    Finished sessions are refused unless ``allow_completed``.
+    """
+    workout_session = db.session.get(WorkoutSession, session_id)
+    if workout_session is None:
+        return None, _json_error('Workout not found.', 404)
+    if workout_session.user_id != current_user.id:
+        member = db.session.get(User, workout_session.user_id)
+        if current_user.role != 'trainer' or member is None or member.trainer_id != current_user.id:
+            return None, _json_error('You do not have access to this workout.', 403)
+    if workout_session.completed_at is not None and not allow_completed:
+        return None, _json_error('This workout has already been finished.', 409)
+    return workout_session, None
+
+
+def _live_session_json(workout_session, sets):
+    return {
+        "status": "ok",
+        "sessionId": workout_session.id,
+        "startedAt": workout_session.started_at.isoformat() if workout_session.started_at else None,
+        "sets": live_set_payload(sets),
+    }
+
+
+@template_bp.route('/workouts/<int:template_id>/sessions', methods=['POST'])
+@login_required
+def begin_live_workout(template_id):
+    """Open (or resume) the in-progress session that autosaved sets are appended to."""
+    tpl = ExerciseTemplate.query.get_or_404(template_id)
+    data = request.get_json(silent=True) or {}
+    target_user, error = _workout_target(tpl, data.get('for_user_id'))
+    if error:
+        return _json_error(error[0], 403)
+
+    workout_session = live_session_for(target_user.id, tpl.id)
+    if workout_session is not None:
+        return jsonify(_live_session_json(workout_session, stored_sets(workout_session.id)))
+
+    workout_session = WorkoutSession(user_id=target_user.id, template_id=tpl.id, started_at=datetime.utcnow())
+    db.session.add(workout_session)
+    db.session.commit()
+    return jsonify(_live_session_json(workout_session, [])), 201
+
+
+@template_bp.route('/workouts/sessions/<int:session_id>', methods=['DELETE'])
+@login_required
+def discard_live_workout(session_id):
+    workout_session, error = _live_session(session_id)
+    if error:
+        return error
+    WorkoutSet.query.filter_by(session_id=workout_session.id).delete(synchronize_session=False)
+    db.session.delete(workout_session)
+    db.session.commit()
+    return jsonify({"status": "ok"})
+
+
+@template_bp.route('/workouts/sessions/<int:session_id>/sets', methods=['POST'])
+@login_required
+def save_live_workout_sets(session_id):
+    """Append or overwrite sets by ``clientId``; safe to retry."""
+    workout_session, error = _live_session(session_id)
+    if error:
+        return error
+    try:
+        sets = parse_live_sets(request.get_json(silent=True))
+    except ValueError as exc:
+        return _json_error(str(exc))
+    saved = save_live_sets(workout_session, sets)
+    db.session.commit()
+    return jsonify({"status": "ok", "saved": saved})
+
+
+@template_bp.route('/workouts/sessions/<int:session_id>/sets/<client_id>', methods=['PATCH'])
+@login_required
+def update_live_workout_set(session_id, client_id):
+    workout_session, error = _live_session(session_id)
+    if error:
+        return error
+    try:
+        client_id = parse_client_id(client_id)
+        changes = parse_set_changes(request.get_json(silent=True))
+    except ValueError as exc:
+        return _json_error(str(exc))
+    if not update_live_set(workout_session, client_id, changes):
+        db.session.rollback()
+        return _json_error('Set not found.', 404)
+    db.session.commit()
+    return jsonify({"status": "ok"})
+
+
+@template_bp.route('/workouts/sessions/<int:session_id>/sets/<client_id>', methods=['DELETE'])
+@login_required
+def delete_live_workout_set(session_id, client_id):
+    workout_session, error = _live_session(session_id)
+    if error:
+        return error
+    delete_live_set(workout_session, client_id)
+    db.session.commit()
+    return jsonify({"status": "ok"})
+
+
+@template_bp.route('/workouts/sessions/<int:session_id>/complete', methods=['POST'])
+@login_required
+def complete_live_workout(session_id):
+    """Finish a live session from the sets already stored, after saving any final ``sets``."""
+    workout_session, error = _live_session(session_id, allow_completed=True)
+    if error:
+        return error
+    if workout_session.completed_at is not None:
+        # A retried finish: the first one went through.
+        return jsonify({"status": "ok", "redirect": _finished_redirect(workout_session)})
+
+    data = request.get_json(silent=True) or {}
+    if data.get('sets'):
+        try:
+            save_live_sets(workout_session, parse_live_sets(data))
+        except ValueError as exc:
+            return _json_error(str(exc))
+
+    new_records = complete_live_session(workout_session, workout_session.template)
+    if new_records is None:
+        db.session.rollback()
+        return _json_error('No sets were logged. Please add at least one set.')
+    db.session.commit()
+    invalidate_member_charts(workout_session.user_id)
+    _flash_finished(new_records)
+    return jsonify({"status": "ok", "redirect": _finished_redirect(workout_session)})
+
+
 @template_bp.route('/workouts/session/<int:session_id>')
 @login_required
 def view_session(session_id):
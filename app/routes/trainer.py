@@ -9,7 +9,6 @@ from flask_login import login_required, current_user
 from app import db
 from app.models import (
     User,
-    UserFoodLog,
     Progress,
     AssignedTemplate,
     ExerciseTemplate,
@@ -26,14 +25,47 @@ from app.services.nutrition import (
     convert_to_grams,
     serialize_meal,
     group_meals_by_slot,
+    refresh_meal_macros,
     MEAL_SLOT_LABELS,
 )
-from app.routes.member import build_member_summary_context
+from app.services.food_cache import get_food_profile, invalidate_food
+from app.services.food_autocomplete import refresh_food_autocomplete
+from app.services.muscle_volume import muscle_volume_history, muscle_volume_rows
+from app.services.personal_records import personal_records_for
+from app.services.nutrition_totals import TOTAL_KEYS, daily_totals_for_users
+from app.routes.member import build_member_summary_context, log_meal_batch
+from app.services.summary_charts import member_summary_charts
 from sqlalchemy import or_, func
+from sqlalchemy.orm import selectinload
 import pytz
 
 trainer_bp = Blueprint('trainer', __name__, url_prefix='/trainer')
 
+
+def _latest_weights(member_ids):
+    """Return {member_id: weight} for each member's most recent Progress entry in one query."""
+    if not member_ids:
+        return {}
+    ranked = (
+        db.session.query(
+            Progress.user_id.label("user_id"),
+            Progress.weight.label("weight"),
+            func.row_number().over(
+                partition_by=Progress.user_id,
+                order_by=(Progress.date.desc(), Progress.id.desc()),
+            ).label("rank"),
+        )
+        .filter(Progress.user_id.in_(member_ids))
+        .subquery()
+    )
+    rows = (
+        db.session.query(ranked.c.user_id, ranked.c.weight)
+        .filter(ranked.c.rank == 1)
+        .all()
+    )
+    return {user_id: weight for user_id, weight in rows}
+
+
 @trainer_bp.route('/dashboard-trainer')
 @login_required
 def dashboard_trainer():
@@ -50,30 +82,19 @@ def dashboard_trainer():
         .all()
     )
 
+    member_ids = [member.id for member in members]
+    macro_totals = daily_totals_for_users(member_ids, today)
+    latest_weights = _latest_weights(member_ids)
+
     clients = []
     for member in members:
-        totals = {key: 0.0 for key in ("calories", "protein", "carbs", "fats")}
-        logs = UserFoodLog.query.filter_by(user_id=member.id, log_date=today).all()
-        for log in logs:
-            scaled = log.scaled
-            for key in totals:
-                totals[key] += scaled.get(key, 0)
-
-        latest_progress = (
-            Progress.query
-            .filter_by(user_id=member.id)
-            .order_by(Progress.date.desc())
-            .first()
-        )
-
-        weight = None
-        if latest_progress and latest_progress.weight is not None:
-            weight = round(latest_progress.weight, 1)
+        rollup = macro_totals[member.id]
+        weight = latest_weights.get(member.id)
 
         clients.append({
             "record": member,
-            "macros": {k: round(v, 1) for k, v in totals.items()},
-            "weight": weight,
+            "macros": {key: round(rollup[key], 1) for key in TOTAL_KEYS},
+            "weight": round(weight, 1) if weight is not None else None,
             "age": getattr(member, "age", None),
             "gender": getattr(member, "gender", None),
         })
@@ -478,7 +499,7 @@ def client_detail(member_id):
 
     recent_sessions = (
         WorkoutSession.query
-        .filter_by(user_id=client.id)
+        .filter(WorkoutSession.user_id == client.id, WorkoutSession.completed_at.isnot(None))
         .order_by(WorkoutSession.started_at.desc())
         .limit(5)
         .all()
@@ -523,7 +544,7 @@ def client_detail(member_id):
 
     workout_sessions = (
         WorkoutSession.query
-        .filter_by(user_id=client.id)
+        .filter(WorkoutSession.user_id == client.id, WorkoutSession.completed_at.isnot(None))
         .order_by(WorkoutSession.started_at.desc())
         .all()
     )
@@ -609,6 +630,7 @@ def client_detail(member_id):
         meal_filters.append(TrainerMeal.id.in_(assigned_meal_ids))
     trainer_meals = (
         TrainerMeal.query
+        .options(selectinload(TrainerMeal.ingredients).joinedload(TrainerMealIngredient.food))
         .filter(TrainerMeal.trainer_id == current_user.id)
         .filter(or_(*meal_filters))
         .order_by(TrainerMeal.meal_slot.asc(), TrainerMeal.name.asc())
@@ -646,6 +668,8 @@ def client_detail(member_id):
         assigned_templates=assigned_templates,
         recent_sessions=recent_sessions,
         recent_weights=recent_weights,
+        personal_records=personal_records_for(client.id) if view != 'calendar' else [],
+        muscle_volume=muscle_volume_rows(muscle_volume_history(client.id, today)) if view != 'calendar' else [],
         calendar_weeks=calendar_weeks,
         cal_year=cal_year,
         cal_month=cal_month,
@@ -671,7 +695,7 @@ def _build_ingredient_models(food_ids, quantities, units, notes, positions):
         except (TypeError, ValueError):
             continue
 
-        if not Food.query.get(food_id):
+        if not get_food_profile(food_id):
             flash(f"Food ID {food_id} not found. Ingredient skipped.", "warning")
             continue
 
@@ -752,6 +776,7 @@ def create_meal(member_id=None):
         for idx, ingredient in enumerate(sorted(ingredients, key=lambda ing: ing.position)):
             ingredient.position = idx
             meal.ingredients.append(ingredient)
+        refresh_meal_macros(meal)
 
         db.session.add(meal)
         db.session.commit()
@@ -821,6 +846,7 @@ def edit_meal(meal_id, member_id=None):
         for idx, ingredient in enumerate(sorted(ingredients, key=lambda ing: ing.position)):
             ingredient.position = idx
             meal.ingredients.append(ingredient)
+        refresh_meal_macros(meal)
 
         db.session.commit()
         flash(f"Meal '{meal.name}' updated.", "success")
@@ -867,6 +893,18 @@ def delete_meal(meal_id, member_id=None):
     return redirect(url_for('trainer.dashboard_trainer'))
 
 
+@trainer_bp.route('/clients/<int:member_id>/meals/log-batch', methods=['POST'])
+@login_required
+def log_client_meals_batch(member_id):
+    """Log several meals across several days to a client's food log in one request."""
+    client = _get_trainer_client(member_id)
+
+    def can_use(meal):
+        return meal.trainer_id == current_user.id and meal.member_id in (None, client.id)
+
+    return log_meal_batch(client.id, request.get_json(silent=True) or {}, can_use)
+
+
 @trainer_bp.route('/meals/custom-food', methods=['POST'])
 @login_required
 def create_custom_food():
@@ -919,6 +957,7 @@ def create_custom_food():
     )
     db.session.add(food)
     db.session.commit()
+    refresh_food_autocomplete()
 
     if unit:
         measure = FoodMeasure(
@@ -928,6 +967,7 @@ def create_custom_food():
         )
         db.session.add(measure)
         db.session.commit()
+    invalidate_food(food.id)
 
     return jsonify({
         "status": "success",
@@ -964,6 +1004,19 @@ def client_summary_view(member_id):
     return render_template("member-summary.html", **context)
 
 
+@trainer_bp.route('/clients/<int:member_id>/summary-charts')
+@login_required
+def client_summary_charts(member_id):
+    """Return a client's summary chart series as JSON for client-side rendering."""
+    if current_user.role != 'trainer':
+        return jsonify({"error": "Access denied."}), 403
+
+    client = _get_trainer_client(member_id)
+    est = pytz.timezone("America/New_York")
+    today = datetime.now(est).date()
+    return jsonify(member_summary_charts(client.id, today, fmt="json"))
+
+
 @trainer_bp.route('/send-message/<int:client_id>', methods=['GET', 'POST'])
 @login_required
 def send_message(client_id: int):
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+import calendar as _calendar
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+
+from app.models import Progress, WorkoutSession
+from app.services.local_time import eastern_date, utc_start_of
+from app.services.nutrition_totals import TOTAL_KEYS, daily_totals_range
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """Return the first and last day of a calendar month."""
+    last_day = _calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def _empty_day() -> Dict[str, object]:
+    return {
+        "weight": None,
+        "weight_entry_id": None,
+        "food": {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0},
+        "food_entries": 0,
+        "workouts": [],
+    }
+
+
+def load_calendar_days(user_id: int, start: date, end: date) -> Dict[date, Dict[str, object]]:
+    """Aggregate weight, macro and workout data per Eastern day for ``start``..``end``.
+
+    Weight entries and workout sessions are read once with a bounded range
+    filter and macros come from the daily rollup, so the cost depends on the
+    size of the window rather than the member's whole history.
+    Only days with at least one entry are present in the returned mapping.
+    """
+    days: Dict[date, Dict[str, object]] = {}
+    range_start = utc_start_of(start)
+    range_end = utc_start_of(end + timedelta(days=1))
+
+    weight_rows = (
+        Progress.query
+        .filter(Progress.user_id == user_id)
+        .filter(Progress.date >= range_start, Progress.date < range_end)
+        .all()
+    )
+    for entry in weight_rows:
+        day = eastern_date(entry.date)
+        if not day or day < start or day > end:
+            continue
+        bucket = days.setdefault(day, _empty_day())
+        # The most recently recorded entry for a day wins.
+        if bucket["weight_entry_id"] is None or entry.id > bucket["weight_entry_id"]:
+            bucket["weight_entry_id"] = entry.id
+            bucket["weight"] = float(entry.weight) if entry.weight is not None else None
+
+    for day, totals in daily_totals_range(user_id, start, end).items():
+        bucket = days.setdefault(day, _empty_day())
+        bucket["food"] = {key: totals[key] for key in TOTAL_KEYS}
+        bucket["food_entries"] = totals["entry_count"]
+
+    session_time = func.coalesce(WorkoutSession.completed_at, WorkoutSession.started_at)
+    sessions = (
+        WorkoutSession.query
+        .options(joinedload(WorkoutSession.template))
+        .filter(WorkoutSession.user_id == user_id, WorkoutSession.completed_at.isnot(None))
+        .filter(session_time >= range_start, session_time < range_end)
+        .order_by(WorkoutSession.started_at.desc())
+        .all()
+    )
+    for sess in sessions:
+        day = eastern_date(sess.completed_at or sess.started_at)
+        if not day or day < start or day > end:
+            continue
+        days.setdefault(day, _empty_day())["workouts"].append(sess)
+
+    return days
+
+
+def rounded_food_totals(bucket: Optional[Dict[str, object]]) -> Optional[Dict[str, float]]:
+    """Return a day's macro totals rounded for display, or ``None`` when nothing was logged."""
+    if not bucket or not bucket["food_entries"]:
+        return None
+    return {key: round(value, 1) for key, value in bucket["food"].items()}
+
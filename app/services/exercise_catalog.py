@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Iterator, NamedTuple, Optional, Sequence
+
+from sqlalchemy import insert, select, update
+
+from app import db
+from app.models import CatalogVersion, ExerciseCatalog
+from app.services.personal_records import exercise_key
+
+EXERCISE_CATALOG = "exercise"
+# How often a loaded snapshot checks whether an import bumped the version.
+CATALOG_RECHECK_SECONDS = 30.0
+
+
+class CatalogExercise(NamedTuple):
+    """One catalog exercise with just the fields pages and analytics read."""
+    id: int
+    name: str
+    key: str  # ``exercise_key(name)``
+    category: Optional[str]
+    equipment: Optional[str]
+    level: Optional[str]
+    force: Optional[str]
+    mechanic: Optional[str]
+    primary_muscles: Optional[str]  # comma separated, as stored
+    secondary_muscles: Optional[str]
+    instructions: Optional[str]
+    local_image_main: Optional[str]
+
+
+class ExerciseCatalogSnapshot:
+    """Immutable in-memory copy of ``exercise_catalog`` at one catalog version.
+
+    Works as the ``catalog_map`` templates expect: ``get(name)`` matches the
+    exact name first, then ignoring case and spacing.
+    """
+
+    __slots__ = ("version", "exercises", "_by_name", "_by_key")
+
+    def __init__(self, version: Optional[int], exercises: Sequence[CatalogExercise]):
+        self.version = version
+        self.exercises = tuple(exercises)
+        self._by_name: Dict[str, CatalogExercise] = {}
+        self._by_key: Dict[str, CatalogExercise] = {}
+        for exercise in self.exercises:
+            self._by_name.setdefault(exercise.name, exercise)
+            self._by_key.setdefault(exercise.key, exercise)
+
+    def get(self, name: Optional[str], default: Optional[CatalogExercise] = None) -> Optional[CatalogExercise]:
+        if not name:
+            return default
+        found = self._by_name.get(name)
+        if found is None:
+            found = self._by_key.get(exercise_key(name))
+        return found if found is not None else default
+
+    def by_key(self, key: str) -> Optional[CatalogExercise]:
+        return self._by_key.get(key)
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def __iter__(self) -> Iterator[CatalogExercise]:
+        return iter(self.exercises)
+
+
+_snapshot: Optional[ExerciseCatalogSnapshot] = None
+_checked_at = 0.0
+_lock = Lock()
+
+
+def catalog_version(name: str = EXERCISE_CATALOG) -> Optional[int]:
+    """The current version of catalog ``name``; ``None`` until it is first bumped."""
+    return db.session.scalar(select(CatalogVersion.version).where(CatalogVersion.name == name))
+
+
+def _load_snapshot(version: Optional[int]) -> ExerciseCatalogSnapshot:
+    rows = db.session.execute(
+        select(
+            ExerciseCatalog.id,
+            ExerciseCatalog.name,
+            ExerciseCatalog.category,
+            ExerciseCatalog.equipment,
+            ExerciseCatalog.level,
+            ExerciseCatalog.force,
+            ExerciseCatalog.mechanic,
+            ExerciseCatalog.primary_muscles,
+            ExerciseCatalog.secondary_muscles,
+            ExerciseCatalog.instructions,
+            ExerciseCatalog.local_image_main,
+        ).order_by(ExerciseCatalog.name, ExerciseCatalog.id)
+    )
+    return ExerciseCatalogSnapshot(version, [
+        CatalogExercise(
+            id=row.id,
+            name=row.name,
+            key=exercise_key(row.name),
+            category=row.category,
+            equipment=row.equipment,
+            level=row.level,
+            force=row.force,
+            mechanic=row.mechanic,
+            primary_muscles=row.primary_muscles,
+            secondary_muscles=row.secondary_muscles,
+            instructions=row.instructions,
+            local_image_main=row.local_image_main,
+        )
+        for row in rows
+    ])
+
+
+def exercise_catalog() -> ExerciseCatalogSnapshot:
+    """Return the process-wide catalog snapshot, loading it on first use.
+
+    After that it costs nothing between rechecks and a one-row primary-key
+    read at each recheck; the catalog itself is only read again once
+    ``bump_catalog_version`` has run.
+    """
+    global _snapshot, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _snapshot is not None and now - _checked_at < CATALOG_RECHECK_SECONDS:
+            return _snapshot
+    version = catalog_version()
+    with _lock:
+        _checked_at = now
+        if _snapshot is not None and _snapshot.version == version:
+            return _snapshot
+    snapshot = _load_snapshot(version)
+    with _lock:
+        _snapshot = snapshot
+        _checked_at = time.monotonic()
+    return snapshot
+
+
+def invalidate_exercise_catalog() -> None:
+    """Drop this process's snapshot so the next lookup reloads it."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def bump_catalog_version(name: str = EXERCISE_CATALOG) -> None:
+    """Tell every process the catalog changed. Call in the same transaction as the import."""
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.name == name)
+        .values(version=CatalogVersion.version + 1, updated_at=now)
+    )
+    if not result.rowcount:
+        db.session.execute(insert(CatalogVersion).values(name=name, version=1, updated_at=now))
+    if name == EXERCISE_CATALOG:
+        invalidate_exercise_catalog()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.services.exercise_catalog import CatalogExercise, ExerciseCatalogSnapshot, exercise_catalog
+from app.services.food_search import tokenize
+
+# Score for a query word found in each field; a word counts once, in its best field.
+FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 3.0,
+    "primary_muscles": 2.0,
+    "equipment": 1.5,
+    "category": 1.0,
+    "secondary_muscles": 1.0,
+}
+# A query word that is only the start of an indexed word ("dumb" for "dumbbell").
+PREFIX_FACTOR = 0.6
+# Extra score when the name starts with the whole query.
+NAME_PREFIX_BONUS = 1.0
+FILTER_FIELDS = ("equipment", "level", "force", "mechanic")
+SEARCH_LIMIT = 25
+
+
+def _normalise(value: Optional[str]) -> str:
+    return " ".join(tokenize(value or ""))
+
+
+class ExerciseSearchIndex:
+    """Inverted token index over one catalog snapshot.
+
+    Every word of every weighted field maps to the exercises containing it
+    and the best field weight it has there. A query word matches indexed
+    words it equals or is a prefix of, and every query word must match
+    (AND). Filters are precomputed boolean masks per field value.
+    """
+
+    def __init__(self, snapshot: ExerciseCatalogSnapshot):
+        self.snapshot = snapshot
+        self.exercises: Tuple[CatalogExercise, ...] = snapshot.exercises
+        self._names = [_normalise(exercise.name) for exercise in self.exercises]
+
+        weights: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for doc, exercise in enumerate(self.exercises):
+            for field, weight in FIELD_WEIGHTS.items():
+                for word in set(tokenize(getattr(exercise, field) or "")):
+                    if weights[word].get(doc, 0.0) < weight:
+                        weights[word][doc] = weight
+        self.vocab = sorted(weights)
+        self._postings = [np.fromiter(weights[word], dtype=np.intp) for word in self.vocab]
+        self._weights = [np.fromiter(weights[word].values(), dtype=np.float64) for word in self.vocab]
+
+        self._filters: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in FILTER_FIELDS:
+            docs_by_value: Dict[str, List[int]] = defaultdict(list)
+            for doc, exercise in enumerate(self.exercises):
+                value = _normalise(getattr(exercise, field))
+                if value:
+                    docs_by_value[value].append(doc)
+            masks = {}
+            for value, docs in docs_by_value.items():
+                mask = np.zeros(len(self.exercises), dtype=bool)
+                mask[docs] = True
+                masks[value] = mask
+            self._filters[field] = masks
+
+        # Ties go to the shorter, then alphabetically first, name.
+        order = sorted(range(len(self.exercises)), key=lambda doc: (len(self._names[doc]), self._names[doc]))
+        self._tiebreak = np.empty(len(self.exercises), dtype=np.intp)
+        self._tiebreak[order] = np.arange(len(order))
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def _word_scores(self, word: str) -> np.ndarray:
+        scores = np.zeros(len(self.exercises))
+        start = bisect_left(self.vocab, word)
+        end = bisect_left(self.vocab, word + "\uffff", start)
+        for position in range(start, end):
+            factor = 1.0 if self.vocab[position] == word else PREFIX_FACTOR
+            np.maximum.at(scores, self._postings[position], self._weights[position] * factor)
+        return scores
+
+    def _filter_mask(self, filters: Mapping[str, Optional[str]]) -> Optional[np.ndarray]:
+        mask = None
+        for field in FILTER_FIELDS:
+            value = _normalise(filters.get(field))
+            if not value:
+                continue
+            field_mask = self._filters[field].get(value)
+            if field_mask is None:
+                return np.zeros(len(self.exercises), dtype=bool)
+            mask = field_mask if mask is None else mask & field_mask
+        return mask
+
+    def search(
+        self, query: str, filters: Optional[Mapping[str, Optional[str]]] = None, limit: int = SEARCH_LIMIT
+    ) -> List[CatalogExercise]:
+        """Best ``limit`` exercises matching every word of ``query`` and every filter.
+
+        An empty query lists the filtered exercises, shortest names first;
+        with neither a query nor a filter there is nothing to return.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        mask = self._filter_mask(filters or {})
+        if (not words and mask is None) or limit <= 0 or not len(self.exercises):
+            return []
+
+        scores = np.zeros(len(self.exercises))
+        matched = np.ones(len(self.exercises), dtype=bool) if mask is None else mask.copy()
+        for word in words:
+            word_scores = self._word_scores(word)
+            matched &= word_scores > 0
+            scores += word_scores
+        candidates = np.flatnonzero(matched)
+        if not len(candidates):
+            return []
+
+        phrase = " ".join(words)
+        if phrase:
+            bonus = np.fromiter(
+                (self._names[doc].startswith(phrase) for doc in candidates.tolist()),
+                dtype=bool, count=len(candidates),
+            )
+            scores[candidates[bonus]] += NAME_PREFIX_BONUS
+
+        ranked = candidates[np.lexsort((self._tiebreak[candidates], -scores[candidates]))]
+        return [self.exercises[doc] for doc in ranked[:limit].tolist()]
+
+
+_index: Optional[ExerciseSearchIndex] = None
+_lock = Lock()
+
+
+def exercise_search_index() -> ExerciseSearchIndex:
+    """The index for the current catalog snapshot, rebuilt when the snapshot is reloaded."""
+    global _index
+    snapshot = exercise_catalog()
+    with _lock:
+        if _index is not None and _index.snapshot is snapshot:
+            return _index
+    index = ExerciseSearchIndex(snapshot)
+    with _lock:
+        _index = index
+    return index
+
+
+def search_exercises(
+    query: str, filters: Optional[Mapping[str, Optional[str]]] = None, limit: int = SEARCH_LIMIT
+) -> List[CatalogExercise]:
+    """Ranked catalog search, answered in memory. See ``ExerciseSearchIndex.search``."""
+    return exercise_search_index().search(query, filters, limit)
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Food
+from app.services.food_stats import recent_food_ids
+from app.services.food_search import tokenize
+
+# How often a loaded index checks whether the Food table changed; a stale
+# index keeps serving while its replacement is built in the background.
+AUTOCOMPLETE_RECHECK_SECONDS = 60.0
+# Prefix expansions remembered per index (typing "chi", "chic", ... repeats them).
+PREFIX_CACHE_SIZE = 4096
+# Prefixes up to this length are expanded when the index is built.
+SHORT_PREFIX_LENGTH = 2
+# Minimum trigram overlap (Dice coefficient) for a misspelt word to match.
+TYPO_MIN_SIMILARITY = 0.5
+TYPO_MAX_WORDS = 5
+# Recently logged foods get ranked first for the member who logged them.
+RECENT_FOOD_DAYS = 60
+RECENT_FOOD_LIMIT = 200
+_LOAD_CHUNK_SIZE = 20000
+
+
+class AutocompleteMatch(NamedTuple):
+    food_id: int
+    name: str
+    recent: bool
+
+
+def _contains(sorted_rows: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Boolean mask of which ``rows`` appear in ``sorted_rows``."""
+    if not len(sorted_rows):
+        return np.zeros(len(rows), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_rows, rows), len(sorted_rows) - 1)
+    return sorted_rows[positions] == rows
+
+
+def _trigrams(word: str) -> set:
+    padded = f"  {word} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class FoodNameIndex:
+    """Token postings over every food name, with rows in ranking order.
+
+    Row ``r`` is the ``r``-th food by (name length, id), so the lowest rows of
+    any match set are its best matches and a top-k needs no sorting. Each
+    vocabulary word maps to a sorted int32 array of rows; prefix lookups are
+    a bisect over the sorted vocabulary. Words that match nothing are retried
+    against vocabulary words sharing enough trigrams.
+    """
+
+    def __init__(self, version: tuple, foods: Sequence[tuple]):
+        self.version = version
+        ranked = sorted(foods, key=lambda food: (len(food[1]), food[0]))
+        self.ids = np.array([food_id for food_id, _ in ranked], dtype=np.int64)
+        self.names = [name for _, name in ranked]
+        order = np.argsort(self.ids)
+        self._sorted_ids = self.ids[order]
+        self._sorted_rows = order.astype(np.int32)
+
+        rows_by_word: Dict[str, List[int]] = defaultdict(list)
+        for row, name in enumerate(self.names):
+            for word in set(tokenize(name)):
+                rows_by_word[word].append(row)
+        self.vocab = sorted(rows_by_word)
+        self.postings = [np.array(rows_by_word[word], dtype=np.int32) for word in self.vocab]
+        self._word_lengths = np.array([len(word) for word in self.vocab], dtype=np.int32)
+
+        # One- and two-letter prefixes expand to most of the vocabulary, so their
+        # row sets are merged once here instead of on the first keystroke.
+        self._short_prefixes: Dict[str, np.ndarray] = {}
+        for length in range(1, SHORT_PREFIX_LENGTH + 1):
+            groups: Dict[str, List[int]] = defaultdict(list)
+            for position, word in enumerate(self.vocab):
+                groups[word[:length]].append(position)
+            for prefix, positions in groups.items():
+                self._short_prefixes[prefix] = self._union(positions)
+
+        words_by_trigram: Dict[str, List[int]] = defaultdict(list)
+        for position, word in enumerate(self.vocab):
+            for gram in _trigrams(word):
+                words_by_trigram[gram].append(position)
+        self._trigram_words = {gram: np.array(words, dtype=np.int32) for gram, words in words_by_trigram.items()}
+
+        self._prefix_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _union(self, positions: Sequence[int]) -> np.ndarray:
+        if len(positions) == 1:
+            return self.postings[positions[0]]
+        return np.unique(np.concatenate([self.postings[position] for position in positions]))
+
+    def _prefix_rows(self, prefix: str) -> np.ndarray:
+        short = self._short_prefixes.get(prefix)
+        if short is not None:
+            return short
+        with self._lock:
+            cached = self._prefix_cache.get(prefix)
+            if cached is not None:
+                self._prefix_cache.move_to_end(prefix)
+                return cached
+
+        start = bisect_left(self.vocab, prefix)
+        end = bisect_left(self.vocab, prefix + "\uffff", start)
+        if end > start:
+            rows = self._union(range(start, end))
+        else:
+            rows = self._typo_rows(prefix)
+
+        with self._lock:
+            self._prefix_cache[prefix] = rows
+            while len(self._prefix_cache) > PREFIX_CACHE_SIZE:
+                self._prefix_cache.popitem(last=False)
+        return rows
+
+    def _typo_rows(self, word: str) -> np.ndarray:
+        if len(word) < 3:
+            return np.empty(0, dtype=np.int32)
+        grams = _trigrams(word)
+        hits = [self._trigram_words[gram] for gram in grams if gram in self._trigram_words]
+        if not hits:
+            return np.empty(0, dtype=np.int32)
+        candidates, shared = np.unique(np.concatenate(hits), return_counts=True)
+        # Dice coefficient; a padded word of length n has n + 1 trigrams.
+        similarity = 2 * shared / (len(grams) + self._word_lengths[candidates] + 1)
+        close = similarity >= TYPO_MIN_SIMILARITY
+        candidates, similarity = candidates[close], similarity[close]
+        if not len(candidates):
+            return np.empty(0, dtype=np.int32)
+        best = np.argsort(-similarity, kind="stable")[:TYPO_MAX_WORDS]
+        return self._union(candidates[best].tolist())
+
+    def match_rows(self, query: str) -> np.ndarray:
+        """Rows whose names contain every query word as a prefix (or a close misspelling)."""
+        words = set(tokenize(query))
+        if not words:
+            return np.empty(0, dtype=np.int32)
+        # Smallest set first; a much larger set is probed by binary search rather
+        # than merged, so "chicken b" never sorts every food starting with "b".
+        row_sets = sorted((self._prefix_rows(word) for word in words), key=len)
+        matches = row_sets[0]
+        for rows in row_sets[1:]:
+            if not len(matches):
+                break
+            if len(rows) > 8 * len(matches):
+                matches = matches[_contains(rows, matches)]
+            else:
+                matches = np.intersect1d(matches, rows, assume_unique=True)
+        return matches
+
+    def rows_for_ids(self, food_ids: Sequence[int]) -> np.ndarray:
+        """Map food ids to rows; ids that are not indexed map to -1."""
+        ids = np.asarray(food_ids, dtype=np.int64)
+        positions = np.searchsorted(self._sorted_ids, ids)
+        positions = np.clip(positions, 0, max(len(self._sorted_ids) - 1, 0))
+        found = len(self._sorted_ids) > 0
+        rows = np.where(found & (self._sorted_ids[positions] == ids), self._sorted_rows[positions], -1)
+        return rows.astype(np.int32)
+
+    def search(self, query: str, limit: int = 10, boosted_ids: Sequence[int] = ()) -> List[AutocompleteMatch]:
+        """Best ``limit`` matches; foods in ``boosted_ids`` (best first) that match rank first."""
+        matches = self.match_rows(query)
+        if not len(matches) or limit <= 0:
+            return []
+
+        results: List[AutocompleteMatch] = []
+        seen = set()
+        if len(boosted_ids):
+            boosted_rows = self.rows_for_ids(boosted_ids)
+            hit = _contains(matches, boosted_rows)
+            for food_id, row in zip(np.asarray(boosted_ids)[hit].tolist(), boosted_rows[hit].tolist()):
+                results.append(AutocompleteMatch(int(food_id), self.names[row], True))
+                seen.add(row)
+                if len(results) >= limit:
+                    return results
+
+        for row in matches[: limit + len(seen)].tolist():
+            if row in seen:
+                continue
+            results.append(AutocompleteMatch(int(self.ids[row]), self.names[row], False))
+            if len(results) >= limit:
+                break
+        return results
+
+
+_index: Optional[FoodNameIndex] = None
+_checked_at = 0.0
+_rebuilding = False
+_state_lock = threading.Lock()
+
+
+def _catalog_version() -> tuple:
+    return tuple(db.session.execute(select(func.count(Food.id), func.max(Food.id))).one())
+
+
+def build_food_autocomplete_index(version: Optional[tuple] = None) -> FoodNameIndex:
+    """Build a fresh index from the ``food`` table and make it the active one."""
+    global _index, _checked_at
+    version = version if version is not None else _catalog_version()
+    foods = [
+        (food_id, name)
+        for food_id, name in db.session.query(Food.id, Food.name).yield_per(_LOAD_CHUNK_SIZE)
+        if name
+    ]
+    index = FoodNameIndex(version, foods)
+    with _state_lock:
+        _index = index
+        _checked_at = time.monotonic()
+    return index
+
+
+def _rebuild_in_background(app, version: Optional[tuple] = None) -> None:
+    global _rebuilding
+    try:
+        with app.app_context():
+            build_food_autocomplete_index(version)
+    except Exception:
+        app.logger.exception("Building the food autocomplete index failed")
+    finally:
+        with _state_lock:
+            _rebuilding = False
+
+
+def _start_rebuild(app, version: Optional[tuple] = None) -> None:
+    """Build the index in a background thread unless a build is already running."""
+    global _rebuilding
+    with _state_lock:
+        if _rebuilding:
+            return
+        _rebuilding = True
+    threading.Thread(target=_rebuild_in_background, args=(app, version), daemon=True).start()
+
+
+def food_autocomplete_index() -> Optional[FoodNameIndex]:
+    """Return the active index, or ``None`` while the first build is running.
+
+    A cold lookup starts that build in a background thread rather than
+    holding its request for the seconds a large catalog takes. Once built, a
+    changed catalog (count or max id) triggers a background rebuild and the
+    current index keeps answering until it lands.
+    """
+    global _checked_at
+    with _state_lock:
+        index = _index
+        fresh = index is not None and time.monotonic() - _checked_at < AUTOCOMPLETE_RECHECK_SECONDS
+    if fresh:
+        return index
+    if index is None:
+        _start_rebuild(current_app._get_current_object())
+        return None
+
+    version = _catalog_version()
+    with _state_lock:
+        _checked_at = time.monotonic()
+        if version == index.version:
+            return index
+    _start_rebuild(current_app._get_current_object(), version)
+    return index
+
+
+def refresh_food_autocomplete() -> None:
+    """Mark the index stale so the next lookup rechecks the catalog (call after imports)."""
+    global _checked_at
+    with _state_lock:
+        _checked_at = 0.0
+
+
+def init_food_autocomplete(app) -> None:
+    """Optionally build the index in the background when the app starts.
+
+    Enabled with ``FOOD_AUTOCOMPLETE_PRELOAD`` (off so CLI commands and
+    migrations never load the catalog); otherwise the first lookup starts the
+    build and gets no matches until it lands.
+    """
+    app.config.setdefault("FOOD_AUTOCOMPLETE_PRELOAD", False)
+    if app.config["FOOD_AUTOCOMPLETE_PRELOAD"]:
+        _start_rebuild(app)
+
+
+def autocomplete_foods(query: str, limit: int = 8, user_id: Optional[int] = None, today=None) -> List[AutocompleteMatch]:
+    """Typeahead matches for ``query``, with the member's recent foods first when ``user_id`` is given.
+
+    Empty until the index has been built once in this process.
+    """
+    if not tokenize(query):
+        return []
+    index = food_autocomplete_index()
+    if index is None:
+        return []
+    boosted: List[int] = []
+    if user_id is not None and today is not None:
+        since = datetime.combine(today - timedelta(days=RECENT_FOOD_DAYS), datetime.min.time())
+        boosted = recent_food_ids(user_id, RECENT_FOOD_LIMIT, since=since)
+    return index.search(query, limit=limit, boosted_ids=boosted)
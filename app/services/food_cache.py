@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from app.models import Food, FoodMeasure
+from app.services.exercise_catalog import bump_catalog_version, catalog_version
+from app.services.units import UnitConversion, compile_food_units, resolve_unit, unit_key
+
+FOOD_CACHE_SIZE = 4096
+# CatalogVersion row bumped by measure imports, and how often each process checks it.
+FOOD_CATALOG = "food"
+FOOD_RECHECK_SECONDS = 30.0
+# Keep IN (...) lists comfortably below SQLite's bound-parameter limit
+_ID_CHUNK_SIZE = 500
+
+
+class FoodProfile(NamedTuple):
+    """Immutable snapshot of a food's nutrient data and household measures.
+
+    Attribute names mirror ``Food`` so a profile can be passed anywhere a food
+    is scaled (``scale_food_nutrients`` only reads these fields).
+    """
+    id: int
+    name: str
+    calories: Optional[float]
+    protein_g: Optional[float]
+    carbs_g: Optional[float]
+    fats_g: Optional[float]
+    serving_size: Optional[float]
+    serving_unit: Optional[str]
+    grams_per_unit: Optional[float]
+    measures: Tuple[Tuple[str, float], ...]
+    # {unit key: grams} compiled from the measures and any overrides, see ``units.unit_key``
+    unit_map: Dict[str, float]
+
+
+_profiles: "OrderedDict[int, FoodProfile]" = OrderedDict()
+_version: Optional[int] = None
+_checked_at = 0.0
+_lock = Lock()
+
+
+def _recheck_version() -> None:
+    """Drop every profile once another process bumped the food catalog version.
+
+    Costs a one-row primary-key read every ``FOOD_RECHECK_SECONDS``.
+    """
+    global _version, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if now - _checked_at < FOOD_RECHECK_SECONDS:
+            return
+        _checked_at = now
+    version = catalog_version(FOOD_CATALOG)
+    with _lock:
+        if version != _version:
+            _profiles.clear()
+            _version = version
+
+
+def _build_profile(food: Food, measures) -> FoodProfile:
+    ordered = tuple(
+        (measure.measure_name, float(measure.grams))
+        for measure in measures
+        if measure.measure_name and measure.grams
+    )
+    return FoodProfile(
+        id=food.id,
+        name=food.name,
+        calories=food.calories,
+        protein_g=food.protein_g,
+        carbs_g=food.carbs_g,
+        fats_g=food.fats_g,
+        serving_size=food.serving_size,
+        serving_unit=food.serving_unit,
+        grams_per_unit=food.grams_per_unit,
+        measures=ordered,
+        unit_map=compile_food_units(food.name, ordered),
+    )
+
+
+def _remember(profile: FoodProfile) -> None:
+    with _lock:
+        _profiles[profile.id] = profile
+        _profiles.move_to_end(profile.id)
+        while len(_profiles) > FOOD_CACHE_SIZE:
+            _profiles.popitem(last=False)
+
+
+def get_food_profile(food_id: Optional[int]) -> Optional[FoodProfile]:
+    """Return the cached profile for a food, loading it (and its measures) on a miss."""
+    if food_id is None:
+        return None
+    try:
+        food_id = int(food_id)
+    except (TypeError, ValueError):
+        return None
+
+    _recheck_version()
+    with _lock:
+        profile = _profiles.get(food_id)
+        if profile is not None:
+            _profiles.move_to_end(food_id)
+            return profile
+
+    food = Food.query.get(food_id)
+    if not food:
+        return None
+    measures = FoodMeasure.query.filter_by(food_id=food_id).order_by(FoodMeasure.id.asc()).all()
+    profile = _build_profile(food, measures)
+    _remember(profile)
+    return profile
+
+
+def get_food_profiles(food_ids: Iterable[Optional[int]]) -> Dict[int, FoodProfile]:
+    """Return cached profiles for many foods, loading all misses with two queries per chunk.
+
+    Unknown ids are left out of the result.
+    """
+    wanted = set()
+    for food_id in food_ids:
+        try:
+            wanted.add(int(food_id))
+        except (TypeError, ValueError):
+            continue
+
+    found: Dict[int, FoodProfile] = {}
+    _recheck_version()
+    with _lock:
+        for food_id in wanted:
+            profile = _profiles.get(food_id)
+            if profile is not None:
+                _profiles.move_to_end(food_id)
+                found[food_id] = profile
+
+    missing = sorted(wanted - found.keys())
+    for start in range(0, len(missing), _ID_CHUNK_SIZE):
+        chunk = missing[start:start + _ID_CHUNK_SIZE]
+        measures_by_food: Dict[int, list] = {food_id: [] for food_id in chunk}
+        for measure in (
+            FoodMeasure.query
+            .filter(FoodMeasure.food_id.in_(chunk))
+            .order_by(FoodMeasure.id.asc())
+        ):
+            measures_by_food[measure.food_id].append(measure)
+        for food in Food.query.filter(Food.id.in_(chunk)):
+            profile = _build_profile(food, measures_by_food[food.id])
+            _remember(profile)
+            found[food.id] = profile
+    return found
+
+
+def measure_grams(food_id: Optional[int], unit: Optional[str]) -> Optional[float]:
+    """Return grams for one ``unit`` of a food's own measure, or ``None`` if it has none."""
+    profile = get_food_profile(food_id)
+    if not profile or not unit:
+        return None
+    return profile.unit_map.get(unit_key(unit))
+
+
+def unit_conversion(food_id: Optional[int], unit: Optional[str]) -> UnitConversion:
+    """Grams and millilitres in one ``unit`` of a food: its own measures first, then global units."""
+    profile = get_food_profile(food_id) if unit_key(unit) not in ("", "g") else None
+    return resolve_unit(profile.unit_map if profile else None, unit)
+
+
+def grams_for(food_id: Optional[int], quantity: float, unit: Optional[str]) -> float:
+    """Convert ``quantity`` of ``unit`` to grams, treating unknown units as grams."""
+    grams_per_unit = unit_conversion(food_id, unit).grams
+    return quantity * grams_per_unit if grams_per_unit else quantity
+
+
+def invalidate_food(food_id: Optional[int] = None) -> None:
+    """Drop one cached food, or the whole cache when ``food_id`` is ``None``.
+
+    Only affects this process; scripts that change measures call
+    ``bump_food_version`` so running servers drop theirs too.
+    """
+    with _lock:
+        if food_id is None:
+            _profiles.clear()
+        else:
+            _profiles.pop(int(food_id), None)
+
+
+def bump_food_version() -> None:
+    """Make every process drop its cached profiles. Call in the same transaction as the change."""
+    bump_catalog_version(FOOD_CATALOG)
+    invalidate_food()
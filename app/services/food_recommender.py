@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Dict, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Food
+from app.services.nutrition import NUTRIENT_KEYS, food_table_row
+
+# Portion sizes considered for a recommendation, in grams.
+MIN_PORTION_GRAMS = 10.0
+MAX_PORTION_GRAMS = 500.0
+PORTION_STEP_GRAMS = 5.0
+# Remaining amounts below this are treated as this much when weighting errors, so a
+# nearly-closed macro is "keep it low" rather than a division by zero.
+WEIGHT_FLOORS = {"calories": 50.0, "protein": 5.0, "carbs": 5.0, "fats": 3.0}
+# How often the loaded matrix checks whether the Food table changed.
+MATRIX_RECHECK_SECONDS = 60.0
+_LOAD_CHUNK_SIZE = 20000
+
+
+class FoodMatrix(NamedTuple):
+    """Per-gram nutrient densities for the whole catalog, one column per food."""
+    version: tuple
+    ids: np.ndarray        # int64, shape (n,)
+    names: List[str]
+    densities: np.ndarray  # float64, shape (4, n), rows in NUTRIENT_KEYS order
+    squares: np.ndarray    # densities ** 2, kept for the least-squares fit
+
+
+class Recommendation(NamedTuple):
+    food_id: int
+    name: str
+    grams: float
+    nutrients: Dict[str, float]
+    score: float
+
+
+_matrix: Optional[FoodMatrix] = None
+_checked_at = 0.0
+_lock = Lock()
+
+
+def _catalog_version() -> tuple:
+    return tuple(db.session.execute(select(func.count(Food.id), func.max(Food.id))).one())
+
+
+def _densities(table: np.ndarray) -> np.ndarray:
+    # Same rules as scale_food_nutrients: calories come from the macros when there are any.
+    protein, carbs, fats, calories, serving = (table[:, column] for column in range(5))
+    macro_calories = (protein * 4) + (carbs * 4) + (fats * 9)
+    per_serving = np.column_stack([
+        np.where(macro_calories != 0, macro_calories, calories),
+        protein,
+        carbs,
+        fats,
+    ])
+    return per_serving / serving[:, None]
+
+
+def _load_matrix(version: tuple) -> FoodMatrix:
+    ids: List[int] = []
+    names: List[str] = []
+    rows: List[list] = []
+    query = (
+        db.session.query(
+            Food.id, Food.name, Food.protein_g, Food.carbs_g, Food.fats_g,
+            Food.calories, Food.serving_size, Food.grams_per_unit,
+        )
+        .order_by(Food.id)
+        .yield_per(_LOAD_CHUNK_SIZE)
+    )
+    for food in query:
+        ids.append(food.id)
+        names.append(food.name)
+        rows.append(food_table_row(food))
+
+    table = np.array(rows, dtype=np.float64).reshape(-1, 5)
+    densities = _densities(table)
+    # Foods without any nutrient data can never fill a gap.
+    keep = np.any(densities > 0, axis=1)
+    columns = np.ascontiguousarray(densities[keep].T)
+    return FoodMatrix(
+        version=version,
+        ids=np.array(ids, dtype=np.int64)[keep],
+        names=[name for name, kept in zip(names, keep.tolist()) if kept],
+        densities=columns,
+        squares=columns ** 2,
+    )
+
+
+def food_matrix() -> FoodMatrix:
+    """Return the process-wide nutrient matrix, reloading it when foods were added or removed."""
+    global _matrix, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _matrix is not None and now - _checked_at < MATRIX_RECHECK_SECONDS:
+            return _matrix
+    version = _catalog_version()
+    with _lock:
+        _checked_at = now
+        if _matrix is not None and _matrix.version == version:
+            return _matrix
+    matrix = _load_matrix(version)
+    with _lock:
+        _matrix = matrix
+        _checked_at = time.monotonic()
+    return matrix
+
+
+def invalidate_food_matrix() -> None:
+    """Force the next recommendation to reload the matrix (call after bulk food imports)."""
+    global _matrix
+    with _lock:
+        _matrix = None
+
+
+def recommend_foods(remaining: Mapping[str, Optional[float]], limit: int = 10) -> List[Recommendation]:
+    """Rank catalog foods and portion sizes by how well they fill the remaining macros.
+
+    ``remaining`` maps ``NUTRIENT_KEYS`` to what is left for the day; ``None``
+    leaves a macro out of the fit. Each food gets the portion (rounded to
+    ``PORTION_STEP_GRAMS`` within the min/max portion) that minimises the
+    squared error relative to each remaining amount, so overshooting a
+    nearly-closed macro (fat, say) costs far more than missing a large one.
+    """
+    matrix = food_matrix()
+    if not len(matrix.ids) or limit <= 0:
+        return []
+
+    targets = np.array([max(float(remaining.get(key) or 0.0), 0.0) for key in NUTRIENT_KEYS])
+    weights = np.array([
+        0.0 if remaining.get(key) is None else 1.0 / max(targets[index], WEIGHT_FLOORS[key])
+        for index, key in enumerate(NUTRIENT_KEYS)
+    ])
+    if not weights.any():
+        return []
+
+    # With per-macro weights w, targets r and densities d, the error of g grams is
+    # sum_k w_k^2 (g d_k - r_k)^2 = g^2 * denominator - 2 g * numerator + constant,
+    # so the best portion and its score need only two matrix-vector products.
+    weights_sq = weights ** 2
+    numerator = (weights_sq * targets) @ matrix.densities
+    denominator = weights_sq @ matrix.squares
+    with np.errstate(divide="ignore", invalid="ignore"):
+        grams = numerator / denominator
+    grams = np.nan_to_num(grams, nan=MIN_PORTION_GRAMS, posinf=MIN_PORTION_GRAMS)
+    grams = np.clip(np.round(grams / PORTION_STEP_GRAMS) * PORTION_STEP_GRAMS, MIN_PORTION_GRAMS, MAX_PORTION_GRAMS)
+
+    constant = float(weights_sq @ targets ** 2)
+    scores = grams * (grams * denominator - 2 * numerator) + constant
+
+    limit = min(limit, len(scores))
+    best = np.argpartition(scores, limit - 1)[:limit]
+    best = best[np.argsort(scores[best], kind="stable")]
+
+    results = []
+    for index in best.tolist():
+        portion = float(grams[index])
+        nutrients = matrix.densities[:, index] * portion
+        results.append(Recommendation(
+            food_id=int(matrix.ids[index]),
+            name=matrix.names[index],
+            grams=portion,
+            nutrients={key: round(float(value), 1) for key, value in zip(NUTRIENT_KEYS, nutrients)},
+            score=round(float(scores[index]), 4),
+        ))
+    return results
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import inspect, text
+
+from app import db
+from app.models import Food
+
+FOOD_SEARCH_TABLE = "food_fts"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# food_fts is an external-content table: these triggers keep it in step with
+# every insert, rename and delete on ``food``, however the row was written.
+_SYNC_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS food_fts_ai AFTER INSERT ON food BEGIN "
+    f"INSERT INTO {FOOD_SEARCH_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS food_fts_ad AFTER DELETE ON food BEGIN "
+    f"INSERT INTO {FOOD_SEARCH_TABLE}({FOOD_SEARCH_TABLE}, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS food_fts_au AFTER UPDATE OF id, name ON food BEGIN "
+    f"INSERT INTO {FOOD_SEARCH_TABLE}({FOOD_SEARCH_TABLE}, rowid, name) VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {FOOD_SEARCH_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+)
+_index_available: Optional[bool] = None
+
+
+def _dialect() -> str:
+    return db.engine.dialect.name
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words of ``text``; the word split every food and exercise index uses."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def search_index_available() -> bool:
+    """Whether the database has a usable full-text index for food names.
+
+    SQLite needs the ``food_fts`` table; Postgres relies on expression
+    indexes and is always considered available.
+    """
+    global _index_available
+    if _index_available is None:
+        if _dialect() == "sqlite":
+            _index_available = inspect(db.engine).has_table(FOOD_SEARCH_TABLE)
+        else:
+            _index_available = _dialect() == "postgresql"
+    return _index_available
+
+
+def ensure_food_search_index() -> None:
+    """Create the SQLite FTS5 table and its sync triggers when missing (no-op elsewhere).
+
+    Foods written before the table existed are not in it until
+    ``rebuild_food_search_index`` runs.
+    """
+    global _index_available
+    if _dialect() != "sqlite":
+        return
+    db.session.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FOOD_SEARCH_TABLE} USING fts5("
+        "name, content='food', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    for statement in _SYNC_TRIGGERS:
+        db.session.execute(text(statement))
+    db.session.commit()
+    _index_available = True
+
+
+def rebuild_food_search_index() -> None:
+    """Repopulate the full-text index from the ``food`` table."""
+    if _dialect() != "sqlite":
+        return
+    ensure_food_search_index()
+    db.session.execute(text(f"INSERT INTO {FOOD_SEARCH_TABLE}({FOOD_SEARCH_TABLE}) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def _sqlite_ids(tokens: List[str], limit: int) -> List[int]:
+    match = " ".join(f'"{token}"*' for token in tokens)
+    rows = db.session.execute(
+        text(
+            f"SELECT {FOOD_SEARCH_TABLE}.rowid FROM {FOOD_SEARCH_TABLE} "
+            f"JOIN food ON food.id = {FOOD_SEARCH_TABLE}.rowid "
+            f"WHERE {FOOD_SEARCH_TABLE} MATCH :match "
+            f"ORDER BY bm25({FOOD_SEARCH_TABLE}), length(food.name), food.id "
+            "LIMIT :limit"
+        ),
+        {"match": match, "limit": limit},
+    )
+    return [row[0] for row in rows]
+
+
+def _postgres_ids(query: str, tokens: List[str], limit: int) -> List[int]:
+    ts_query = " & ".join(f"{token}:*" for token in tokens)
+    rows = db.session.execute(
+        text(
+            "SELECT id FROM food "
+            "WHERE to_tsvector('simple', name) @@ to_tsquery('simple', :ts_query) "
+            "ORDER BY ts_rank(to_tsvector('simple', name), to_tsquery('simple', :ts_query)) DESC, "
+            "similarity(name, :query) DESC, length(name), id "
+            "LIMIT :limit"
+        ),
+        {"ts_query": ts_query, "query": query, "limit": limit},
+    )
+    return [row[0] for row in rows]
+
+
+def find_foods(query: str, limit: int = 10) -> List[Food]:
+    """Return foods whose name matches every word of ``query`` as a prefix, best match first.
+
+    Falls back to a plain ``ILIKE`` scan when no full-text index exists.
+    """
+    query = (query or "").strip()
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    if not search_index_available():
+        return (
+            Food.query
+            .filter(Food.name.ilike(f"%{query}%"))
+            .limit(limit)
+            .all()
+        )
+
+    if _dialect() == "sqlite":
+        ids = _sqlite_ids(tokens, limit)
+    else:
+        ids = _postgres_ids(query, tokens, limit)
+    if not ids:
+        return []
+
+    foods = {food.id: food for food in Food.query.filter(Food.id.in_(ids)).all()}
+    return [foods[food_id] for food_id in ids if food_id in foods]
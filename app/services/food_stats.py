@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+
+from app import db
+from app.models import UserFoodLog, UserFoodStats
+from app.services.food_cache import get_food_profiles
+from app.services.upserts import conflict_insert
+
+# Candidates considered for the quick-log list, most recently logged first.
+QUICK_LOG_CANDIDATES = 40
+# A food logged this many days ago counts half as much as one logged today.
+QUICK_LOG_HALF_LIFE_DAYS = 7.0
+
+_STATS = UserFoodStats.__table__
+_STATS_BY_FOOD = update(_STATS).where(
+    _STATS.c.user_id == bindparam("match_user"),
+    _STATS.c.food_id == bindparam("match_food"),
+)
+
+
+class QuickLogFood(NamedTuple):
+    food_id: int
+    name: str
+    quantity: float
+    unit: str
+    log_count: int
+
+
+def record_food_stats(user_id: int, entries: Iterable[Tuple[int, float, Optional[str]]]) -> None:
+    """Count ``(food_id, quantity, unit)`` entries the member just logged.
+
+    Pass what the member entered (``1 cup``), not the stored grams, so the
+    quick-log list can repeat it. The last entry per food wins. Call before
+    committing the logs.
+    """
+    latest: Dict[int, Tuple[float, str]] = {}
+    counts: Dict[int, int] = {}
+    for food_id, quantity, unit in entries:
+        latest[food_id] = (quantity, unit or "g")
+        counts[food_id] = counts.get(food_id, 0) + 1
+    if not latest:
+        return
+
+    now = datetime.utcnow()
+    upsert = conflict_insert(_STATS)
+    # Increment in SQL so concurrent writers do not lose counts, and so two
+    # first logs of the same food do not both insert; one executemany.
+    db.session.execute(
+        upsert.on_conflict_do_update(
+            index_elements=["user_id", "food_id"],
+            set_={
+                "log_count": _STATS.c.log_count + upsert.excluded.log_count,
+                "last_logged_at": upsert.excluded.last_logged_at,
+                "last_quantity": upsert.excluded.last_quantity,
+                "last_unit": upsert.excluded.last_unit,
+            },
+        ),
+        [
+            {
+                "user_id": user_id,
+                "food_id": food_id,
+                "log_count": counts[food_id],
+                "last_logged_at": now,
+                "last_quantity": quantity,
+                "last_unit": unit,
+            }
+            for food_id, (quantity, unit) in latest.items()
+        ],
+    )
+
+
+def discard_food_stats(user_id: int, food_ids: Iterable[int]) -> None:
+    """Uncount deleted logs; a food whose count reaches zero leaves the list."""
+    counts: Dict[int, int] = {}
+    for food_id in food_ids:
+        counts[food_id] = counts.get(food_id, 0) + 1
+    if not counts:
+        return
+    db.session.execute(
+        _STATS_BY_FOOD.values(log_count=_STATS.c.log_count - bindparam("removed")),
+        [{"match_user": user_id, "match_food": food_id, "removed": count} for food_id, count in counts.items()],
+    )
+    db.session.execute(
+        delete(UserFoodStats)
+        .where(UserFoodStats.user_id == user_id, UserFoodStats.food_id.in_(counts))
+        .where(UserFoodStats.log_count <= 0)
+    )
+
+
+def recent_food_ids(user_id: int, limit: int, since: Optional[datetime] = None) -> List[int]:
+    """The member's foods, most recently logged first (one index range scan)."""
+    query = select(UserFoodStats.food_id).where(UserFoodStats.user_id == user_id)
+    if since is not None:
+        query = query.where(UserFoodStats.last_logged_at >= since)
+    query = query.order_by(UserFoodStats.last_logged_at.desc()).limit(limit)
+    return list(db.session.scalars(query))
+
+
+def quick_log_foods(user_id: int, limit: int = 8, now: Optional[datetime] = None) -> List[QuickLogFood]:
+    """The member's go-to foods with the amount they logged last time.
+
+    Recent candidates are ranked by count decayed by age, so a daily staple
+    outranks a one-off from this morning and last month's staple fades out.
+    """
+    now = now or datetime.utcnow()
+    stats = (
+        UserFoodStats.query
+        .filter_by(user_id=user_id)
+        .order_by(UserFoodStats.last_logged_at.desc())
+        .limit(QUICK_LOG_CANDIDATES)
+        .all()
+    )
+
+    def _score(row: UserFoodStats) -> float:
+        age_days = max((now - row.last_logged_at).total_seconds(), 0.0) / 86400
+        return row.log_count * 0.5 ** (age_days / QUICK_LOG_HALF_LIFE_DAYS)
+
+    ranked = sorted(stats, key=_score, reverse=True)[:limit]
+    profiles = get_food_profiles(row.food_id for row in ranked)
+    return [
+        QuickLogFood(
+            food_id=row.food_id,
+            name=profiles[row.food_id].name,
+            quantity=row.last_quantity or 0.0,
+            unit=row.last_unit or "g",
+            log_count=row.log_count,
+        )
+        for row in ranked
+        if row.food_id in profiles and row.last_quantity
+    ]
+
+
+def rebuild_food_stats(user_id: Optional[int] = None) -> int:
+    """Recreate stats rows from UserFoodLog history with one INSERT ... SELECT.
+
+    History only stores grams, so rebuilt rows repeat the last entry in
+    grams. Returns the number of rows written.
+    """
+    delete_query = delete(UserFoodStats)
+    grouped = select(
+        UserFoodLog.user_id,
+        UserFoodLog.food_id,
+        func.count(UserFoodLog.id).label("log_count"),
+        func.max(UserFoodLog.id).label("last_id"),
+    ).group_by(UserFoodLog.user_id, UserFoodLog.food_id)
+    if user_id is not None:
+        delete_query = delete_query.where(UserFoodStats.user_id == user_id)
+        grouped = grouped.where(UserFoodLog.user_id == user_id)
+    grouped = grouped.subquery()
+
+    db.session.execute(delete_query)
+    result = db.session.execute(
+        insert(UserFoodStats).from_select(
+            ["user_id", "food_id", "log_count", "last_logged_at", "last_quantity", "last_unit"],
+            select(
+                grouped.c.user_id,
+                grouped.c.food_id,
+                grouped.c.log_count,
+                func.coalesce(UserFoodLog.created_at, func.current_timestamp()),
+                UserFoodLog.quantity,
+                UserFoodLog.unit,
+            ).join(UserFoodLog, UserFoodLog.id == grouped.c.last_id),
+        )
+    )
+    db.session.commit()
+    return result.rowcount
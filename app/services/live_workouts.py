@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+
+from app import db
+from app.models import ExerciseTemplate, WorkoutSession, WorkoutSet
+from app.services.muscle_volume import record_workout_volume
+from app.services.personal_records import record_session_records
+from app.services.workout_snapshots import record_workout_snapshot, session_exercises
+
+MAX_CLIENT_ID_LENGTH = 64
+MAX_SETS_PER_REQUEST = 200
+SUMMARY_MAX_LENGTH = 250
+
+_SETS = WorkoutSet.__table__
+_SET_BY_CLIENT_ID = update(_SETS).where(
+    _SETS.c.session_id == bindparam("match_session"),
+    _SETS.c.client_id == bindparam("match_client"),
+)
+# Fields a set payload may carry, mapped to their columns.
+_SET_FIELDS = {
+    "templateExerciseId": "template_exercise_id",
+    "name": "exercise_name",
+    "setNumber": "set_number",
+    "reps": "reps",
+    "weight": "weight",
+}
+
+
+class LiveSet(NamedTuple):
+    client_id: str
+    template_exercise_id: Optional[int]
+    name: str
+    set_number: int
+    reps: Optional[int]
+    weight: Optional[float]
+
+    def columns(self) -> Dict[str, object]:
+        return {
+            "template_exercise_id": self.template_exercise_id,
+            "exercise_name": self.name,
+            "set_number": self.set_number,
+            "reps": self.reps if self.reps is not None else 0,
+            "weight": self.weight,
+        }
+
+
+def optional_number(value: object, kind: type, label: str):
+    """``kind(value)``, or None when blank; anything else raises ValueError naming ``label``."""
+    if value in (None, ""):
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} must be a number.")
+
+
+def _field_value(field: str, value: object):
+    if field == "templateExerciseId":
+        return optional_number(value, int, "templateExerciseId")
+    if field == "name":
+        name = str(value or "").strip()
+        if not name:
+            raise ValueError("Each set needs an exercise name.")
+        return name[:200]
+    if field == "setNumber":
+        return optional_number(value, int, "setNumber") or 1
+    if field == "reps":
+        return optional_number(value, int, "Reps")
+    return optional_number(value, float, "Weight")
+
+
+def parse_client_id(value: object) -> str:
+    client_id = str(value or "").strip()
+    if not client_id or len(client_id) > MAX_CLIENT_ID_LENGTH:
+        raise ValueError(f"Each set needs a clientId of 1-{MAX_CLIENT_ID_LENGTH} characters.")
+    return client_id
+
+
+def parse_live_sets(payload: object) -> List[LiveSet]:
+    """Validate ``{"sets": [{"clientId", "templateExerciseId", "name", "setNumber", "reps", "weight"}]}``.
+
+    Sets with neither reps nor weight are dropped, as in a submitted
+    workout. A clientId repeated in one request keeps its last entry.
+    Raises ``ValueError`` with a user-facing message.
+    """
+    items = payload.get("sets") if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        raise ValueError("Expected a list of sets.")
+    if len(items) > MAX_SETS_PER_REQUEST:
+        raise ValueError(f"At most {MAX_SETS_PER_REQUEST} sets can be saved at once.")
+
+    parsed: Dict[str, LiveSet] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("Each set must be an object.")
+        live_set = LiveSet(
+            client_id=parse_client_id(item.get("clientId")),
+            template_exercise_id=_field_value("templateExerciseId", item.get("templateExerciseId")),
+            name=_field_value("name", item.get("name")),
+            set_number=_field_value("setNumber", item.get("setNumber")),
+            reps=_field_value("reps", item.get("reps")),
+            weight=_field_value("weight", item.get("weight")),
+        )
+        if live_set.reps is None and live_set.weight is None:
+            continue
+        parsed.pop(live_set.client_id, None)
+        parsed[live_set.client_id] = live_set
+    return list(parsed.values())
+
+
+def parse_set_changes(payload: object) -> Dict[str, object]:
+    """Validate a partial set update; returns ``{column: value}`` for the fields present."""
+    if not isinstance(payload, dict):
+        raise ValueError("Expected a JSON object.")
+    changes = {
+        column: _field_value(field, payload[field])
+        for field, column in _SET_FIELDS.items()
+        if field in payload
+    }
+    if not changes:
+        raise ValueError("Nothing to update.")
+    if "reps" in changes and changes["reps"] is None:
+        changes["reps"] = 0
+    return changes
+
+
+def live_session_for(user_id: int, template_id: int) -> Optional[WorkoutSession]:
+    """The member's unfinished session of a template, if a tab left one open."""
+    return (
+        WorkoutSession.query
+        .filter_by(user_id=user_id, template_id=template_id, completed_at=None)
+        .order_by(WorkoutSession.started_at.desc(), WorkoutSession.id.desc())
+        .first()
+    )
+
+
+def stored_sets(session_id: int) -> List[WorkoutSet]:
+    return WorkoutSet.query.filter_by(session_id=session_id).order_by(WorkoutSet.id).all()
+
+
+def live_set_payload(sets: Sequence[WorkoutSet]) -> List[Dict[str, object]]:
+    return [
+        {
+            "clientId": workout_set.client_id,
+            "templateExerciseId": workout_set.template_exercise_id,
+            "name": workout_set.exercise_name,
+            "setNumber": workout_set.set_number,
+            "reps": workout_set.reps,
+            "weight": workout_set.weight,
+        }
+        for workout_set in sets
+    ]
+
+
+def save_live_sets(session: WorkoutSession, sets: Sequence[LiveSet]) -> int:
+    """Append sets to an unfinished session, updating any whose clientId is already stored.
+
+    Retrying a save therefore never duplicates a set. One lookup, then one
+    executemany UPDATE and one executemany INSERT. The caller commits.
+    """
+    if not sets:
+        return 0
+    existing = set(db.session.scalars(
+        select(WorkoutSet.client_id)
+        .where(WorkoutSet.session_id == session.id, WorkoutSet.client_id.in_([item.client_id for item in sets]))
+    ))
+    updates = [item for item in sets if item.client_id in existing]
+    if updates:
+        db.session.execute(
+            _SET_BY_CLIENT_ID.values({column: bindparam(column) for column in _SET_FIELDS.values()}),
+            [{"match_session": session.id, "match_client": item.client_id, **item.columns()} for item in updates],
+        )
+    new_rows = [
+        {"session_id": session.id, "client_id": item.client_id, **item.columns()}
+        for item in sets
+        if item.client_id not in existing
+    ]
+    if new_rows:
+        db.session.execute(insert(WorkoutSet), new_rows)
+    return len(sets)
+
+
+def update_live_set(session: WorkoutSession, client_id: str, changes: Mapping[str, object]) -> bool:
+    """Patch one stored set; ``False`` when no set has that clientId."""
+    result = db.session.execute(
+        update(WorkoutSet)
+        .where(WorkoutSet.session_id == session.id, WorkoutSet.client_id == client_id)
+        .values(dict(changes))
+    )
+    return bool(result.rowcount)
+
+
+def delete_live_set(session: WorkoutSession, client_id: str) -> None:
+    db.session.execute(
+        delete(WorkoutSet).where(WorkoutSet.session_id == session.id, WorkoutSet.client_id == client_id)
+    )
+
+
+def workout_summary(exercises: Sequence[dict]) -> str:
+    """One line per exercise: set count and the first set, e.g. ``Bench: 3 set(s) × 8 @ 135 lbs``."""
+    parts = []
+    for exercise in exercises:
+        sets = exercise["sets"]
+        first = sets[0]
+        rep_part = f"{first['reps']}" if first['reps'] is not None else '—'
+        weight_part = ''
+        if first['weight'] is not None:
+            weight_part = f" @ {round(first['weight'], 1)} lbs"
+        parts.append(f"{exercise['name']}: {len(sets)} set(s) × {rep_part}{weight_part}")
+    summary = '; '.join(parts)
+    if len(summary) > SUMMARY_MAX_LENGTH:
+        summary = summary[:SUMMARY_MAX_LENGTH - 3] + '...'
+    return summary
+
+
+def finish_workout(
+    session: WorkoutSession,
+    template: Optional[ExerciseTemplate],
+    exercises: List[dict],
+    logged_sets: Sequence[Tuple[str, Optional[int], Optional[float]]],
+) -> List[str]:
+    """Stamp a session complete and fold it into records, snapshots and weekly volume.
+
+    ``exercises`` is the performed payload in order (see
+    ``record_workout_snapshot``) and ``logged_sets`` the ``(name, reps,
+    weight)`` of every set. Returns exercises with a new personal record.
+    The caller commits.
+    """
+    session.completed_at = datetime.utcnow()
+    session.summary = workout_summary(exercises)
+    new_records = record_session_records(session.user_id, session.completed_at, logged_sets)
+    record_workout_snapshot(session, template, exercises)
+    record_workout_volume(session)
+    return new_records
+
+
+def complete_live_session(session: WorkoutSession, template: Optional[ExerciseTemplate]) -> Optional[List[str]]:
+    """Finish an autosaved session from its stored sets; ``None`` when it has no sets.
+
+    The caller commits.
+    """
+    sets = stored_sets(session.id)
+    if not sets:
+        return None
+    exercises = session_exercises(sets)
+    logged_sets = [(item.exercise_name, item.reps, item.weight) for item in sets]
+    return finish_workout(session, template, exercises, logged_sets)
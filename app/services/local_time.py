@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# Member-facing days are Eastern calendar days; timestamps are stored as naive UTC.
+EASTERN_TZ = ZoneInfo("America/New_York")
+
+
+def eastern_date(value: Optional[object]) -> Optional[date]:
+    """Normalize a stored (naive UTC) datetime or plain date into an Eastern date."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(EASTERN_TZ).date()
+    return value
+
+
+def utc_start_of(day: date) -> datetime:
+    """Return the naive UTC timestamp at which an Eastern calendar day begins."""
+    local_midnight = datetime.combine(day, time.min, tzinfo=EASTERN_TZ)
+    return local_midnight.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import case, insert, literal, select
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.models import MemberMeal, TrainerMeal, UserFoodLog
+from app.services.food_cache import grams_for
+from app.services.food_stats import record_food_stats
+from app.services.nutrition_totals import TOTAL_KEYS, daily_totals_range, record_food_log_rows
+
+# Upper bounds for one batch request.
+MAX_MEAL_LOG_ENTRIES = 200
+MAX_SERVINGS = 20.0
+MAX_COPY_DAYS = 31
+
+MEAL_OWNERS = ("trainer", "member")
+
+
+class MealLogRequest(NamedTuple):
+    owner: str  # "trainer" for TrainerMeal ids, "member" for MemberMeal ids
+    meal_id: int
+    day: date
+    servings: float
+
+
+class MealLogEntry(NamedTuple):
+    meal: Union[TrainerMeal, MemberMeal]
+    day: date
+    servings: float
+
+
+class DayCopyRequest(NamedTuple):
+    source_start: date
+    source_end: date
+    target_start: date
+    log_ids: Optional[Tuple[int, ...]]  # None copies every log in the source days
+
+    @property
+    def day_map(self) -> Dict[date, date]:
+        shift = self.target_start - self.source_start
+        span = (self.source_end - self.source_start).days + 1
+        days = [self.source_start + timedelta(days=offset) for offset in range(span)]
+        return {day: day + shift for day in days}
+
+
+def parse_meal_log_requests(items: object) -> List[MealLogRequest]:
+    """Validate a JSON list of ``{"meal_id", "date", "servings", "owner"}`` objects.
+
+    ``servings`` defaults to 1 and ``owner`` to ``"trainer"``. Raises
+    ``ValueError`` with a user-facing message for the first invalid entry.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("Provide at least one meal entry.")
+    if len(items) > MAX_MEAL_LOG_ENTRIES:
+        raise ValueError(f"At most {MAX_MEAL_LOG_ENTRIES} meal entries can be logged at once.")
+
+    parsed = []
+    for position, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Entry {position} must be an object.")
+        owner = (item.get("owner") or "trainer").strip().lower()
+        if owner not in MEAL_OWNERS:
+            raise ValueError(f"Entry {position} has an unknown meal owner.")
+        try:
+            meal_id = int(item.get("meal_id"))
+            day = date.fromisoformat(str(item.get("date")))
+            servings = float(item.get("servings", 1) or 1)
+        except (TypeError, ValueError):
+            raise ValueError(f"Entry {position} needs a meal_id, a YYYY-MM-DD date and numeric servings.")
+        if not 0 < servings <= MAX_SERVINGS:
+            raise ValueError(f"Entry {position} servings must be between 0 and {MAX_SERVINGS:g}.")
+        parsed.append(MealLogRequest(owner, meal_id, day, servings))
+    return parsed
+
+
+def parse_day_copy_request(payload: object, today: date) -> DayCopyRequest:
+    """Validate ``{"from", "through", "to", "log_ids"}`` for a day copy.
+
+    ``from`` defaults to yesterday and ``to`` to today, so an empty payload
+    repeats yesterday; ``through`` extends the source to a date range and
+    ``log_ids`` narrows it to selected logs. Raises ``ValueError`` with a
+    user-facing message.
+    """
+    payload = payload if isinstance(payload, dict) else {}
+    try:
+        source_start = date.fromisoformat(str(payload.get("from") or today - timedelta(days=1)))
+        source_end = date.fromisoformat(str(payload.get("through") or source_start))
+        target_start = date.fromisoformat(str(payload.get("to") or today))
+    except ValueError:
+        raise ValueError("Dates must be in YYYY-MM-DD format.")
+    if source_end < source_start:
+        raise ValueError("The copy range ends before it starts.")
+    span = (source_end - source_start).days + 1
+    if span > MAX_COPY_DAYS:
+        raise ValueError(f"At most {MAX_COPY_DAYS} days can be copied at once.")
+    if abs((target_start - source_start).days) < span:
+        raise ValueError("The target days overlap the days being copied.")
+
+    log_ids = payload.get("log_ids")
+    if log_ids is not None:
+        try:
+            log_ids = tuple(int(log_id) for log_id in log_ids)
+        except (TypeError, ValueError):
+            raise ValueError("log_ids must be a list of log ids.")
+        if not log_ids:
+            raise ValueError("Select at least one food to copy.")
+    return DayCopyRequest(source_start, source_end, target_start, log_ids)
+
+
+def load_requested_meals(requests: Iterable[MealLogRequest]) -> Dict[tuple, Union[TrainerMeal, MemberMeal]]:
+    """Fetch every requested meal with its ingredients in one query per meal type.
+
+    Returns ``{(owner, meal_id): meal}``; ids that do not exist are left out.
+    Access checks are the caller's job.
+    """
+    wanted = {owner: set() for owner in MEAL_OWNERS}
+    for req in requests:
+        wanted[req.owner].add(req.meal_id)
+
+    meals: Dict[tuple, Union[TrainerMeal, MemberMeal]] = {}
+    for owner, model in (("trainer", TrainerMeal), ("member", MemberMeal)):
+        if not wanted[owner]:
+            continue
+        for meal in model.query.options(selectinload(model.ingredients)).filter(model.id.in_(wanted[owner])):
+            meals[(owner, meal.id)] = meal
+    return meals
+
+
+def log_meals(user_id: int, entries: Sequence[MealLogEntry]) -> int:
+    """Log every ingredient of every entry for ``user_id`` with a single executemany insert.
+
+    Each ingredient becomes one gram-based ``UserFoodLog`` scaled by the
+    entry's servings, and the daily rollups and food stats are updated
+    in the same transaction. The caller commits. Returns the number of logs written.
+    """
+    created_at = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "food_id": ingredient.food_id,
+            "quantity": float(ingredient.quantity_grams) * entry.servings,
+            "unit": "g",
+            "log_date": entry.day,
+            "created_at": created_at,
+        }
+        for entry in entries
+        for ingredient in entry.meal.ingredients
+        if ingredient.quantity_grams and ingredient.quantity_grams > 0
+    ]
+    if not rows:
+        return 0
+    db.session.execute(insert(UserFoodLog), rows)
+    record_food_log_rows(rows)
+    record_food_stats(user_id, ((row["food_id"], row["quantity"], "g") for row in rows))
+    return len(rows)
+
+
+def copy_food_logs(user_id: int, request: DayCopyRequest) -> List[date]:
+    """Copy ``user_id``'s logs from the source days onto the target days.
+
+    The copy itself is one ``INSERT ... SELECT`` that shifts each log date
+    with a CASE over the source days, however many logs there are. The
+    source logs are read once beforehand to update the daily rollups and
+    food stats. The caller commits. Returns the target days that received
+    logs.
+    """
+    day_map = request.day_map
+    source = (
+        select(UserFoodLog.id)
+        .where(UserFoodLog.user_id == user_id)
+        .where(UserFoodLog.log_date.between(request.source_start, request.source_end))
+    )
+    if request.log_ids is not None:
+        source = source.where(UserFoodLog.id.in_(request.log_ids))
+    source = source.order_by(UserFoodLog.id)
+
+    copied = db.session.execute(
+        source.with_only_columns(UserFoodLog.food_id, UserFoodLog.quantity, UserFoodLog.unit, UserFoodLog.log_date)
+    ).all()
+    if not copied:
+        return []
+
+    db.session.execute(
+        insert(UserFoodLog).from_select(
+            ["user_id", "food_id", "quantity", "unit", "log_date", "created_at"],
+            source.with_only_columns(
+                UserFoodLog.user_id,
+                UserFoodLog.food_id,
+                UserFoodLog.quantity,
+                UserFoodLog.unit,
+                case(day_map, value=UserFoodLog.log_date),
+                literal(datetime.utcnow()),
+            ),
+        )
+    )
+    record_food_log_rows([
+        {
+            "user_id": user_id,
+            "food_id": food_id,
+            "quantity": grams_for(food_id, quantity or 0, unit),
+            "log_date": day_map[log_date],
+        }
+        for food_id, quantity, unit, log_date in copied
+    ])
+    record_food_stats(user_id, ((food_id, quantity, unit) for food_id, quantity, unit, _ in copied))
+    return sorted({day_map[log_date] for _, _, _, log_date in copied})
+
+
+def totals_for_days(user_id: int, days: Iterable[date]) -> Dict[date, Dict[str, float]]:
+    """Unrounded rollup totals for each of ``days`` from one range lookup (zeros when empty)."""
+    days = sorted(set(days))
+    if not days:
+        return {}
+    totals = daily_totals_range(user_id, days[0], days[-1])
+    return {day: totals.get(day) or dict.fromkeys(TOTAL_KEYS, 0.0) for day in days}
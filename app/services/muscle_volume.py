@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, insert, or_, select
+
+from app import db
+from app.models import TemplateExercise, WeeklyMuscleVolume, WorkoutSession, WorkoutSet
+from app.services.exercise_catalog import exercise_catalog
+from app.services.local_time import eastern_date, utc_start_of
+from app.services.personal_records import exercise_key
+from app.services.summary_charts import week_start_sunday
+
+HISTORY_WEEKS = 52
+# Complete weeks averaged for the "recent" column.
+RECENT_WEEKS = 4
+# Share of a set credited to each of the exercise's secondary muscles.
+SECONDARY_CREDIT = 0.5
+# Bucket for sets whose exercise has no known muscle.
+UNMAPPED_MUSCLE = "other"
+# Shades in the weekly strip, 0 (no sets) .. HEAT_LEVELS.
+HEAT_LEVELS = 4
+
+# (week start, template exercise muscle, exercise name, reps, weight)
+SetRow = Tuple[date, Optional[str], str, Optional[int], Optional[float]]
+# {(week start, muscle): (sets, reps, tonnage)}
+VolumeTotals = Dict[Tuple[date, str], Tuple[float, float, float]]
+
+
+class MuscleVolumeHistory(NamedTuple):
+    week_starts: List[date]  # oldest first
+    muscles: List[str]  # most sets over the span first
+    # (len(muscles), len(week_starts)) arrays
+    sets: np.ndarray
+    reps: np.ndarray
+    tonnage: np.ndarray
+
+
+def _split_muscles(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [part.strip().lower() for part in value.split(",") if part.strip()]
+
+
+def muscle_credits(
+    template_muscle: Optional[str], primary: Optional[str], secondary: Optional[str]
+) -> Tuple[Tuple[str, float], ...]:
+    """``(muscle, share of each set)`` pairs for one exercise.
+
+    The muscle chosen on the template exercise takes precedence over the
+    catalog's primary muscles; catalog secondaries get ``SECONDARY_CREDIT``.
+    """
+    primaries = _split_muscles(template_muscle) or _split_muscles(primary)
+    if not primaries:
+        return ((UNMAPPED_MUSCLE, 1.0),)
+    credits = dict.fromkeys(primaries, 1.0)
+    for muscle in _split_muscles(secondary):
+        credits.setdefault(muscle, SECONDARY_CREDIT)
+    return tuple(credits.items())
+
+
+def _catalog_muscles(names: Iterable[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """``{exercise_key: (primary_muscles, secondary_muscles)}`` for catalog exercises with these names."""
+    catalog = exercise_catalog()
+    muscles = {}
+    for key in {exercise_key(name) for name in names}:
+        exercise = catalog.by_key(key)
+        if exercise is not None:
+            muscles[key] = (exercise.primary_muscles, exercise.secondary_muscles)
+    return muscles
+
+
+def aggregate_volume(rows: Sequence[SetRow]) -> VolumeTotals:
+    """Sum sets, reps and tonnage per (week, muscle), crediting each set to its exercise's muscles.
+
+    Muscles are resolved once per distinct exercise; fanning sets out to
+    their muscles and the grouping itself are numpy ``repeat``/``bincount``.
+    """
+    if not rows:
+        return {}
+    catalog = _catalog_muscles({row[2] for row in rows})
+
+    exercise_slots: Dict[Tuple[Optional[str], str], int] = {}
+    week_slots: Dict[date, int] = {}
+    muscle_slots: Dict[str, int] = {}
+    # Credits of every exercise laid end to end; exercise i owns bounds[i]:bounds[i + 1].
+    bounds: List[int] = [0]
+    flat_muscles: List[int] = []
+    flat_credits: List[float] = []
+    set_exercise = np.empty(len(rows), dtype=np.intp)
+    set_week = np.empty(len(rows), dtype=np.intp)
+    for idx, (week, template_muscle, name, _, _) in enumerate(rows):
+        key = (template_muscle, exercise_key(name))
+        slot = exercise_slots.get(key)
+        if slot is None:
+            slot = exercise_slots[key] = len(bounds) - 1
+            for muscle, credit in muscle_credits(template_muscle, *catalog.get(key[1], (None, None))):
+                flat_muscles.append(muscle_slots.setdefault(muscle, len(muscle_slots)))
+                flat_credits.append(credit)
+            bounds.append(len(flat_muscles))
+        set_exercise[idx] = slot
+        set_week[idx] = week_slots.setdefault(week, len(week_slots))
+
+    edges = np.asarray(bounds, dtype=np.intp)
+    starts = edges[:-1][set_exercise]
+    fanout = np.diff(edges)[set_exercise]
+    owner = np.repeat(np.arange(len(rows)), fanout)
+    # Position of each credit in the flat arrays: the owner's start plus its offset within the owner.
+    flat = np.repeat(starts - np.cumsum(fanout) + fanout, fanout) + np.arange(owner.size)
+
+    credits = np.asarray(flat_credits)[flat]
+    reps = np.fromiter((row[3] or 0 for row in rows), dtype=float, count=len(rows))[owner]
+    weight = np.fromiter((row[4] or 0 for row in rows), dtype=float, count=len(rows))[owner]
+    width = len(muscle_slots)
+    group = set_week[owner] * width + np.asarray(flat_muscles, dtype=np.intp)[flat]
+    size = len(week_slots) * width
+    sets_sum = np.bincount(group, weights=credits, minlength=size)
+    reps_sum = np.bincount(group, weights=credits * reps, minlength=size)
+    tonnage_sum = np.bincount(group, weights=credits * reps * weight, minlength=size)
+
+    weeks = list(week_slots)
+    muscles = list(muscle_slots)
+    return {
+        (weeks[slot // width], muscles[slot % width]): (
+            float(sets_sum[slot]), float(reps_sum[slot]), float(tonnage_sum[slot])
+        )
+        for slot in np.flatnonzero(sets_sum).tolist()
+    }
+
+
+def _week_ranges(weeks: Iterable[date]) -> List[Tuple[date, date]]:
+    """Merge week starts into ``[start, end)`` day ranges of consecutive weeks."""
+    ranges: List[Tuple[date, date]] = []
+    for week in sorted(set(weeks)):
+        if ranges and ranges[-1][1] == week:
+            ranges[-1] = (ranges[-1][0], week + timedelta(days=7))
+        else:
+            ranges.append((week, week + timedelta(days=7)))
+    return ranges
+
+
+def _set_rows(user_id: int, weeks: Optional[Iterable[date]] = None) -> List[SetRow]:
+    """A member's raw sets tagged with their week, optionally only for sessions in ``weeks``."""
+    query = (
+        select(
+            WorkoutSession.started_at,
+            TemplateExercise.muscle,
+            WorkoutSet.exercise_name,
+            WorkoutSet.reps,
+            WorkoutSet.weight,
+        )
+        .join(WorkoutSet, WorkoutSet.session_id == WorkoutSession.id)
+        .outerjoin(TemplateExercise, TemplateExercise.id == WorkoutSet.template_exercise_id)
+        .where(WorkoutSession.user_id == user_id, WorkoutSession.completed_at.isnot(None))
+    )
+    if weeks is not None:
+        ranges = _week_ranges(weeks)
+        if not ranges:
+            return []
+        query = query.where(or_(*(
+            and_(WorkoutSession.started_at >= utc_start_of(start), WorkoutSession.started_at < utc_start_of(end))
+            for start, end in ranges
+        )))
+
+    rows: List[SetRow] = []
+    for started_at, muscle, name, reps, weight in db.session.execute(query):
+        day = eastern_date(started_at)
+        if day is not None:
+            rows.append((week_start_sunday(day), muscle, name, reps, weight))
+    return rows
+
+
+def _insert_totals(user_id: int, totals: VolumeTotals) -> None:
+    if totals:
+        db.session.execute(
+            insert(WeeklyMuscleVolume),
+            [
+                {"user_id": user_id, "week_start": week, "muscle": muscle, "sets": sets, "reps": reps, "tonnage": tonnage}
+                for (week, muscle), (sets, reps, tonnage) in totals.items()
+            ],
+        )
+
+
+def refresh_muscle_volume(user_id: int, weeks: Iterable[date]) -> None:
+    """Rewrite a member's rollup rows for ``weeks`` (Sunday starts) from their sets.
+
+    Call after the sets have been added, changed or deleted and before
+    committing. A week is a few dozen sets, so it is re-summed rather than
+    adjusted, and always agrees with the sets it was built from.
+    """
+    weeks = set(weeks)
+    if not weeks:
+        return
+    db.session.execute(
+        delete(WeeklyMuscleVolume)
+        .where(WeeklyMuscleVolume.user_id == user_id, WeeklyMuscleVolume.week_start.in_(weeks))
+    )
+    _insert_totals(user_id, aggregate_volume(_set_rows(user_id, weeks)))
+
+
+def record_workout_volume(session: WorkoutSession) -> None:
+    """Fold a just-saved session into its week's rollup. The caller commits."""
+    day = eastern_date(session.started_at)
+    if day is not None:
+        refresh_muscle_volume(session.user_id, [week_start_sunday(day)])
+
+
+def muscle_volume_history(user_id: int, today: date, weeks: int = HISTORY_WEEKS) -> MuscleVolumeHistory:
+    """Weekly sets, reps and tonnage per muscle for the ``weeks`` weeks ending with ``today``'s.
+
+    Reads the rollup rows in one range scan. Weeks without rows (no
+    workouts, or history from before the rollup existed) are summed from
+    raw sets in one more query, merged into contiguous date ranges.
+    """
+    current_week = week_start_sunday(today)
+    week_starts = [current_week - timedelta(weeks=offset) for offset in reversed(range(weeks))]
+    stored = db.session.execute(
+        select(
+            WeeklyMuscleVolume.week_start,
+            WeeklyMuscleVolume.muscle,
+            WeeklyMuscleVolume.sets,
+            WeeklyMuscleVolume.reps,
+            WeeklyMuscleVolume.tonnage,
+        )
+        .where(WeeklyMuscleVolume.user_id == user_id)
+        .where(WeeklyMuscleVolume.week_start >= week_starts[0], WeeklyMuscleVolume.week_start <= current_week)
+    )
+    totals: VolumeTotals = {(week, muscle): (sets, reps, tonnage) for week, muscle, sets, reps, tonnage in stored}
+    covered = {week for week, _ in totals}
+    missing = [week for week in week_starts if week not in covered]
+    if missing:
+        totals.update(aggregate_volume(_set_rows(user_id, missing)))
+
+    week_index = {week: idx for idx, week in enumerate(week_starts)}
+    muscles = sorted({muscle for _, muscle in totals})
+    muscle_index = {muscle: idx for idx, muscle in enumerate(muscles)}
+    grid = np.zeros((3, len(muscles), len(week_starts)))
+    for (week, muscle), values in totals.items():
+        column = week_index.get(week)
+        if column is not None:
+            grid[:, muscle_index[muscle], column] = values
+
+    order = np.argsort(-grid[0].sum(axis=1), kind="stable")
+    return MuscleVolumeHistory(
+        week_starts=week_starts,
+        muscles=[muscles[idx] for idx in order],
+        sets=grid[0][order],
+        reps=grid[1][order],
+        tonnage=grid[2][order],
+    )
+
+
+def muscle_volume_rows(history: MuscleVolumeHistory, recent_weeks: int = RECENT_WEEKS) -> List[Dict[str, object]]:
+    """Template rows: this week's sets, the recent weekly average and a shaded strip of every week."""
+    labels = [week.strftime("%b %d, %Y") for week in history.week_starts]
+    rows = []
+    for idx, muscle in enumerate(history.muscles):
+        sets = history.sets[idx]
+        if not sets.any():
+            continue
+        levels = np.ceil(sets / sets.max() * HEAT_LEVELS).astype(int)
+        recent = sets[-recent_weeks - 1:-1]
+        rows.append({
+            "muscle": muscle.title(),
+            "this_week": round(float(sets[-1]), 1),
+            "recent_average": round(float(recent.mean()), 1) if recent.size else 0.0,
+            "total_tonnage": int(round(float(history.tonnage[idx].sum()))),
+            "weeks": [
+                {"label": label, "sets": round(float(value), 1), "level": int(level)}
+                for label, value, level in zip(labels, sets.tolist(), levels.tolist())
+            ],
+        })
+    return rows
+
+
+def rebuild_muscle_volume(user_id: Optional[int] = None) -> int:
+    """Recreate rollup rows from every saved set, one member at a time.
+
+    Also the way to pick up exercise catalog or template muscle edits, which
+    are not applied to weeks already summed. Returns the number of rows
+    written.
+    """
+    delete_query = delete(WeeklyMuscleVolume)
+    members = select(WorkoutSession.user_id).distinct().order_by(WorkoutSession.user_id)
+    if user_id is not None:
+        delete_query = delete_query.where(WeeklyMuscleVolume.user_id == user_id)
+        members = members.where(WorkoutSession.user_id == user_id)
+    db.session.execute(delete_query)
+
+    written = 0
+    for member_id in db.session.scalars(members).all():
+        totals = aggregate_volume(_set_rows(member_id))
+        _insert_totals(member_id, totals)
+        written += len(totals)
+    db.session.commit()
+    return written
@@ -1,21 +1,22 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, Optional, Tuple
-from pathlib import Path
-import json
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Tuple
 
+import numpy as np
+from sqlalchemy.orm import selectinload
+
+from app import db
 from app.models import (
     Food,
-    FoodMeasure,
     TrainerMeal,
     TrainerMealIngredient,
     MemberMeal,
     MemberMealIngredient,
-    UNIT_TO_GRAMS,
 )
+from app.services.food_cache import get_food_profiles, unit_conversion
+from app.services.units import FLUID_OUNCE_IN_ML, WEIGHT_OUNCE_IN_GRAMS
 
-WEIGHT_OUNCE_IN_GRAMS = 28.3495
-FLUID_OUNCE_IN_ML = 29.5735
+NUTRIENT_KEYS: Tuple[str, ...] = ("calories", "protein", "carbs", "fats")
 
 MEAL_SLOT_LABELS: Dict[str, str] = {
     "meal1": "Meal 1",
@@ -30,67 +31,6 @@ DEFAULT_MACRO_RATIOS: Dict[str, float] = {
     "fats": 0.30,
 }
 
-_VOLUME_CONVERSIONS_ML: Dict[str, float] = {
-    "ml": 1.0,
-    "milliliter": 1.0,
-    "milliliters": 1.0,
-    "l": 1000.0,
-    "liter": 1000.0,
-    "liters": 1000.0,
-    "cup": 240.0,
-    "cups": 240.0,
-    "tbsp": 15.0,
-    "tablespoon": 15.0,
-    "tablespoons": 15.0,
-    "tsp": 5.0,
-    "teaspoon": 5.0,
-    "teaspoons": 5.0,
-    "fl oz": FLUID_OUNCE_IN_ML,
-    "floz": FLUID_OUNCE_IN_ML,
-    "fluid ounce": FLUID_OUNCE_IN_ML,
-    "fluid ounces": FLUID_OUNCE_IN_ML,
-}
-
-_MEASURE_OVERRIDE_PATH = Path(__file__).resolve().parent.parent / "data" / "measure_overrides.json"
-try:
-    with _MEASURE_OVERRIDE_PATH.open("r", encoding="utf-8") as override_file:
-        raw_overrides = json.load(override_file)
-except FileNotFoundError:
-    raw_overrides = {}
-except json.JSONDecodeError:
-    raw_overrides = {}
-
-MEASURE_OVERRIDES: Dict[str, Dict[str, float]] = {}
-for food_name, entries in raw_overrides.items():
-    normalized_food = food_name.lower()
-    MEASURE_OVERRIDES.setdefault(normalized_food, {})
-    for entry in entries:
-        unit_name = entry.get("measure_name")
-        grams = entry.get("grams")
-        if not unit_name or grams is None:
-            continue
-        MEASURE_OVERRIDES[normalized_food][unit_name.lower()] = float(grams)
-
-
-def _normalize_unit(unit: Optional[str]) -> str:
-    if not unit:
-        return ""
-    return unit.strip().lower()
-
-
-def _candidate_units(unit: str) -> Iterable[str]:
-    """Generate a set of candidate keys for matching FoodMeasure names."""
-    base = _normalize_unit(unit)
-    if not base:
-        return []
-
-    candidates = {base}
-    if base.endswith("s"):
-        candidates.add(base[:-1])
-    candidates.add(base.replace(".", ""))
-    candidates.add(base.replace(" ", ""))
-    return candidates
-
 
 def _serving_grams(food: Food) -> float:
     """Return the gram weight that nutrient data is based on for a food."""
@@ -139,6 +79,137 @@ def scale_food_nutrients(food: Optional[Food], quantity_in_grams: float) -> Dict
     }
 
 
+def _grams_array(quantities_in_grams: Sequence[Optional[float]]) -> np.ndarray:
+    if isinstance(quantities_in_grams, np.ndarray):
+        return np.nan_to_num(quantities_in_grams.astype(np.float64), nan=0.0)
+    return np.array([float(value or 0.0) for value in quantities_in_grams], dtype=np.float64)
+
+
+def food_table_row(food) -> list:
+    """A food's ``[protein, carbs, fats, calories, serving grams]`` row for the batch tables."""
+    return [
+        float(food.protein_g or 0.0),
+        float(food.carbs_g or 0.0),
+        float(food.fats_g or 0.0),
+        float(food.calories or 0.0),
+        _serving_grams(food),
+    ]
+
+
+# Slot 0 of every food table is a zero food used for rows without a food.
+_MISSING_FOOD_ROW = [0.0, 0.0, 0.0, 0.0, 100.0]
+
+
+def _scale_table(base: list, rows: np.ndarray, grams: np.ndarray) -> Dict[str, np.ndarray]:
+    table = np.array(base, dtype=np.float64)
+    protein, carbs, fats, calories, serving = (table[:, column] for column in range(5))
+    # Same operation order as scale_food_nutrients so results match exactly.
+    macro_calories = (protein * 4) + (carbs * 4) + (fats * 9)
+
+    factor = grams / serving[rows]
+    row_macro_calories = macro_calories[rows]
+    return {
+        "calories": np.where(row_macro_calories != 0, row_macro_calories * factor, calories[rows] * factor),
+        "protein": protein[rows] * factor,
+        "carbs": carbs[rows] * factor,
+        "fats": fats[rows] * factor,
+    }
+
+
+def scale_nutrients_batch(
+    foods: Sequence[Optional[Food]],
+    quantities_in_grams: Sequence[Optional[float]],
+) -> Dict[str, np.ndarray]:
+    """Vectorised ``scale_food_nutrients`` over parallel sequences of foods and gram amounts.
+
+    Returns one float64 array per key in ``NUTRIENT_KEYS``. Every element is
+    bit-for-bit what the scalar function returns for that row; rows without a
+    food scale to zero. ``foods`` may hold ``Food`` rows or ``FoodProfile``s.
+    """
+    grams = _grams_array(quantities_in_grams)
+    if len(foods) != len(grams):
+        raise ValueError("foods and quantities_in_grams must have the same length.")
+
+    slot_of: Dict[object, int] = {}
+    base = [_MISSING_FOOD_ROW]
+    rows = np.zeros(len(grams), dtype=np.intp)
+    for index, food in enumerate(foods):
+        if not food:
+            continue
+        key = food.id if food.id is not None else id(food)
+        slot = slot_of.get(key)
+        if slot is None:
+            slot = slot_of[key] = len(base)
+            base.append(food_table_row(food))
+        rows[index] = slot
+    return _scale_table(base, rows, grams)
+
+
+def scale_food_ids_batch(
+    food_ids: Sequence[Optional[int]],
+    quantities_in_grams: Sequence[Optional[float]],
+) -> Dict[str, np.ndarray]:
+    """Like ``scale_nutrients_batch`` but takes food ids, resolved through the food cache.
+
+    Unknown or missing ids (``None``/``0``) scale to zero.
+    """
+    grams = _grams_array(quantities_in_grams)
+    if isinstance(food_ids, np.ndarray):
+        ids = food_ids.astype(np.int64)
+    else:
+        ids = np.array([food_id or 0 for food_id in food_ids], dtype=np.int64)
+    if len(ids) != len(grams):
+        raise ValueError("food_ids and quantities_in_grams must have the same length.")
+
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    profiles = get_food_profiles(int(food_id) for food_id in unique_ids if food_id)
+    base = [_MISSING_FOOD_ROW]
+    slots = np.zeros(len(unique_ids), dtype=np.intp)
+    for position, food_id in enumerate(unique_ids.tolist()):
+        profile = profiles.get(food_id)
+        if profile is not None:
+            slots[position] = len(base)
+            base.append(food_table_row(profile))
+    return _scale_table(base, slots[inverse], grams)
+
+
+def group_nutrient_totals(
+    scaled: Dict[str, np.ndarray],
+    group_keys: Sequence[Hashable],
+) -> Dict[Hashable, Dict[str, float]]:
+    """Sum batch-scaled rows per group key (e.g. day, meal or ``(user_id, day)``).
+
+    Groups keep first-seen order and carry a ``count`` of rows. Sums are
+    accumulated row by row, so they equal a plain Python ``+=`` loop.
+    """
+    slots: Dict[Hashable, int] = {}
+    if isinstance(group_keys, np.ndarray):
+        uniques, first_seen, inverse = np.unique(group_keys, return_index=True, return_inverse=True)
+        order = np.argsort(first_seen, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        inverse = rank[inverse.reshape(-1)]
+        slots = {key: slot for slot, key in enumerate(uniques[order].tolist())}
+    else:
+        inverse = np.fromiter(
+            (slots.setdefault(key, len(slots)) for key in group_keys),
+            dtype=np.intp,
+            count=len(group_keys),
+        )
+    sums = {
+        key: np.bincount(inverse, weights=scaled[key], minlength=len(slots))
+        for key in NUTRIENT_KEYS
+    }
+    counts = np.bincount(inverse, minlength=len(slots))
+    return {
+        group: {
+            **{key: float(sums[key][slot]) for key in NUTRIENT_KEYS},
+            "count": int(counts[slot]),
+        }
+        for group, slot in slots.items()
+    }
+
+
 def derive_macro_targets(
     calorie_target: Optional[float],
     custom_protein_g: Optional[float],
@@ -182,32 +253,6 @@ def derive_macro_targets(
     return macros
 
 
-def find_measure(food_id: int, unit: str) -> Optional[FoodMeasure]:
-    """Try to locate a FoodMeasure for a given unit name, ignoring pluralization and punctuation."""
-    for candidate in _candidate_units(unit):
-        if not candidate:
-            continue
-        measure = FoodMeasure.query.filter_by(food_id=food_id, measure_name=candidate).first()
-        if measure and measure.grams:
-            return measure
-    return None
-
-
-def _override_measure(food: Optional[Food], unit: str) -> Optional[float]:
-    if not food:
-        return None
-    overrides = MEASURE_OVERRIDES.get((food.name or "").lower())
-    if not overrides:
-        return None
-    for candidate in _candidate_units(unit):
-        if not candidate:
-            continue
-        grams = overrides.get(candidate)
-        if grams:
-            return float(grams)
-    return None
-
-
 def convert_to_grams(
     food_id: int,
     quantity: float,
@@ -223,56 +268,87 @@ def convert_to_grams(
     if quantity is None:
         raise ValueError("Quantity is required.")
 
-    normalized_unit = _normalize_unit(unit)
-
-    grams: Optional[float] = None
+    conversion = unit_conversion(food_id, unit)
     volume_ml: Optional[float] = None
 
-    food = Food.query.get(food_id)
-
     if grams_override is not None:
         grams = float(quantity) * float(grams_override)
+    elif conversion.grams:
+        grams = float(quantity) * conversion.grams
     else:
-        if not normalized_unit or normalized_unit == "g":
-            grams = float(quantity)
-        else:
-            measure = find_measure(food_id, normalized_unit)
-            if measure and measure.grams:
-                grams = float(quantity) * float(measure.grams)
-            elif normalized_unit in UNIT_TO_GRAMS:
-                grams = float(quantity) * float(UNIT_TO_GRAMS[normalized_unit])
-            else:
-                override_grams = _override_measure(food, normalized_unit)
-                if override_grams:
-                    grams = float(quantity) * override_grams
-
-    # Fallback to direct grams if no conversion rule found
-    if grams is None:
+        # Fallback to direct grams if no conversion rule found
         grams = float(quantity)
-        normalized_unit = "g"
 
     # Attempt to compute volume information where possible
     if volume_override is not None:
         volume_ml = float(quantity) * float(volume_override)
-    elif normalized_unit in _VOLUME_CONVERSIONS_ML:
-        volume_ml = float(quantity) * _VOLUME_CONVERSIONS_ML[normalized_unit]
+    elif conversion.ml:
+        volume_ml = float(quantity) * conversion.ml
 
     return grams, volume_ml
 
 
+# Meal column holding the cached total for each macro key.
+MEAL_TOTAL_COLUMNS = {
+    "calories": "total_calories",
+    "protein": "total_protein_g",
+    "carbs": "total_carbs_g",
+    "fats": "total_fats_g",
+}
+
+
+def _ingredient_macros(meal) -> Dict[str, float]:
+    ingredients = list(meal.ingredients)
+    if not ingredients:
+        return {key: 0.0 for key in NUTRIENT_KEYS}
+    scaled = scale_food_ids_batch(
+        [int(ingredient.food_id or 0) for ingredient in ingredients],
+        [ingredient.quantity_grams for ingredient in ingredients],
+    )
+    return {key: round(float(values.sum()), 1) for key, values in scaled.items()}
+
+
 def calculate_meal_macros(meal: TrainerMeal) -> Dict[str, float]:
-    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0}
-    for ingredient in meal.ingredients:
-        scaled = scale_food_nutrients(
-            ingredient.food,
-            float(ingredient.quantity_grams or 0.0)
-        )
-        totals["calories"] += scaled["calories"]
-        totals["protein"] += scaled["protein"]
-        totals["carbs"] += scaled["carbs"]
-        totals["fats"] += scaled["fats"]
+    """Return the meal's macro totals, from the cached columns when they are filled in."""
+    stored = {key: getattr(meal, column, None) for key, column in MEAL_TOTAL_COLUMNS.items()}
+    if all(value is not None for value in stored.values()):
+        return {key: round(float(value), 1) for key, value in stored.items()}
+    return _ingredient_macros(meal)
 
-    return {key: round(value, 1) for key, value in totals.items()}
+
+def refresh_meal_macros(meal) -> Dict[str, float]:
+    """Recompute a meal's totals from its ingredients and store them on the meal.
+
+    Call after changing ``meal.ingredients``, before committing.
+    """
+    totals = _ingredient_macros(meal)
+    for key, column in MEAL_TOTAL_COLUMNS.items():
+        setattr(meal, column, totals[key])
+    return totals
+
+
+def rebuild_meal_macros(batch_size: int = 500) -> int:
+    """Recompute cached totals for every trainer and member meal. Returns meals updated."""
+    updated = 0
+    for model in (TrainerMeal, MemberMeal):
+        last_id = 0
+        while True:
+            meals = (
+                model.query
+                .options(selectinload(model.ingredients))
+                .filter(model.id > last_id)
+                .order_by(model.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not meals:
+                break
+            for meal in meals:
+                refresh_meal_macros(meal)
+            db.session.commit()
+            updated += len(meals)
+            last_id = meals[-1].id
+    return updated
 
 
 def serialize_ingredient(ingredient: TrainerMealIngredient) -> Dict[str, Optional[float]]:
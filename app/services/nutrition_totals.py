@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import DailyNutritionTotal, UserFoodLog
+from app.services.nutrition import (
+    NUTRIENT_KEYS,
+    group_nutrient_totals,
+    scale_food_ids_batch,
+    scale_nutrients_batch,
+)
+from app.services.upserts import conflict_insert
+
+TOTAL_KEYS: Tuple[str, ...] = NUTRIENT_KEYS
+
+
+def _empty_totals() -> Dict[str, float]:
+    totals: Dict[str, float] = {key: 0.0 for key in TOTAL_KEYS}
+    totals["entry_count"] = 0
+    return totals
+
+
+def _row_totals(row: DailyNutritionTotal) -> Dict[str, float]:
+    return {
+        "calories": row.calories or 0.0,
+        "protein": row.protein or 0.0,
+        "carbs": row.carbs or 0.0,
+        "fats": row.fats or 0.0,
+        "entry_count": row.entry_count or 0,
+    }
+
+
+def _log_day(log: UserFoodLog) -> Optional[date]:
+    value = log.log_date
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _sum_logs(logs: Iterable[UserFoodLog]) -> Dict[Tuple[int, date], Dict[str, float]]:
+    keys = []
+    foods = []
+    grams = []
+    for log in logs:
+        day = _log_day(log)
+        if day is None or log.food is None:
+            continue
+        keys.append((log.user_id, day))
+        foods.append(log.food)
+        grams.append(log.quantity_in_grams())
+    if not keys:
+        return {}
+
+    return _grouped_totals(scale_nutrients_batch(foods, grams), keys)
+
+
+def _sum_rows(rows: Sequence[Mapping[str, object]]) -> Dict[Tuple[int, date], Dict[str, float]]:
+    """``_sum_logs`` for plain insert rows whose ``quantity`` is already in grams."""
+    rows = [row for row in rows if row.get("log_date") is not None and row.get("food_id")]
+    if not rows:
+        return {}
+    scaled = scale_food_ids_batch([row["food_id"] for row in rows], [row["quantity"] for row in rows])
+    return _grouped_totals(scaled, [(row["user_id"], row["log_date"]) for row in rows])
+
+
+def _grouped_totals(scaled, keys) -> Dict[Tuple[int, date], Dict[str, float]]:
+    grouped = group_nutrient_totals(scaled, keys)
+    for totals in grouped.values():
+        totals["entry_count"] = totals.pop("count")
+    return grouped
+
+
+def _days_by_user(keys: Iterable[Tuple[int, date]]) -> Dict[int, set]:
+    days_by_user: Dict[int, set] = {}
+    for user_id, day in keys:
+        days_by_user.setdefault(user_id, set()).add(day)
+    return days_by_user
+
+
+def _rollup_rows(keys: Iterable[Tuple[int, date]]) -> Dict[Tuple[int, date], DailyNutritionTotal]:
+    """Existing rollup rows for (user, day) pairs, one query per member."""
+    rows = {}
+    for user_id, days in _days_by_user(keys).items():
+        for row in DailyNutritionTotal.query.filter(
+            DailyNutritionTotal.user_id == user_id, DailyNutritionTotal.day.in_(days)
+        ):
+            rows[(row.user_id, row.day)] = row
+    return rows
+
+
+def _refresh_days(keys: Sequence[Tuple[int, date]]) -> Set[Tuple[int, date]]:
+    """Create rollup rows for (user, day) pairs that have none, summed from their food logs.
+
+    Returns the pairs this call created. A pair another writer created in the
+    meantime is left alone (``ON CONFLICT DO NOTHING``) and missing from the result.
+    """
+    now = datetime.utcnow()
+    new_rows = []
+    for user_id, days in _days_by_user(keys).items():
+        logs = (
+            UserFoodLog.query
+            .options(joinedload(UserFoodLog.food))
+            .filter(UserFoodLog.user_id == user_id, UserFoodLog.log_date.in_(days))
+            .all()
+        )
+        summed = _sum_logs(logs)
+        for day in days:
+            totals = summed.get((user_id, day)) or _empty_totals()
+            new_rows.append({"user_id": user_id, "day": day, "updated_at": now, **totals})
+    if not new_rows:
+        return set()
+
+    table = DailyNutritionTotal.__table__
+    created = db.session.execute(
+        conflict_insert(table)
+        .on_conflict_do_nothing(index_elements=["user_id", "day"])
+        .returning(table.c.user_id, table.c.day),
+        new_rows,
+    )
+    return {(user_id, day) for user_id, day in created}
+
+
+def _apply_totals(grouped: Dict[Tuple[int, date], Dict[str, float]], sign: int) -> None:
+    if not grouped:
+        return
+    rows = _rollup_rows(grouped)
+    missing = [key for key in grouped if key not in rows]
+    if missing:
+        # First write for a day that predates the rollup (or a brand new day):
+        # rebuild it from the already-flushed logs so history is not lost.
+        created = _refresh_days(missing)
+        # Days a concurrent writer created first exclude our uncommitted logs,
+        # so they take the increment like any existing row.
+        rows.update(_rollup_rows([key for key in missing if key not in created]))
+
+    for key, delta in grouped.items():
+        row = rows.get(key)
+        if row is None:
+            continue
+
+        # Increment in SQL so concurrent writers to the same day do not clobber each other.
+        DailyNutritionTotal.query.filter_by(id=row.id).update(
+            {
+                DailyNutritionTotal.calories: DailyNutritionTotal.calories + sign * delta["calories"],
+                DailyNutritionTotal.protein: DailyNutritionTotal.protein + sign * delta["protein"],
+                DailyNutritionTotal.carbs: DailyNutritionTotal.carbs + sign * delta["carbs"],
+                DailyNutritionTotal.fats: DailyNutritionTotal.fats + sign * delta["fats"],
+                DailyNutritionTotal.entry_count: DailyNutritionTotal.entry_count + sign * delta["entry_count"],
+                DailyNutritionTotal.updated_at: datetime.utcnow(),
+            },
+            synchronize_session="fetch",
+        )
+        if row.entry_count <= 0:
+            # Clear accumulated float drift once the day is empty again.
+            for name, value in _empty_totals().items():
+                setattr(row, name, value)
+
+
+def record_food_logs(logs: Iterable[UserFoodLog]) -> None:
+    """Fold newly added logs into their daily rollup rows.
+
+    Call after the logs have been flushed and before committing.
+    """
+    _apply_totals(_sum_logs(logs), 1)
+
+
+def record_food_log_rows(rows: Sequence[Mapping[str, object]]) -> None:
+    """``record_food_logs`` for logs bulk-inserted from dicts rather than ORM objects.
+
+    Each row needs ``user_id``, ``food_id``, ``log_date`` and ``quantity`` in
+    grams. Call after the insert has executed and before committing.
+    """
+    _apply_totals(_sum_rows(rows), 1)
+
+
+def discard_food_logs(logs: Iterable[UserFoodLog]) -> None:
+    """Subtract deleted logs from their daily rollup rows.
+
+    Call after ``db.session.delete`` has been flushed and before committing.
+    """
+    _apply_totals(_sum_logs(logs), -1)
+
+
+def _fallback_totals(user_ids: List[int], days: Sequence[date]) -> Dict[Tuple[int, date], Dict[str, float]]:
+    """Sum raw logs for days that have no rollup row yet.
+
+    Only the missing days are read, so a range with a few uncovered days
+    (usually days nothing was logged) stays a short indexed lookup.
+    """
+    if not user_ids or not days:
+        return {}
+    logs = (
+        UserFoodLog.query
+        .options(joinedload(UserFoodLog.food))
+        .filter(UserFoodLog.user_id.in_(user_ids), UserFoodLog.log_date.in_(days))
+        .all()
+    )
+    return _sum_logs(logs)
+
+
+def daily_totals_range(user_id: int, start: date, end: date) -> Dict[date, Dict[str, float]]:
+    """Return unrounded macro totals keyed by day for ``start``..``end`` (inclusive).
+
+    Days without any logged food are omitted.
+    """
+    rows = (
+        DailyNutritionTotal.query
+        .filter(DailyNutritionTotal.user_id == user_id)
+        .filter(DailyNutritionTotal.day >= start, DailyNutritionTotal.day <= end)
+        .all()
+    )
+    result = {row.day: _row_totals(row) for row in rows}
+    missing = [
+        start + timedelta(days=offset)
+        for offset in range((end - start).days + 1)
+        if start + timedelta(days=offset) not in result
+    ]
+    for (_, day), totals in _fallback_totals([user_id], missing).items():
+        result[day] = totals
+    return {day: totals for day, totals in result.items() if totals["entry_count"]}
+
+
+def daily_totals(user_id: int, day: date) -> Dict[str, float]:
+    """Return unrounded macro totals for a single day (zeros when nothing was logged)."""
+    return daily_totals_range(user_id, day, day).get(day) or _empty_totals()
+
+
+def daily_totals_for_users(user_ids: Iterable[int], day: date) -> Dict[int, Dict[str, float]]:
+    """Return one day's unrounded totals for many members in a single rollup lookup.
+
+    Every requested member is present in the result, with zeros when nothing was logged.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    rows = (
+        DailyNutritionTotal.query
+        .filter(DailyNutritionTotal.user_id.in_(user_ids))
+        .filter(DailyNutritionTotal.day == day)
+        .all()
+    )
+    result = {row.user_id: _row_totals(row) for row in rows}
+    uncovered = [uid for uid in user_ids if uid not in result]
+    if uncovered:
+        for (uid, _), totals in _fallback_totals(uncovered, [day]).items():
+            result[uid] = totals
+    return {uid: result.get(uid) or _empty_totals() for uid in user_ids}
+
+
+def rebuild_daily_totals(user_id: Optional[int] = None, batch_size: int = 1000) -> int:
+    """Recreate rollup rows from UserFoodLog history, optionally for a single member.
+
+    Logs are streamed in ``batch_size`` chunks and rows are written with bulk
+    inserts. Returns the number of rollup rows written.
+    """
+    delete_query = DailyNutritionTotal.query
+    if user_id is not None:
+        delete_query = delete_query.filter_by(user_id=user_id)
+    delete_query.delete(synchronize_session=False)
+
+    log_query = (
+        UserFoodLog.query
+        .options(joinedload(UserFoodLog.food))
+        .filter(UserFoodLog.log_date.isnot(None))
+        .order_by(UserFoodLog.user_id.asc(), UserFoodLog.log_date.asc())
+    )
+    if user_id is not None:
+        log_query = log_query.filter(UserFoodLog.user_id == user_id)
+
+    written = 0
+    pending_rows: List[Dict[str, object]] = []
+    current_key = None
+    current_logs: List[UserFoodLog] = []
+
+    def _flush_group() -> None:
+        for (uid, day), totals in _sum_logs(current_logs).items():
+            pending_rows.append({"user_id": uid, "day": day, "updated_at": datetime.utcnow(), **totals})
+
+    def _write_pending() -> None:
+        nonlocal written
+        if pending_rows:
+            db.session.bulk_insert_mappings(DailyNutritionTotal, pending_rows)
+            written += len(pending_rows)
+            pending_rows.clear()
+
+    for log in log_query.yield_per(batch_size):
+        key = (log.user_id, _log_day(log))
+        if key != current_key and current_logs:
+            _flush_group()
+            current_logs = []
+            if len(pending_rows) >= batch_size:
+                _write_pending()
+        current_key = key
+        current_logs.append(log)
+
+    if current_logs:
+        _flush_group()
+    _write_pending()
+    db.session.commit()
+    return written
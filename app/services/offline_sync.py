@@ -0,0 +1,469 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+
+from app import db
+from app.models import (
+    AssignedTemplate,
+    DailyNutritionTotal,
+    ExerciseTemplate,
+    Food,
+    TemplateExercise,
+    UserFoodLog,
+    WorkoutSession,
+    WorkoutSet,
+)
+from app.services.food_cache import grams_for
+from app.services.food_stats import record_food_stats
+from app.services.live_workouts import MAX_CLIENT_ID_LENGTH, optional_number, workout_summary
+from app.services.local_time import eastern_date
+from app.services.muscle_volume import refresh_muscle_volume
+from app.services.nutrition_totals import record_food_log_rows
+from app.services.personal_records import record_session_records
+from app.services.summary_charts import week_start_sunday
+from app.services.workout_snapshots import record_workout_snapshot, session_exercises
+
+# Upper bounds for one upload.
+MAX_SYNC_SESSIONS = 50
+MAX_SYNC_SETS = 1000
+MAX_SYNC_FOOD_LOGS = 500
+# A first sync (no cursor) gets this much history.
+SYNC_HISTORY_DAYS = 30
+# Changes are re-sent for this long after a cursor, so a write committed
+# just after the cursor was taken is not missed. Changes are keyed by id,
+# so receiving one twice is harmless.
+CURSOR_OVERLAP = timedelta(seconds=30)
+# How a client-id unique violation reads: the constraint name (Postgres) or
+# its columns (SQLite).
+_REPLAY_CONSTRAINTS = (
+    "uq_workout_session_user_client",
+    "workout_session.user_id, workout_session.client_id",
+    "uq_user_food_log_user_client",
+    "user_food_log.user_id, user_food_log.client_id",
+)
+
+
+class SyncSet(NamedTuple):
+    id: int  # position in the upload; orders sets the way WorkoutSet.id does
+    client_id: Optional[str]
+    template_exercise_id: Optional[int]
+    exercise_name: str
+    set_number: int
+    reps: Optional[int]
+    weight: Optional[float]
+
+
+class SyncSession(NamedTuple):
+    client_id: str
+    template_id: Optional[int]
+    started_at: datetime
+    completed_at: datetime
+    notes: Optional[str]
+    sets: Tuple[SyncSet, ...]
+
+
+class SyncFoodLog(NamedTuple):
+    client_id: str
+    food_id: int
+    quantity: float  # as entered, in ``unit``
+    unit: str
+    day: date
+
+
+class SyncRequest(NamedTuple):
+    cursor: Optional[datetime]
+    sessions: Tuple[SyncSession, ...]
+    food_logs: Tuple[SyncFoodLog, ...]
+
+
+class SyncResult(NamedTuple):
+    sessions: Dict[str, int]  # client id -> server id, for sessions stored now
+    food_logs: Dict[str, int]
+    duplicates: List[str]  # client ids already stored by an earlier upload
+    rejected: List[Dict[str, str]]  # ``{"client_id", "message"}`` for entries that cannot be stored
+
+
+def _client_id(value: object, label: str, required: bool = True) -> Optional[str]:
+    client_id = str(value or "").strip()
+    if not client_id and not required:
+        return None
+    if not client_id or len(client_id) > MAX_CLIENT_ID_LENGTH:
+        raise ValueError(f"{label} needs a client_id of 1-{MAX_CLIENT_ID_LENGTH} characters.")
+    return client_id
+
+
+def _timestamp(value: object, label: str) -> datetime:
+    """An ISO 8601 timestamp as naive UTC; one without an offset is taken as UTC."""
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"{label} must be an ISO 8601 timestamp.")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def format_cursor(value: datetime) -> str:
+    return value.isoformat()
+
+
+def _parse_sets(items: object, label: str, start: int) -> Tuple[SyncSet, ...]:
+    """Validate one workout's sets; a client_id repeated in it keeps its last entry, as in ``parse_live_sets``."""
+    if not isinstance(items, list):
+        raise ValueError(f"{label} needs a list of sets.")
+    parsed: Dict[object, dict] = {}
+    for position, item in enumerate(items, start=1):
+        set_label = f"{label} set {position}"
+        if not isinstance(item, dict):
+            raise ValueError(f"{set_label} must be an object.")
+        name = str(item.get("name") or "").strip()[:200]
+        if not name:
+            raise ValueError(f"{set_label} needs an exercise name.")
+        reps = optional_number(item.get("reps"), int, f"{set_label} reps")
+        weight = optional_number(item.get("weight"), float, f"{set_label} weight")
+        if reps is None and weight is None:
+            continue
+        client_id = _client_id(item.get("client_id"), set_label, required=False)
+        key = client_id if client_id is not None else position
+        parsed.pop(key, None)
+        parsed[key] = {
+            "client_id": client_id,
+            "template_exercise_id": optional_number(
+                item.get("template_exercise_id"), int, f"{set_label} template_exercise_id"
+            ),
+            "exercise_name": name,
+            "set_number": optional_number(item.get("set_number"), int, f"{set_label} set_number"),
+            "reps": reps,
+            "weight": weight,
+        }
+
+    sets = []
+    per_exercise: Dict[str, int] = {}
+    for fields in parsed.values():
+        template_exercise_id = fields["template_exercise_id"]
+        exercise = f"tpl:{template_exercise_id}" if template_exercise_id else f"custom:{fields['exercise_name'].lower()}"
+        per_exercise[exercise] = per_exercise.get(exercise, 0) + 1
+        sets.append(SyncSet(
+            id=start + len(sets),
+            **{**fields, "set_number": fields["set_number"] or per_exercise[exercise]},
+        ))
+    return tuple(sets)
+
+
+def parse_sync_request(payload: object) -> SyncRequest:
+    """Validate an upload of ``{"cursor", "sessions", "food_logs"}``.
+
+    Each session is ``{"client_id", "template_id", "started_at",
+    "completed_at", "notes", "sets": [{"client_id", "template_exercise_id",
+    "name", "set_number", "reps", "weight"}]}`` and each food log
+    ``{"client_id", "food_id", "quantity", "unit", "date"}``. Raises
+    ``ValueError`` with a user-facing message for the first malformed entry.
+    """
+    payload = payload if isinstance(payload, dict) else {}
+    cursor = payload.get("cursor")
+    cursor = _timestamp(cursor, "cursor") if cursor else None
+
+    sessions_raw = payload.get("sessions") or []
+    food_logs_raw = payload.get("food_logs") or []
+    if not isinstance(sessions_raw, list) or not isinstance(food_logs_raw, list):
+        raise ValueError("sessions and food_logs must be lists.")
+    if len(sessions_raw) > MAX_SYNC_SESSIONS:
+        raise ValueError(f"At most {MAX_SYNC_SESSIONS} workouts can be synced at once.")
+    if len(food_logs_raw) > MAX_SYNC_FOOD_LOGS:
+        raise ValueError(f"At most {MAX_SYNC_FOOD_LOGS} food logs can be synced at once.")
+
+    sessions = []
+    set_count = 0
+    for position, item in enumerate(sessions_raw, start=1):
+        label = f"Workout {position}"
+        if not isinstance(item, dict):
+            raise ValueError(f"{label} must be an object.")
+        started_at = _timestamp(item.get("started_at"), f"{label} started_at")
+        completed_at = _timestamp(item.get("completed_at"), f"{label} completed_at")
+        if completed_at < started_at:
+            raise ValueError(f"{label} ends before it starts.")
+        sets = _parse_sets(item.get("sets"), label, set_count + 1)
+        set_count += len(sets)
+        if set_count > MAX_SYNC_SETS:
+            raise ValueError(f"At most {MAX_SYNC_SETS} sets can be synced at once.")
+        notes = item.get("notes")
+        sessions.append(SyncSession(
+            client_id=_client_id(item.get("client_id"), label),
+            template_id=optional_number(item.get("template_id"), int, f"{label} template_id"),
+            started_at=started_at,
+            completed_at=completed_at,
+            notes=str(notes) if notes else None,
+            sets=sets,
+        ))
+
+    food_logs = []
+    for position, item in enumerate(food_logs_raw, start=1):
+        label = f"Food log {position}"
+        if not isinstance(item, dict):
+            raise ValueError(f"{label} must be an object.")
+        try:
+            food_id = int(item.get("food_id"))
+            quantity = float(item.get("quantity"))
+            day = date.fromisoformat(str(item.get("date")))
+        except (TypeError, ValueError):
+            raise ValueError(f"{label} needs a food_id, a numeric quantity and a YYYY-MM-DD date.")
+        if quantity <= 0:
+            raise ValueError(f"{label} quantity must be greater than zero.")
+        food_logs.append(SyncFoodLog(
+            client_id=_client_id(item.get("client_id"), label),
+            food_id=food_id,
+            quantity=quantity,
+            unit=(str(item.get("unit") or "g").strip().lower() or "g")[:20],
+            day=day,
+        ))
+    return SyncRequest(cursor, tuple(sessions), tuple(food_logs))
+
+
+def is_replay_conflict(error: IntegrityError) -> bool:
+    """Whether ``error`` is a workout or food log client id stored by a concurrent copy of the upload."""
+    message = str(error.orig)
+    return any(marker in message for marker in _REPLAY_CONSTRAINTS)
+
+
+def _fresh(items, stored_ids, duplicates: List[str]) -> list:
+    """Entries whose client id is neither stored nor repeated earlier in the upload."""
+    seen = set(stored_ids)
+    fresh = []
+    for item in items:
+        if item.client_id in seen:
+            duplicates.append(item.client_id)
+            continue
+        seen.add(item.client_id)
+        fresh.append(item)
+    return fresh
+
+
+def _usable_templates(user_id: int, template_ids) -> Dict[int, ExerciseTemplate]:
+    """The member's own or assigned templates among ``template_ids``."""
+    if not template_ids:
+        return {}
+    assigned = select(AssignedTemplate.template_id).where(AssignedTemplate.member_id == user_id)
+    templates = ExerciseTemplate.query.filter(
+        ExerciseTemplate.id.in_(template_ids),
+        or_(ExerciseTemplate.owner_id == user_id, ExerciseTemplate.id.in_(assigned)),
+    )
+    return {template.id: template for template in templates}
+
+
+def _store_sessions(user_id: int, sessions: Sequence[SyncSession], now: datetime, rejected: List[Dict[str, str]]) -> Dict[str, int]:
+    stored = []
+    for item in sessions:
+        if item.sets:
+            stored.append(item)
+        else:
+            rejected.append({"client_id": item.client_id, "message": "No sets were logged."})
+    if not stored:
+        return {}
+
+    # A template the member has lost access to (or that was deleted) only
+    # loses the link; the sets are still the member's workout.
+    templates = _usable_templates(user_id, {item.template_id for item in stored if item.template_id})
+    template_exercises = dict(db.session.execute(
+        select(TemplateExercise.id, TemplateExercise.template_id).where(TemplateExercise.template_id.in_(templates))
+    ).all()) if templates else {}
+    performed = {item.client_id: session_exercises(item.sets) for item in stored}
+
+    db.session.execute(insert(WorkoutSession), [
+        {
+            "user_id": user_id,
+            "client_id": item.client_id,
+            "template_id": item.template_id if item.template_id in templates else None,
+            "started_at": item.started_at,
+            "completed_at": item.completed_at,
+            "summary": workout_summary(performed[item.client_id]),
+            "notes": item.notes,
+            "updated_at": now,
+        }
+        for item in stored
+    ])
+    ids = dict(db.session.execute(
+        select(WorkoutSession.client_id, WorkoutSession.id)
+        .where(WorkoutSession.user_id == user_id, WorkoutSession.client_id.in_(performed))
+    ).all())
+
+    set_rows = []
+    for item in stored:
+        template_id = item.template_id if item.template_id in templates else None
+        for workout_set in item.sets:
+            template_exercise_id = workout_set.template_exercise_id
+            if template_exercises.get(template_exercise_id) != template_id:
+                template_exercise_id = None
+            set_rows.append({
+                "session_id": ids[item.client_id],
+                "client_id": workout_set.client_id,
+                "template_exercise_id": template_exercise_id,
+                "exercise_name": workout_set.exercise_name,
+                "set_number": workout_set.set_number,
+                "reps": workout_set.reps if workout_set.reps is not None else 0,
+                "weight": workout_set.weight,
+            })
+    db.session.execute(insert(WorkoutSet), set_rows)
+
+    # Records and snapshots in the order the workouts happened, so the
+    # newest one ends up as "last time" whatever order they arrived in.
+    by_client_id = {item.client_id: item for item in stored}
+    weeks = set()
+    for session in (
+        WorkoutSession.query
+        .options(joinedload(WorkoutSession.template))
+        .filter(WorkoutSession.id.in_(ids.values()))
+        .order_by(WorkoutSession.completed_at, WorkoutSession.id)
+    ):
+        item = by_client_id[session.client_id]
+        logged_sets = [(workout_set.exercise_name, workout_set.reps, workout_set.weight) for workout_set in item.sets]
+        record_session_records(user_id, session.completed_at, logged_sets)
+        record_workout_snapshot(session, session.template, performed[item.client_id])
+        day = eastern_date(session.started_at)
+        if day is not None:
+            weeks.add(week_start_sunday(day))
+    refresh_muscle_volume(user_id, weeks)
+    return ids
+
+
+def _store_food_logs(user_id: int, food_logs: Sequence[SyncFoodLog], now: datetime, rejected: List[Dict[str, str]]) -> Dict[str, int]:
+    known = set(db.session.scalars(
+        select(Food.id).where(Food.id.in_({item.food_id for item in food_logs}))
+    )) if food_logs else set()
+    stored = []
+    for item in food_logs:
+        if item.food_id in known:
+            stored.append(item)
+        else:
+            rejected.append({"client_id": item.client_id, "message": "Food not found."})
+    if not stored:
+        return {}
+
+    rows = [
+        {
+            "user_id": user_id,
+            "client_id": item.client_id,
+            "food_id": item.food_id,
+            "quantity": grams_for(item.food_id, item.quantity, item.unit),
+            "unit": "g",
+            "log_date": item.day,
+            "created_at": now,
+        }
+        for item in stored
+    ]
+    db.session.execute(insert(UserFoodLog), rows)
+    record_food_log_rows(rows)
+    record_food_stats(user_id, ((item.food_id, item.quantity, item.unit) for item in stored))
+    return dict(db.session.execute(
+        select(UserFoodLog.client_id, UserFoodLog.id)
+        .where(UserFoodLog.user_id == user_id, UserFoodLog.client_id.in_([item.client_id for item in stored]))
+    ).all())
+
+
+def apply_sync(user_id: int, request: SyncRequest) -> SyncResult:
+    """Store an offline upload for ``user_id``, skipping anything an earlier upload stored.
+
+    Replays are recognised by client id with one lookup per kind. New
+    workouts, their sets and food logs are each written with one
+    executemany insert, and records, snapshots, weekly volume, daily
+    totals and food stats are updated in the same transaction. The caller
+    commits.
+    """
+    duplicates: List[str] = []
+    rejected: List[Dict[str, str]] = []
+    now = datetime.utcnow()
+
+    session_ids = [item.client_id for item in request.sessions]
+    stored_sessions = db.session.scalars(
+        select(WorkoutSession.client_id)
+        .where(WorkoutSession.user_id == user_id, WorkoutSession.client_id.in_(session_ids))
+    ) if session_ids else []
+    sessions = _store_sessions(user_id, _fresh(request.sessions, stored_sessions, duplicates), now, rejected)
+
+    food_log_ids = [item.client_id for item in request.food_logs]
+    stored_food_logs = db.session.scalars(
+        select(UserFoodLog.client_id)
+        .where(UserFoodLog.user_id == user_id, UserFoodLog.client_id.in_(food_log_ids))
+    ) if food_log_ids else []
+    food_logs = _store_food_logs(user_id, _fresh(request.food_logs, stored_food_logs, duplicates), now, rejected)
+    return SyncResult(sessions, food_logs, duplicates, rejected)
+
+
+def _session_payload(session: WorkoutSession) -> Dict[str, object]:
+    return {
+        "id": session.id,
+        "client_id": session.client_id,
+        "template_id": session.template_id,
+        "template_name": session.template.name if session.template else None,
+        "started_at": session.started_at.isoformat() if session.started_at else None,
+        "completed_at": session.completed_at.isoformat(),
+        "summary": session.summary,
+        "notes": session.notes,
+        "sets": [
+            {
+                "client_id": workout_set.client_id,
+                "template_exercise_id": workout_set.template_exercise_id,
+                "name": workout_set.exercise_name,
+                "set_number": workout_set.set_number,
+                "reps": workout_set.reps,
+                "weight": workout_set.weight,
+            }
+            for workout_set in sorted(session.sets, key=lambda item: item.id)
+        ],
+    }
+
+
+def changed_sessions(user_id: int, since: Optional[datetime], now: datetime) -> List[Dict[str, object]]:
+    """Finished workouts stored or changed after ``since`` (the last ``SYNC_HISTORY_DAYS`` days without one)."""
+    query = (
+        WorkoutSession.query
+        .options(selectinload(WorkoutSession.sets), joinedload(WorkoutSession.template))
+        .filter(WorkoutSession.user_id == user_id, WorkoutSession.completed_at.isnot(None))
+    )
+    if since is None:
+        query = query.filter(WorkoutSession.started_at >= now - timedelta(days=SYNC_HISTORY_DAYS))
+    else:
+        query = query.filter(WorkoutSession.updated_at > since - CURSOR_OVERLAP)
+    return [_session_payload(session) for session in query.order_by(WorkoutSession.started_at, WorkoutSession.id)]
+
+
+def changed_food_days(user_id: int, since: Optional[datetime], today: date) -> Dict[date, List[Dict[str, object]]]:
+    """Every log of each day whose food changed after ``since``.
+
+    A day is sent whole, so a client replaces it and drops logs deleted
+    here. Changed days are found from the daily rollup's ``updated_at``,
+    which every add and delete bumps.
+    """
+    if since is None:
+        start = today - timedelta(days=SYNC_HISTORY_DAYS)
+        days = set(db.session.scalars(
+            select(UserFoodLog.log_date).where(UserFoodLog.user_id == user_id, UserFoodLog.log_date >= start)
+        ))
+    else:
+        days = set(db.session.scalars(
+            select(DailyNutritionTotal.day)
+            .where(DailyNutritionTotal.user_id == user_id, DailyNutritionTotal.updated_at > since - CURSOR_OVERLAP)
+        ))
+    if not days:
+        return {}
+
+    logs: Dict[date, List[Dict[str, object]]] = {day: [] for day in days}
+    for log in (
+        UserFoodLog.query
+        .options(joinedload(UserFoodLog.food))
+        .filter(UserFoodLog.user_id == user_id, UserFoodLog.log_date.in_(days))
+        .order_by(UserFoodLog.log_date, UserFoodLog.id)
+    ):
+        logs[log.log_date].append({
+            "id": log.id,
+            "client_id": log.client_id,
+            "food_id": log.food_id,
+            "food_name": log.food.name if log.food else None,
+            "quantity": log.quantity,
+            "unit": log.unit,
+        })
+    return logs
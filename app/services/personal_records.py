@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models import PersonalRecord, WorkoutSession, WorkoutSet
+
+# Epley drifts badly past this many reps, so higher-rep sets do not estimate a 1RM.
+E1RM_MAX_REPS = 12
+
+# (exercise name, reps, weight) as logged
+SetEntry = Tuple[str, Optional[int], Optional[float]]
+
+
+class ExerciseBests(NamedTuple):
+    name: str
+    weight: float
+    weight_reps: int
+    e1rm: Optional[float]
+    volume: float
+
+
+def exercise_key(name: str) -> str:
+    return " ".join((name or "").lower().split())
+
+
+def estimated_1rm(weight: float, reps: int) -> Optional[float]:
+    """Epley estimate; ``None`` when the set is outside the range it is good for."""
+    if not weight or weight <= 0 or not reps or reps < 1 or reps > E1RM_MAX_REPS:
+        return None
+    if reps == 1:
+        return float(weight)
+    return weight * (1 + reps / 30.0)
+
+
+def session_bests(sets: Iterable[SetEntry]) -> Dict[str, ExerciseBests]:
+    """Best weight, reps at that weight, e1RM and total volume per exercise for one session.
+
+    Only weighted sets count; bodyweight-only exercises have no records.
+    """
+    bests: Dict[str, ExerciseBests] = {}
+    for name, reps, weight in sets:
+        if not weight or weight <= 0:
+            continue
+        reps = reps or 0
+        key = exercise_key(name)
+        if not key:
+            continue
+        e1rm = estimated_1rm(weight, reps)
+        current = bests.get(key)
+        if current is None:
+            bests[key] = ExerciseBests(name.strip(), weight, reps, e1rm, weight * reps)
+            continue
+        heavier = weight > current.weight or (weight == current.weight and reps > current.weight_reps)
+        bests[key] = ExerciseBests(
+            current.name,
+            weight if heavier else current.weight,
+            reps if heavier else current.weight_reps,
+            max(filter(None, (current.e1rm, e1rm)), default=None),
+            current.volume + weight * reps,
+        )
+    return bests
+
+
+def _merge(record: PersonalRecord, bests: ExerciseBests, performed_at: datetime) -> bool:
+    """Fold one session's bests into ``record``; True when any record improved."""
+    improved = False
+    if (
+        record.best_weight is None
+        or bests.weight > record.best_weight
+        or (bests.weight == record.best_weight and bests.weight_reps > (record.best_weight_reps or 0))
+    ):
+        record.best_weight = bests.weight
+        record.best_weight_reps = bests.weight_reps
+        record.best_weight_at = performed_at
+        improved = True
+    # Stored rounded, so compare rounded: repeating a set must not count as a new record.
+    e1rm = round(bests.e1rm, 1) if bests.e1rm is not None else None
+    if e1rm is not None and (record.best_e1rm is None or e1rm > record.best_e1rm):
+        record.best_e1rm = e1rm
+        record.best_e1rm_at = performed_at
+        improved = True
+    if record.best_volume is None or bests.volume > record.best_volume:
+        record.best_volume = bests.volume
+        record.best_volume_at = performed_at
+        improved = True
+    record.exercise_name = bests.name
+    return improved
+
+
+def record_session_records(user_id: int, performed_at: datetime, sets: Iterable[SetEntry]) -> List[str]:
+    """Update ``user_id``'s records with one saved session's sets.
+
+    Loads the affected records in one query. Returns the names of exercises
+    whose existing records were beaten (a first-ever record is not
+    reported). The caller commits.
+    """
+    bests = session_bests(sets)
+    if not bests:
+        return []
+    records = {
+        record.exercise_key: record
+        for record in PersonalRecord.query.filter(
+            PersonalRecord.user_id == user_id, PersonalRecord.exercise_key.in_(bests)
+        )
+    }
+
+    beaten = []
+    for key, exercise_bests in bests.items():
+        record = records.get(key)
+        if record is None:
+            record = PersonalRecord(user_id=user_id, exercise_key=key)
+            db.session.add(record)
+            _merge(record, exercise_bests, performed_at)
+        elif _merge(record, exercise_bests, performed_at):
+            beaten.append(exercise_bests.name)
+    return beaten
+
+
+def personal_records_for(user_id: int) -> List[PersonalRecord]:
+    """All of a member's records, heaviest estimated max first."""
+    return (
+        PersonalRecord.query
+        .filter_by(user_id=user_id)
+        .order_by(
+            func.coalesce(PersonalRecord.best_e1rm, PersonalRecord.best_weight).desc(),
+            PersonalRecord.exercise_name.asc(),
+        )
+        .all()
+    )
+
+
+def rebuild_personal_records(user_id: Optional[int] = None, batch_size: int = 5000) -> int:
+    """Recreate records from every saved session, optionally for a single member.
+
+    Sets are streamed in ``batch_size`` chunks ordered by member and session,
+    so only one member's records are held in memory at a time. Returns the
+    number of records written.
+    """
+    delete_query = PersonalRecord.query
+    if user_id is not None:
+        delete_query = delete_query.filter_by(user_id=user_id)
+    delete_query.delete(synchronize_session=False)
+
+    query = (
+        select(
+            WorkoutSession.user_id,
+            WorkoutSession.id,
+            func.coalesce(WorkoutSession.completed_at, WorkoutSession.started_at),
+            WorkoutSet.exercise_name,
+            WorkoutSet.reps,
+            WorkoutSet.weight,
+        )
+        .join(WorkoutSet, WorkoutSet.session_id == WorkoutSession.id)
+        .where(WorkoutSet.weight > 0, WorkoutSession.completed_at.isnot(None))
+        .order_by(WorkoutSession.user_id, WorkoutSession.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if user_id is not None:
+        query = query.where(WorkoutSession.user_id == user_id)
+
+    written = 0
+    member_id: Optional[int] = None
+    current_session = None
+    session_at = None
+    session_sets: List[SetEntry] = []
+    records: Dict[str, PersonalRecord] = {}
+
+    def _close_session() -> None:
+        for key, exercise_bests in session_bests(session_sets).items():
+            record = records.get(key)
+            if record is None:
+                record = records[key] = PersonalRecord(user_id=member_id, exercise_key=key)
+            _merge(record, exercise_bests, session_at)
+        session_sets.clear()
+
+    def _write_user() -> None:
+        nonlocal written
+        db.session.add_all(records.values())
+        db.session.flush()
+        written += len(records)
+        records.clear()
+
+    for uid, session_id, performed_at, name, reps, weight in db.session.execute(query):
+        if session_id != current_session:
+            _close_session()
+            if uid != member_id:
+                _write_user()
+                member_id = uid
+            current_session, session_at = session_id, performed_at
+        session_sets.append((name, reps, weight))
+
+    _close_session()
+    _write_user()
+    db.session.commit()
+    return written
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Defaults; override any of them in the app config.
+QUERY_STATS_DEFAULTS = {
+    "QUERY_STATS_ENABLED": True,
+    # Log requests that issue more statements than this.
+    "QUERY_STATS_WARN_COUNT": 40,
+    # Log requests whose statements took longer than this in total (ms).
+    "QUERY_STATS_WARN_MS": 250.0,
+    # Flag a statement as a likely N+1 when it repeats this many times.
+    "QUERY_STATS_REPEAT_THRESHOLD": 5,
+    # Add a Server-Timing header with the per-request totals.
+    "QUERY_STATS_HEADERS": False,
+}
+
+_active: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+_listening = False
+
+
+class QueryStats:
+    """Statement count, DB time and per-statement repeats for one request or block.
+
+    Collectors nest: a statement recorded while a request runs inside
+    ``capture_queries()`` is counted by both.
+    """
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent
+        self.count = 0
+        self.duration_ms = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        stats: Optional[QueryStats] = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration_ms += duration_ms
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements issued at least ``threshold`` times, most frequent first."""
+        return [(sql, hits) for sql, hits in self.statements.most_common() if hits >= threshold]
+
+    def describe(self, threshold: int = 2, limit: int = 5) -> str:
+        lines = [f"{self.count} statements in {self.duration_ms:.1f}ms"]
+        for sql, hits in self.repeated(threshold)[:limit]:
+            lines.append(f"  {hits}x {' '.join(sql.split())[:200]}")
+        return "\n".join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get() is not None:
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _active.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_stats_start")
+    started = starts.pop() if starts else time.perf_counter()
+    stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def _listen() -> None:
+    global _listening
+    if not _listening:
+        # Listen on the Engine class so engines Flask-SQLAlchemy creates lazily are covered.
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listening = True
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Count the SQL statements issued inside the ``with`` block (including test-client requests)."""
+    _listen()
+    stats = QueryStats(parent=_active.get())
+    token = _active.set(stats)
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "block") -> Iterator[QueryStats]:
+    """Fail with ``AssertionError`` when the block issues more than ``max_queries`` statements.
+
+    Typical use in a test::
+
+        with query_budget(12, "member.dashboard"):
+            client.get(url_for("member.dashboard"))
+    """
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise AssertionError(f"{label} exceeded its query budget of {max_queries}: {stats.describe()}")
+
+
+def init_query_stats(app: Flask) -> None:
+    """Count statements and DB time per request and log heavy or N+1-looking views."""
+    for key, value in QUERY_STATS_DEFAULTS.items():
+        app.config.setdefault(key, value)
+    if not app.config["QUERY_STATS_ENABLED"]:
+        return
+    _listen()
+
+    @app.before_request
+    def _start_query_stats():
+        stats = QueryStats(parent=_active.get())
+        g._query_stats = stats
+        g._query_stats_token = _active.set(stats)
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats: Optional[QueryStats] = g.get("_query_stats")
+        if stats is None:
+            return response
+
+        threshold = app.config["QUERY_STATS_REPEAT_THRESHOLD"]
+        repeated = stats.repeated(threshold)
+        route = request.endpoint or request.path
+        if repeated:
+            app.logger.warning(
+                "Possible N+1 in %s: %s", route, stats.describe(threshold=threshold)
+            )
+        elif (
+            stats.count > app.config["QUERY_STATS_WARN_COUNT"]
+            or stats.duration_ms > app.config["QUERY_STATS_WARN_MS"]
+        ):
+            app.logger.warning("Heavy queries in %s: %s", route, stats.describe())
+
+        if app.config["QUERY_STATS_HEADERS"]:
+            response.headers["Server-Timing"] = (
+                f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"'
+            )
+        return response
+
+    @app.teardown_request
+    def _stop_query_stats(exc):
+        token = g.pop("_query_stats_token", None)
+        g.pop("_query_stats", None)
+        if token is not None:
+            _active.reset(token)
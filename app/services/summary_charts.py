@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Progress, WorkoutSession
+from app.services.local_time import eastern_date, utc_start_of
+
+SUMMARY_CHART_CACHE_SIZE = 512
+WEEKS_TO_SHOW = 5
+
+CHART_CONFIG = {"displayModeBar": False, "responsive": True}
+WEEKLY_BAR_COLORS = ["#0d6efd", "#5a8dee", "#8bb7ff", "#0a58ca", "#1c7ed6"]
+
+_charts: "OrderedDict[Tuple[int, tuple, str], Dict[str, object]]" = OrderedDict()
+_lock = Lock()
+
+
+def week_start_sunday(value: date) -> date:
+    """Return the Sunday (start of week) for a given date."""
+    return value - timedelta(days=(value.weekday() + 1) % 7)
+
+
+def _data_version(user_id: int, today: date) -> tuple:
+    """Cheap fingerprint of everything the charts are drawn from.
+
+    Counts and max ids change on every insert or delete, and the latest
+    ``updated_at`` on every in-place edit (including a workout being
+    finished), even when another process did the write. Edits made with raw
+    SQL that leaves ``updated_at`` alone are not seen until the next insert.
+    The current week is included because the workout chart rolls over on
+    Sunday.
+    """
+    progress = (
+        select(func.count(Progress.id), func.max(Progress.id), func.max(Progress.updated_at))
+        .where(Progress.user_id == user_id)
+    )
+    sessions = (
+        select(func.count(WorkoutSession.id), func.max(WorkoutSession.id), func.max(WorkoutSession.updated_at))
+        .where(WorkoutSession.user_id == user_id, WorkoutSession.completed_at.isnot(None))
+    )
+    progress_count, progress_max, progress_edited = db.session.execute(progress).one()
+    session_count, session_max, session_edited = db.session.execute(sessions).one()
+    return (
+        progress_count, progress_max, progress_edited,
+        session_count, session_max, session_edited,
+        week_start_sunday(today),
+    )
+
+
+def _weight_data(user_id: int) -> Dict[str, object]:
+    weights = (
+        db.session.query(Progress.date, Progress.weight)
+        .filter(Progress.user_id == user_id)
+        .order_by(Progress.date)
+        .all()
+    )
+    if not weights:
+        return {"span": None, "dates": [], "weights": [], "y_range": None}
+
+    first_entry_date, first_entry_weight = weights[0]
+    last_entry_date, last_entry_weight = weights[-1]
+    span = {
+        "start_weight": round(first_entry_weight, 1) if first_entry_weight is not None else "--",
+        "start_date": first_entry_date.strftime("%b %d, %Y") if first_entry_date else "--",
+        "end_weight": round(last_entry_weight, 1) if last_entry_weight is not None else "--",
+        "end_date": last_entry_date.strftime("%b %d, %Y") if last_entry_date else "--",
+    }
+
+    values = [float(weight) for _, weight in weights if weight is not None]
+    y_min = min(values) if values else 0
+    y_max = max(values) if values else 0
+    padding = max(1, (y_max - y_min) * 0.1) if y_max != y_min else 5
+
+    return {
+        "span": span,
+        "dates": [
+            (entry_date.date() if isinstance(entry_date, datetime) else entry_date).isoformat()
+            if entry_date else None
+            for entry_date, _ in weights
+        ],
+        "weights": [float(weight) if weight is not None else None for _, weight in weights],
+        "y_range": [max(0, y_min - padding), y_max + padding],
+    }
+
+
+def _weekly_workout_data(user_id: int, today: date) -> Dict[str, List[object]]:
+    current_week_start = week_start_sunday(today)
+    week_starts = [current_week_start - timedelta(weeks=offset) for offset in reversed(range(WEEKS_TO_SHOW))]
+
+    started_rows = (
+        db.session.query(WorkoutSession.started_at)
+        .filter(WorkoutSession.user_id == user_id)
+        .filter(WorkoutSession.started_at.isnot(None), WorkoutSession.completed_at.isnot(None))
+        .filter(WorkoutSession.started_at >= utc_start_of(week_starts[0]))
+        .all()
+    )
+    weekly_counts: Dict[date, int] = defaultdict(int)
+    for (started_at,) in started_rows:
+        session_date = eastern_date(started_at)
+        if session_date:
+            weekly_counts[week_start_sunday(session_date)] += 1
+
+    return {
+        "labels": [f"{week_start.month}/{week_start.day:02d}" for week_start in week_starts],
+        "counts": [weekly_counts.get(week_start, 0) for week_start in week_starts],
+    }
+
+
+def _weight_chart_html(data: Dict[str, object]) -> Optional[str]:
+    if not data["dates"]:
+        return None
+    import plotly.graph_objs as go
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=[date.fromisoformat(value) if value else None for value in data["dates"]],
+            y=data["weights"],
+            mode="lines+markers",
+            line=dict(color="#3c7df2", width=3),
+            marker=dict(size=7, color="#0b5394"),
+            fill="tozeroy",
+            fillcolor="rgba(60,125,242,0.18)",
+        )
+    )
+    fig.update_layout(
+        yaxis_title="Weight (lbs)",
+        yaxis=dict(range=data["y_range"], gridcolor="rgba(12,38,77,0.08)"),
+        xaxis=dict(title="", showgrid=False, zeroline=False, showticklabels=False),
+        template="plotly_white",
+        margin=dict(l=36, r=24, t=20, b=4),
+        plot_bgcolor="rgba(248,249,255,0.95)",
+        paper_bgcolor="rgba(248,249,255,0.95)",
+    )
+    return fig.to_html(full_html=False, config=CHART_CONFIG)
+
+
+def _weekly_workout_chart_html(data: Dict[str, List[object]]) -> str:
+    import plotly.graph_objs as go
+
+    fig_weekly = go.Figure(
+        [
+            go.Bar(
+                x=data["labels"],
+                y=data["counts"],
+                marker=dict(color=WEEKLY_BAR_COLORS[: len(data["counts"])]),
+            )
+        ]
+    )
+    fig_weekly.update_layout(
+        title=f"Weekly Workouts (Last {WEEKS_TO_SHOW} Weeks)",
+        xaxis_title="Week Starting",
+        yaxis_title="Workouts",
+        template="plotly_white",
+        margin=dict(l=36, r=24, t=30, b=20),
+        yaxis=dict(dtick=1, tickmode="linear", tick0=0),
+        plot_bgcolor="rgba(248,249,255,0.95)",
+        paper_bgcolor="rgba(248,249,255,0.95)",
+    )
+    return fig_weekly.to_html(full_html=False, config=CHART_CONFIG)
+
+
+def _build(user_id: int, today: date, fmt: str) -> Dict[str, object]:
+    weight = _weight_data(user_id)
+    weekly = _weekly_workout_data(user_id, today)
+    if fmt == "json":
+        return {
+            "weight_span": weight["span"],
+            "weight": {key: weight[key] for key in ("dates", "weights", "y_range")},
+            "weekly_workouts": weekly,
+        }
+    return {
+        "weight_span": weight["span"],
+        "weight_chart": _weight_chart_html(weight),
+        "weekly_workout_chart": _weekly_workout_chart_html(weekly),
+    }
+
+
+def member_summary_charts(user_id: int, today: date, fmt: str = "html") -> Dict[str, object]:
+    """Return the weight-trend and weekly-workout charts for a member's summary page.
+
+    ``fmt="html"`` returns rendered Plotly snippets (``weight_chart`` and
+    ``weekly_workout_chart``) plus ``weight_span``; ``fmt="json"`` returns the
+    raw series for client-side rendering. Results are cached per member and
+    data version, so repeat views skip the queries-to-figure work entirely.
+    """
+    if fmt not in ("html", "json"):
+        raise ValueError(f"Unknown chart format: {fmt}")
+    key = (user_id, _data_version(user_id, today), fmt)
+    with _lock:
+        cached = _charts.get(key)
+        if cached is not None:
+            _charts.move_to_end(key)
+            return cached
+
+    payload = _build(user_id, today, fmt)
+    with _lock:
+        _charts[key] = payload
+        _charts.move_to_end(key)
+        while len(_charts) > SUMMARY_CHART_CACHE_SIZE:
+            _charts.popitem(last=False)
+    return payload
+
+
+def invalidate_member_charts(user_id: Optional[int] = None) -> None:
+    """Drop cached charts for one member, or for everyone when ``user_id`` is ``None``.
+
+    Call after saving weight entries or workouts for the member.
+    """
+    with _lock:
+        if user_id is None:
+            _charts.clear()
+            return
+        for key in [key for key in _charts if key[0] == user_id]:
+            del _charts[key]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from app.models import UNIT_TO_GRAMS
+
+WEIGHT_OUNCE_IN_GRAMS = 28.3495
+FLUID_OUNCE_IN_ML = 29.5735
+
+_VOLUME_CONVERSIONS_ML: Dict[str, float] = {
+    "ml": 1.0,
+    "milliliter": 1.0,
+    "l": 1000.0,
+    "liter": 1000.0,
+    "cup": 240.0,
+    "tbsp": 15.0,
+    "tablespoon": 15.0,
+    "tsp": 5.0,
+    "teaspoon": 5.0,
+    "fl oz": FLUID_OUNCE_IN_ML,
+    "fluid ounce": FLUID_OUNCE_IN_ML,
+}
+
+_MEASURE_OVERRIDE_PATH = Path(__file__).resolve().parent.parent / "data" / "measure_overrides.json"
+
+
+class UnitConversion(NamedTuple):
+    """Grams and millilitres in one unit; either is ``None`` when the unit has no such meaning."""
+    grams: Optional[float]
+    ml: Optional[float]
+
+
+def unit_key(unit: Optional[str]) -> str:
+    """Canonical alias key: case, dots, spaces and a plural ``s`` are ignored.
+
+    ``"Cups"``, ``"cup"``, ``"fl. oz"`` and ``"floz"`` all share a key, so one
+    dictionary lookup replaces trying each spelling in turn.
+    """
+    key = "".join((unit or "").lower().replace(".", "").split())
+    if len(key) > 1 and key.endswith("s"):
+        key = key[:-1]
+    return key
+
+
+def _compile(entries: Iterable[Tuple[str, float]]) -> Dict[str, float]:
+    table: Dict[str, float] = {}
+    for name, value in entries:
+        key = unit_key(name)
+        if key and value:
+            # First spelling wins when two names collapse to the same key.
+            table.setdefault(key, float(value))
+    return table
+
+
+GLOBAL_UNIT_GRAMS: Dict[str, float] = _compile(UNIT_TO_GRAMS.items())
+GLOBAL_UNIT_ML: Dict[str, float] = _compile(_VOLUME_CONVERSIONS_ML.items())
+
+
+def _load_measure_overrides() -> Dict[str, Dict[str, float]]:
+    try:
+        with _MEASURE_OVERRIDE_PATH.open("r", encoding="utf-8") as override_file:
+            raw_overrides = json.load(override_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    overrides: Dict[str, Dict[str, float]] = {}
+    for food_name, entries in raw_overrides.items():
+        overrides[food_name.lower()] = _compile(
+            (entry.get("measure_name"), entry.get("grams"))
+            for entry in entries
+            if entry.get("measure_name") and entry.get("grams") is not None
+        )
+    return overrides
+
+
+# {lowercased food name: {unit key: grams}} from data/measure_overrides.json
+MEASURE_OVERRIDES: Dict[str, Dict[str, float]] = _load_measure_overrides()
+
+
+def compile_food_units(food_name: Optional[str], measures: Iterable[Tuple[str, float]]) -> Dict[str, float]:
+    """Build a food's ``{unit key: grams}`` table from its measures, then its overrides.
+
+    Global units are not copied in; ``resolve_unit`` falls back to them.
+    """
+    table = _compile(measures)
+    for key, grams in MEASURE_OVERRIDES.get((food_name or "").lower(), {}).items():
+        table.setdefault(key, grams)
+    return table
+
+
+def resolve_unit(food_units: Optional[Dict[str, float]], unit: Optional[str]) -> UnitConversion:
+    """Resolve ``unit`` against a compiled food table, then the global units.
+
+    An empty unit means grams.
+    """
+    key = unit_key(unit) or "g"
+    if key == "g":
+        return UnitConversion(1.0, None)
+    grams = (food_units or {}).get(key) or GLOBAL_UNIT_GRAMS.get(key)
+    return UnitConversion(grams, GLOBAL_UNIT_ML.get(key))
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+
+
+def conflict_insert(table):
+    """``insert(table)`` for the bound database, with ``on_conflict_do_*`` available.
+
+    SQLite and Postgres share the ``ON CONFLICT`` syntax, which lets the
+    first write of a rollup or stats row race another writer safely.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import joinedload, selectinload
+
+from app import db
+from app.models import ExerciseSnapshot, ExerciseTemplate, WorkoutSession, WorkoutSet, WorkoutSnapshot
+from app.services.personal_records import exercise_key
+
+
+def _not_after(stored: Optional[datetime], performed_at: datetime) -> bool:
+    return stored is None or stored <= performed_at
+
+
+def record_workout_snapshot(session: WorkoutSession, template: Optional[ExerciseTemplate], exercises: List[dict]) -> None:
+    """Store a just-saved session as its member's latest run of the template and of each exercise.
+
+    ``exercises`` is the logged payload in the order performed:
+    ``{"templateExerciseId", "name", "sets": [{"reps", "weight"}]}``. Costs one
+    primary-key lookup and one keyed lookup; the caller commits. A session
+    uploaded late by an offline client never replaces a newer snapshot.
+    """
+    if not exercises:
+        return
+    performed_at = session.completed_at or session.started_at or datetime.utcnow()
+    if template is not None:
+        current = db.session.get(WorkoutSnapshot, (session.user_id, template.id))
+        if current is None or _not_after(current.performed_at, performed_at):
+            db.session.merge(WorkoutSnapshot(
+                user_id=session.user_id,
+                template_id=template.id,
+                session_id=session.id,
+                performed_at=performed_at,
+                exercises=exercises,
+            ))
+
+    latest = {exercise_key(exercise["name"]): exercise for exercise in exercises}
+    existing = {
+        snapshot.exercise_key: snapshot
+        for snapshot in ExerciseSnapshot.query.filter(
+            ExerciseSnapshot.user_id == session.user_id, ExerciseSnapshot.exercise_key.in_(latest)
+        )
+    }
+    for key, exercise in latest.items():
+        snapshot = existing.get(key)
+        if snapshot is None:
+            snapshot = ExerciseSnapshot(user_id=session.user_id, exercise_key=key)
+            db.session.add(snapshot)
+        elif not _not_after(snapshot.performed_at, performed_at):
+            continue
+        snapshot.exercise_name = exercise["name"]
+        snapshot.session_id = session.id
+        snapshot.template_name = template.name if template is not None else None
+        snapshot.performed_at = performed_at
+        snapshot.sets = exercise["sets"]
+
+
+def last_workout(user_id: int, template_id: int) -> Optional[WorkoutSnapshot]:
+    """The member's last run of a template (a primary-key lookup)."""
+    return db.session.get(WorkoutSnapshot, (user_id, template_id))
+
+
+def last_exercise_performances(user_id: int, names: Iterable[str]) -> Dict[str, ExerciseSnapshot]:
+    """``{exercise_key: snapshot}`` for the named exercises the member has logged anywhere."""
+    keys = {exercise_key(name) for name in names if name}
+    keys.discard("")
+    if not keys:
+        return {}
+    return {
+        snapshot.exercise_key: snapshot
+        for snapshot in ExerciseSnapshot.query.filter(
+            ExerciseSnapshot.user_id == user_id, ExerciseSnapshot.exercise_key.in_(keys)
+        )
+    }
+
+
+def session_exercises(sets: Iterable[WorkoutSet]) -> List[dict]:
+    """Group a session's sets into the snapshot shape, keeping first-seen exercise order.
+
+    Within an exercise sets follow ``set_number``; autosaved sets can be
+    stored out of order. Anything with ``WorkoutSet``'s attributes works,
+    such as sets not yet stored.
+    """
+    grouped: Dict[str, dict] = {}
+    for workout_set in sorted(sets, key=lambda item: (item.id or 0)):
+        if workout_set.template_exercise_id:
+            key = f"tpl:{workout_set.template_exercise_id}"
+        else:
+            key = f"custom:{workout_set.exercise_name.lower()}"
+        entry = grouped.setdefault(key, {
+            "templateExerciseId": workout_set.template_exercise_id,
+            "name": workout_set.exercise_name,
+            "sets": [],
+        })
+        entry["sets"].append(workout_set)
+    for entry in grouped.values():
+        entry["sets"] = [
+            {"reps": item.reps, "weight": item.weight}
+            for item in sorted(entry["sets"], key=lambda item: item.set_number or 0)
+        ]
+    return list(grouped.values())
+
+
+def rebuild_workout_snapshots(user_id: Optional[int] = None, batch_size: int = 500) -> int:
+    """Recreate snapshots from each member's latest session per template.
+
+    Sessions are read newest first in ``batch_size`` chunks with their sets;
+    the first session seen for a (member, template) or (member, exercise)
+    wins. Returns the number of template snapshots written.
+    """
+    for model in (WorkoutSnapshot, ExerciseSnapshot):
+        delete_query = model.query
+        if user_id is not None:
+            delete_query = delete_query.filter_by(user_id=user_id)
+        delete_query.delete(synchronize_session=False)
+
+    query = (
+        WorkoutSession.query
+        .options(selectinload(WorkoutSession.sets), joinedload(WorkoutSession.template))
+        .filter(WorkoutSession.completed_at.isnot(None))
+        .order_by(
+            WorkoutSession.user_id,
+            func.coalesce(WorkoutSession.completed_at, WorkoutSession.started_at).desc(),
+            WorkoutSession.id.desc(),
+        )
+    )
+    if user_id is not None:
+        query = query.filter(WorkoutSession.user_id == user_id)
+
+    seen_templates = set()
+    seen_exercises = set()
+    template_rows: List[dict] = []
+    exercise_rows: List[dict] = []
+    for session in query.yield_per(batch_size):
+        exercises = session_exercises(session.sets)
+        if not exercises:
+            continue
+        performed_at = session.completed_at or session.started_at
+        if session.template_id and (session.user_id, session.template_id) not in seen_templates:
+            seen_templates.add((session.user_id, session.template_id))
+            template_rows.append({
+                "user_id": session.user_id,
+                "template_id": session.template_id,
+                "session_id": session.id,
+                "performed_at": performed_at,
+                "exercises": exercises,
+            })
+        for exercise in exercises:
+            key = (session.user_id, exercise_key(exercise["name"]))
+            if not key[1] or key in seen_exercises:
+                continue
+            seen_exercises.add(key)
+            exercise_rows.append({
+                "user_id": session.user_id,
+                "exercise_key": key[1],
+                "exercise_name": exercise["name"],
+                "session_id": session.id,
+                "template_name": session.template.name if session.template else None,
+                "performed_at": performed_at,
+                "sets": exercise["sets"],
+            })
+
+    if template_rows:
+        db.session.execute(insert(WorkoutSnapshot), template_rows)
+    if exercise_rows:
+        db.session.execute(insert(ExerciseSnapshot), exercise_rows)
+    db.session.commit()
+    return len(template_rows)
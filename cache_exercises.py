@@ -12,7 +12,12 @@ entries that no longer exist in the upstream dataset.
 
 from __future__ import annotations
 
+import json
 import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
 from werkzeug.utils import secure_filename
 
 import argparse
@@ -20,12 +25,22 @@ import sys
 from typing import Iterable
 
 import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
 
 from app import create_app, db
 from app.models import ExerciseCatalog
+from app.services.exercise_catalog import EXERCISE_CATALOG, bump_catalog_version
 
 EXERCISE_SOURCE_URL = "https://raw.githubusercontent.com/yuhonas/free-exercise-db/main/dist/exercises.json"
+IMAGE_BASE_URL = "https://raw.githubusercontent.com/yuhonas/free-exercise-db/main/exercises"
 
+# Image cache settings
+DOWNLOAD_WORKERS = 8
+MAX_ATTEMPTS = 4
+BACKOFF_SECONDS = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MANIFEST_NAME = ".manifest.json"
 
 
 def _flatten_list(values: Iterable[str] | None) -> str | None:
@@ -40,38 +55,163 @@ def _flatten_instructions(values: Iterable[str] | None) -> str | None:
     cleaned = [v.strip() for v in values if v and v.strip()]
     return "\n".join(cleaned) if cleaned else None
 
-def download_image(url: str, filename: str) -> str | None:
-    if not url:
-        return None
-
-    app = create_app()
-    root = app.root_path
-
-    image_dir = os.path.join(root, "static", "exercise_images")
-    os.makedirs(image_dir, exist_ok=True)
-
-    filepath = os.path.join(image_dir, filename)
-
-    try:
-        resp = requests.get(url, stream=True, timeout=20)
-        resp.raise_for_status()
-
-        with open(filepath, "wb") as f:
-            for chunk in resp.iter_content(8192):
-                f.write(chunk)
-
-        # return relative path for static files
+def _pooled_session(workers: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class ImageCache:
+    """Concurrent, resumable downloader for exercise images.
+
+    A manifest in the image directory records the URL, ETag and size of every
+    completed file. Files that are already present with a matching size are
+    skipped, so an interrupted run picks up where it left off. With
+    ``revalidate`` the server is asked whether the ETag changed instead.
+    Downloads go to a ``.part`` file that is renamed into place on success.
+    """
+
+    def __init__(
+        self,
+        image_dir: str,
+        workers: int = DOWNLOAD_WORKERS,
+        revalidate: bool = False,
+        session: requests.Session | None = None,
+    ):
+        self.image_dir = image_dir
+        self.workers = max(1, workers)
+        self.revalidate = revalidate
+        self.session = session or _pooled_session(self.workers)
+        self.stats: Counter = Counter()
+        self._lock = Lock()
+        os.makedirs(image_dir, exist_ok=True)
+        self.manifest_path = os.path.join(image_dir, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self) -> None:
+        with self._lock:
+            snapshot = dict(self.manifest)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _record(self, filename: str, url: str, etag: str | None, size: int, outcome: str) -> str:
+        with self._lock:
+            self.manifest[filename] = {"url": url, "etag": etag, "size": size}
+            self.stats[outcome] += 1
         return f"exercise_images/{filename}"
 
-    except Exception as e:
-        print(f"ERROR downloading {url}: {e}")
+    def fetch(self, url: str, filename: str) -> str | None:
+        """Make sure ``filename`` holds ``url``; return its static path or ``None`` on failure."""
+        if not url:
+            return None
+
+        filepath = os.path.join(self.image_dir, filename)
+        entry = self.manifest.get(filename) or {}
+        local_size = os.path.getsize(filepath) if os.path.exists(filepath) else None
+        cached = local_size is not None and entry.get("url") == url and entry.get("size") == local_size
+
+        if cached and not self.revalidate:
+            return self._record(filename, url, entry.get("etag"), local_size, "skipped")
+
+        headers = {}
+        if cached and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                with self.session.get(url, stream=True, timeout=20, headers=headers) as resp:
+                    if resp.status_code == 304:
+                        return self._record(filename, url, entry.get("etag"), local_size, "skipped")
+                    if resp.status_code in RETRY_STATUSES:
+                        raise requests.HTTPError(f"{resp.status_code} from server", response=resp)
+                    resp.raise_for_status()
+
+                    etag = resp.headers.get("ETag")
+                    # Content-Length is only comparable when the body is not re-encoded
+                    length = None if resp.headers.get("Content-Encoding") else resp.headers.get("Content-Length")
+                    if (
+                        local_size is not None
+                        and not entry
+                        and length is not None
+                        and int(length) == local_size
+                    ):
+                        # Cached by an older run without a manifest; adopt the file.
+                        return self._record(filename, url, etag, local_size, "skipped")
+
+                    part_path = f"{filepath}.part"
+                    with open(part_path, "wb") as f:
+                        for chunk in resp.iter_content(64 * 1024):
+                            f.write(chunk)
+                    size = os.path.getsize(part_path)
+                    if length is not None and int(length) != size:
+                        raise requests.ConnectionError(f"truncated download ({size}/{length} bytes)")
+                    os.replace(part_path, filepath)
+                    return self._record(filename, url, etag, size, "downloaded")
+
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                retryable = status is None or status in RETRY_STATUSES
+                if retryable and attempt < MAX_ATTEMPTS:
+                    with self._lock:
+                        self.stats["retries"] += 1
+                    time.sleep(BACKOFF_SECONDS * 2 ** (attempt - 1))
+                    continue
+                print(f"ERROR downloading {url}: {e}")
+                with self._lock:
+                    self.stats["failed"] += 1
+                return None
+
         return None
 
-def build_image_url(images: list[str], equipment: str, name: str) -> tuple[str | None, str | None]:
+    def fetch_all(self, jobs: dict[str, str]) -> dict[str, str | None]:
+        """Download ``{filename: url}`` jobs concurrently; returns ``{filename: static path}``."""
+        results: dict[str, str | None] = {}
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {pool.submit(self.fetch, url, filename): filename for filename, url in jobs.items()}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        except BaseException:
+            # Interrupted: stop queued downloads but keep what already finished.
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            self.save_manifest()
+        return results
+
+
+def download_image(url: str, filename: str, image_dir: str | None = None) -> str | None:
+    """Download a single image into the cache (see ``ImageCache`` for bulk use)."""
+    if image_dir is None:
+        image_dir = os.path.join(current_app.root_path, "static", "exercise_images")
+    cache = ImageCache(image_dir, workers=1)
+    path = cache.fetch(url, filename)
+    cache.save_manifest()
+    return path
+
+def build_image_url(
+    images: list[str],
+    equipment: str,
+    name: str,
+    base_url: str = IMAGE_BASE_URL,
+) -> tuple[str | None, str | None]:
     if not images:
         return None, None
 
-    BASE = "https://raw.githubusercontent.com/yuhonas/free-exercise-db/main/exercises"
+    BASE = base_url.rstrip("/")
 
     equipment = (equipment or "other").lower().replace(" ", "-")
     exercise_name = name.replace(" ", "_")
@@ -93,12 +233,27 @@ def fetch_dataset(url: str = EXERCISE_SOURCE_URL) -> list[dict]:
     return data
 
 
-def upsert_catalog(data: list[dict], delete_missing: bool = True) -> tuple[int, int, int]:
+def upsert_catalog(
+    data: list[dict],
+    delete_missing: bool = True,
+    image_cache: ImageCache | None = None,
+    image_base_url: str = IMAGE_BASE_URL,
+) -> tuple[int, int, int]:
+    """Upsert catalog rows, then download their images concurrently.
+
+    Pass ``image_cache`` to control where and how images are fetched; by
+    default they go to ``static/exercise_images`` of the current app.
+    """
+    if image_cache is None:
+        image_cache = ImageCache(os.path.join(current_app.root_path, "static", "exercise_images"))
+
     existing = {row.source_id: row for row in ExerciseCatalog.query.all()}
     seen_ids: set[str] = set()
 
     created = 0
     updated = 0
+    downloads: dict[str, str] = {}
+    targets: list[tuple[ExerciseCatalog, str, str]] = []
 
     for item in data:
         source_id = str(item.get("id") or item.get("name"))
@@ -129,24 +284,27 @@ def upsert_catalog(data: list[dict], delete_missing: bool = True) -> tuple[int,
         row.image_main, row.image_secondary = build_image_url(
             images,
             item.get("equipment"),
-            row.name
+            row.name,
+            image_base_url,
         )
 
-
-        # ----------------------------
-        # NEW: Download and cache
-        # ----------------------------
-
+        # Queue images; they are fetched together once all rows are upserted
         safe_name = secure_filename(row.name.lower().replace(" ", "_"))
 
         if row.image_main:
             filename_main = f"{safe_name}_main.jpg"
-            path = download_image(row.image_main, filename_main)
-            row.local_image_main = path or None
+            downloads[filename_main] = row.image_main
+            targets.append((row, "local_image_main", filename_main))
 
         if row.image_secondary:
             filename_secondary = f"{safe_name}_secondary.jpg"
-            row.local_image_secondary = download_image(row.image_secondary, filename_secondary)
+            downloads[filename_secondary] = row.image_secondary
+            targets.append((row, "local_image_secondary", filename_secondary))
+
+    # Model rows are only touched from this thread; workers just write files
+    paths = image_cache.fetch_all(downloads)
+    for row, attr, filename in targets:
+        setattr(row, attr, paths.get(filename))
 
     deleted = 0
 
@@ -156,6 +314,8 @@ def upsert_catalog(data: list[dict], delete_missing: bool = True) -> tuple[int,
                 db.session.delete(row)
                 deleted += 1
 
+    # Processes reload their in-memory catalog when they see the new version
+    bump_catalog_version(EXERCISE_CATALOG)
     db.session.commit()
     return created, updated, deleted
 
@@ -167,17 +327,40 @@ def main() -> int:
         action="store_true",
         help="Do not delete catalog entries that disappear from the upstream dataset.",
     )
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS, help="Concurrent image downloads.")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Ask the server whether cached images changed (ETag) instead of trusting the local copy.",
+    )
+    parser.add_argument("--source-url", default=EXERCISE_SOURCE_URL, help="Exercise dataset JSON URL.")
+    parser.add_argument("--image-base-url", default=IMAGE_BASE_URL, help="Base URL for exercise images.")
+    parser.add_argument("--image-dir", help="Where to cache images (defaults to static/exercise_images).")
     args = parser.parse_args()
 
     app = create_app()
     with app.app_context():
-        data = fetch_dataset()
-        created, updated, deleted = upsert_catalog(data, delete_missing=not args.no_delete)
+        image_dir = args.image_dir or os.path.join(app.root_path, "static", "exercise_images")
+        image_cache = ImageCache(image_dir, workers=args.workers, revalidate=args.revalidate)
+        data = fetch_dataset(args.source_url)
+        started = time.perf_counter()
+        created, updated, deleted = upsert_catalog(
+            data,
+            delete_missing=not args.no_delete,
+            image_cache=image_cache,
+            image_base_url=args.image_base_url,
+        )
+        elapsed = time.perf_counter() - started
 
     print(f"Exercises created: {created}")
     print(f"Exercises updated: {updated}")
     if not args.no_delete:
         print(f"Exercises deleted: {deleted}")
+    stats = image_cache.stats
+    print(
+        f"Images downloaded: {stats['downloaded']}, skipped: {stats['skipped']}, "
+        f"failed: {stats['failed']}, retries: {stats['retries']} ({elapsed:.1f}s)"
+    )
     return 0
 
 
@@ -1,8 +1,13 @@
+import argparse
 import json
 import os
+import re
+import time
 
 from app import create_app, db
 from app.models import Food, FoodMeasure
+from app.services.food_cache import bump_food_version
+from app.services.food_search import rebuild_food_search_index
 
 KILOJOULE_TO_KILOCALORIE = 1 / 4.184
 
@@ -11,120 +16,235 @@ app = create_app()
 # Directory where you'll put all your USDA JSON files
 USDA_DATA_DIR = "data/usda_foods"  # Update this path
 
-def import_usda_file(filepath, dataset_name):
-    """Import foods and portions from a single USDA JSON file"""
+# Root keys of the FoodData Central downloads
+USDA_ROOT_KEYS = ("FoundationFoods", "SRLegacyFoods", "SurveyFoods", "BrandedFoods")
+
+# Foods written per bulk insert/commit; peak memory scales with this, not the file size
+BATCH_SIZE = 2000
+READ_CHUNK_SIZE = 1024 * 1024
+
+_ROOT_ARRAY_RE = re.compile(r'"(%s)"\s*:\s*\[' % "|".join(USDA_ROOT_KEYS))
+
+
+class UnknownFormatError(ValueError):
+    """The file holds no USDA food array (as opposed to a damaged one)."""
+
+
+def iter_usda_foods(filepath, chunk_size=READ_CHUNK_SIZE):
+    """Yield food dicts one at a time from a USDA JSON file without loading it whole.
+
+    Handles the FDC downloads (``{"SRLegacyFoods": [...]}`` etc.) as well as
+    plain top-level arrays such as the files written by ``scripts/split_usda.py``.
+    Raises ``UnknownFormatError`` when no food array can be found and
+    ``json.JSONDecodeError`` when the array is truncated or corrupt.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size)
+        eof = not buf
+
+        # Locate the opening bracket of the food array
+        while True:
+            stripped = buf.lstrip()
+            if stripped.startswith('['):
+                pos = len(buf) - len(stripped) + 1
+                break
+            match = _ROOT_ARRAY_RE.search(buf)
+            if match:
+                pos = match.end()
+                break
+            if eof:
+                raise UnknownFormatError(f"Unknown data format in {filepath}")
+            more = f.read(chunk_size)
+            eof = not more
+            buf += more
+
+        while True:
+            # Skip separators between elements
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            try:
+                if pos >= len(buf):
+                    raise json.JSONDecodeError("Need more data", buf, pos)
+                item, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The element straddles the chunk boundary: drop what has been
+                # consumed and read more
+                more = f.read(chunk_size)
+                eof = not more
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            yield item
+
+
+def _food_row(food_data):
+    """Build Food column values (per 100g) from one USDA food record."""
+    nutrient_amounts = {}
+    energy_kcal = None
+
+    for nutrient in food_data.get('foodNutrients', []):
+        nutrient_info = nutrient.get('nutrient', {})
+        name = nutrient_info.get('name')
+        if not name:
+            continue
+
+        amount = nutrient.get('amount') or 0
+        unit = (nutrient_info.get('unitName') or '').lower()
+
+        if name == 'Energy':
+            converted = amount * KILOJOULE_TO_KILOCALORIE if unit == 'kj' else amount
+            if energy_kcal is None or unit != 'kj':
+                energy_kcal = converted
+        else:
+            nutrient_amounts[name] = amount
+
+    return {
+        'name': food_data.get('description', ''),
+        'source_id': str(food_data.get('fdcId')),
+        'calories': energy_kcal or 0,
+        'protein_g': nutrient_amounts.get('Protein', 0),
+        'carbs_g': nutrient_amounts.get('Carbohydrate, by difference', 0),
+        'fats_g': nutrient_amounts.get('Total lipid (fat)', 0),
+        'serving_size': 100,
+        'serving_unit': 'g',
+    }
+
+
+def _portion_grams(food_data):
+    """Return {measure_name: grams} for a food's portions (last duplicate wins)."""
+    portions = {}
+    for portion in food_data.get('foodPortions') or []:
+        measure_unit = portion.get('measureUnit', {})
+        measure_name = (measure_unit.get('name') or '').lower()
+        gram_weight = portion.get('gramWeight') or 0
+        if measure_name and gram_weight > 0:
+            portions[measure_name] = gram_weight
+    return portions
+
+
+def _write_batch(batch, known_ids):
+    """Insert new foods and insert/update portions for one batch. Returns counts."""
+    new_rows = [row for row, _ in batch if row['source_id'] not in known_ids]
+    if new_rows:
+        db.session.bulk_insert_mappings(Food, new_rows)
+        inserted = (
+            db.session.query(Food.id, Food.source_id)
+            .filter(Food.source_id.in_([row['source_id'] for row in new_rows]))
+            .all()
+        )
+        for food in inserted:
+            known_ids[food.source_id] = food.id
+
+    food_ids = [known_ids[row['source_id']] for row, portions in batch if portions]
+    existing = {}
+    if food_ids:
+        for measure in (
+            db.session.query(FoodMeasure.id, FoodMeasure.food_id, FoodMeasure.measure_name, FoodMeasure.grams)
+            .filter(FoodMeasure.food_id.in_(food_ids))
+            .order_by(FoodMeasure.id.asc())
+        ):
+            existing.setdefault((measure.food_id, measure.measure_name), measure)
+
+    measure_inserts = []
+    measure_updates = []
+    for row, portions in batch:
+        food_id = known_ids[row['source_id']]
+        for measure_name, grams in portions.items():
+            current = existing.get((food_id, measure_name))
+            if current is None:
+                measure_inserts.append({'food_id': food_id, 'measure_name': measure_name, 'grams': grams})
+            elif current.grams != grams:
+                measure_updates.append({'id': current.id, 'grams': grams})
+
+    if measure_inserts:
+        db.session.bulk_insert_mappings(FoodMeasure, measure_inserts)
+    if measure_updates:
+        db.session.bulk_update_mappings(FoodMeasure, measure_updates)
+    if measure_inserts or measure_updates:
+        # Running servers recompile cached unit tables for the changed foods.
+        bump_food_version()
+    db.session.commit()
+    return len(new_rows), len(batch) - len(new_rows), len(measure_inserts)
+
+
+def import_usda_file(filepath, dataset_name, batch_size=BATCH_SIZE):
+    """Stream foods and portions from a single USDA JSON file into the database.
+
+    Batches are committed as they are written, so a file that turns out to be
+    truncated or corrupt part-way keeps (and reports) the foods before the damage.
+    """
     print(f"\n{'='*60}")
     print(f"Processing: {dataset_name}")
     print(f"{'='*60}")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Different datasets have different root keys
-    foods_list = None
-    if 'FoundationFoods' in data:
-        foods_list = data['FoundationFoods']
-    elif 'SRLegacyFoods' in data:
-        foods_list = data['SRLegacyFoods']
-    elif 'SurveyFoods' in data:
-        foods_list = data['SurveyFoods']
-    elif 'BrandedFoods' in data:
-        foods_list = data['BrandedFoods']
-    else:
-        print(f"⚠️  Unknown data format in {filepath}")
-        return 0, 0
-    
+
+    # source_id -> food.id for everything already imported
+    known_ids = dict(
+        db.session.query(Food.source_id, Food.id).filter(Food.source_id.isnot(None))
+    )
+
     foods_added = 0
     portions_added = 0
     foods_updated = 0
-    
-    for food_data in foods_list:
-        description = food_data.get('description', '')
-        if not description:
-            continue
-        
-        fdc_id = food_data.get('fdcId')
-        
-        # Check if food already exists
-        existing_food = Food.query.filter_by(source_id=str(fdc_id)).first()
-        
-        if not existing_food:
-            # Extract nutrient data (per 100g)
-            nutrient_amounts = {}
-            energy_kcal = None
-
-            for nutrient in food_data.get('foodNutrients', []):
-                nutrient_info = nutrient.get('nutrient', {})
-                name = nutrient_info.get('name')
-                if not name:
-                    continue
-
-                amount = nutrient.get('amount') or 0
-                unit = (nutrient_info.get('unitName') or '').lower()
-
-                if name == 'Energy':
-                    converted = amount * KILOJOULE_TO_KILOCALORIE if unit == 'kj' else amount
-                    if energy_kcal is None or unit != 'kj':
-                        energy_kcal = converted
-                else:
-                    nutrient_amounts[name] = amount
-
-            # Create new food
-            food = Food(
-                name=description,
-                source_id=str(fdc_id),
-                calories=energy_kcal or 0,
-                protein_g=nutrient_amounts.get('Protein', 0),
-                carbs_g=nutrient_amounts.get('Carbohydrate, by difference', 0),
-                fats_g=nutrient_amounts.get('Total lipid (fat)', 0),
-                serving_size=100,
-                serving_unit='g'
-            )
-            db.session.add(food)
-            db.session.flush()  # Get the food.id
-            foods_added += 1
-        else:
-            food = existing_food
-            foods_updated += 1
-        
-        # Import foodPortions
-        food_portions = food_data.get('foodPortions', [])
-        
-        if food_portions:
-            for portion in food_portions:
-                measure_unit = portion.get('measureUnit', {})
-                measure_name = measure_unit.get('name', '').lower()
-                gram_weight = portion.get('gramWeight', 0)
-                
-                if measure_name and gram_weight > 0:
-                    # Check if measure already exists
-                    existing_measure = FoodMeasure.query.filter_by(
-                        food_id=food.id,
-                        measure_name=measure_name
-                    ).first()
-                    
-                    if not existing_measure:
-                        measure = FoodMeasure(
-                            food_id=food.id,
-                            measure_name=measure_name,
-                            grams=gram_weight
-                        )
-                        db.session.add(measure)
-                        portions_added += 1
-                    elif existing_measure.grams != gram_weight:
-                        # Update if different
-                        existing_measure.grams = gram_weight
-    
-    db.session.commit()
-    
+    processed = 0
+    started = time.perf_counter()
+    batch = []
+    seen = set()
+
+    def flush():
+        nonlocal foods_added, foods_updated, portions_added
+        added, updated, portions = _write_batch(batch, known_ids)
+        foods_added += added
+        foods_updated += updated
+        portions_added += portions
+        batch.clear()
+        seen.clear()
+
+    try:
+        for food_data in iter_usda_foods(filepath):
+            if not food_data.get('description', ''):
+                continue
+            row = _food_row(food_data)
+            if row['source_id'] in seen:
+                # Same fdcId twice in one batch: write what we have first
+                flush()
+            seen.add(row['source_id'])
+            batch.append((row, _portion_grams(food_data)))
+            processed += 1
+            if len(batch) >= batch_size:
+                flush()
+                elapsed = time.perf_counter() - started
+                print(f"   {processed} foods ({processed / elapsed:,.0f} foods/sec)", end='\r')
+        if batch:
+            flush()
+    except UnknownFormatError as exc:
+        db.session.rollback()
+        print(f"⚠️  Skipped: {exc}")
+        return 0, 0
+    except json.JSONDecodeError as exc:
+        # Only the batch in progress is lost; earlier batches are committed.
+        db.session.rollback()
+        print(f"\n❌ {dataset_name} is truncated or corrupt after {processed} foods ({exc.msg})")
+        print(f"   Kept {foods_added} foods and {portions_added} portions imported before the error")
+        return foods_added, portions_added
+
+    elapsed = time.perf_counter() - started
+    rate = processed / elapsed if elapsed else 0
+    if processed >= batch_size:
+        print()
     print(f"✅ Foods added: {foods_added}")
     print(f"✅ Foods updated: {foods_updated}")
     print(f"✅ Portions added: {portions_added}")
-    
+    print(f"⏱  {processed} foods in {elapsed:.1f}s ({rate:,.0f} foods/sec)")
+
     return foods_added, portions_added
 
 
-def main():
+def main(batch_size=BATCH_SIZE):
     """Process all USDA JSON files in the directory"""
     
     if not os.path.exists(USDA_DATA_DIR):
@@ -149,7 +269,7 @@ def main():
         
         for json_file in json_files:
             filepath = os.path.join(USDA_DATA_DIR, json_file)
-            foods, portions = import_usda_file(filepath, json_file)
+            foods, portions = import_usda_file(filepath, json_file, batch_size)
             total_foods += foods
             total_portions += portions
         
@@ -161,5 +281,20 @@ def main():
         print(f"\nDone!")
 
 
+def reindex():
+    """Rebuild the food name search index from the food table"""
+    with app.app_context():
+        rebuild_food_search_index()
+    print("✅ Food search index rebuilt")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Import USDA FoodData Central JSON files")
+    parser.add_argument("--reindex", action="store_true", help="Only rebuild the food search index")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Foods written per batch")
+    args = parser.parse_args()
+
+    if args.reindex:
+        reindex()
+    else:
+        main(args.batch_size)
@@ -0,0 +1,36 @@
+"""Add daily nutrition rollup table
+
+Revision ID: 3f1c7a9e2b64
+Revises: 24fe1e3200fe
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c7a9e2b64'
+down_revision = '24fe1e3200fe'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'daily_nutrition_total',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('calories', sa.Float(), nullable=False, server_default=sa.text('0')),
+        sa.Column('protein', sa.Float(), nullable=False, server_default=sa.text('0')),
+        sa.Column('carbs', sa.Float(), nullable=False, server_default=sa.text('0')),
+        sa.Column('fats', sa.Float(), nullable=False, server_default=sa.text('0')),
+        sa.Column('entry_count', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('user_id', 'day', name='uq_daily_nutrition_total_user_day'),
+    )
+
+
+def downgrade():
+    op.drop_table('daily_nutrition_total')
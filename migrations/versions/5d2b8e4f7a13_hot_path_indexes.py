@@ -0,0 +1,62 @@
+"""Index the hot filter columns used by member, trainer and template routes
+
+Revision ID: 5d2b8e4f7a13
+Revises: 9a4e2d6b1c8f
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2b8e4f7a13'
+down_revision = '9a4e2d6b1c8f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_food_log', schema=None) as batch_op:
+        batch_op.create_index('ix_user_food_log_user_id_log_date', ['user_id', 'log_date'], unique=False)
+
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.create_index('ix_progress_user_id_date', ['user_id', 'date'], unique=False)
+
+    with op.batch_alter_table('workout_session', schema=None) as batch_op:
+        batch_op.create_index('ix_workout_session_user_id_started_at', ['user_id', 'started_at'], unique=False)
+
+    with op.batch_alter_table('workout_set', schema=None) as batch_op:
+        batch_op.create_index('ix_workout_set_session_id', ['session_id'], unique=False)
+
+    with op.batch_alter_table('food_measure', schema=None) as batch_op:
+        batch_op.create_index('ix_food_measure_food_id_measure_name', ['food_id', 'measure_name'], unique=False)
+
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.create_index('ix_message_client_id_read_at', ['client_id', 'read_at'], unique=False)
+
+    with op.batch_alter_table('food', schema=None) as batch_op:
+        batch_op.create_index('ix_food_source_id', ['source_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('food', schema=None) as batch_op:
+        batch_op.drop_index('ix_food_source_id')
+
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.drop_index('ix_message_client_id_read_at')
+
+    with op.batch_alter_table('food_measure', schema=None) as batch_op:
+        batch_op.drop_index('ix_food_measure_food_id_measure_name')
+
+    with op.batch_alter_table('workout_set', schema=None) as batch_op:
+        batch_op.drop_index('ix_workout_set_session_id')
+
+    with op.batch_alter_table('workout_session', schema=None) as batch_op:
+        batch_op.drop_index('ix_workout_session_user_id_started_at')
+
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.drop_index('ix_progress_user_id_date')
+
+    with op.batch_alter_table('user_food_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_food_log_user_id_log_date')
@@ -0,0 +1,36 @@
+"""Cache macro totals on trainer and member meals
+
+Revision ID: 7e1a4c9b2d56
+Revises: 5d2b8e4f7a13
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1a4c9b2d56'
+down_revision = '5d2b8e4f7a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing meals start out NULL and are computed from their ingredients on read
+    # until ``python rebuild_meal_macros.py`` (or the next edit) fills them in.
+    for table in ('trainer_meal', 'member_meal'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('total_calories', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('total_protein_g', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('total_carbs_g', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('total_fats_g', sa.Float(), nullable=True))
+
+
+def downgrade():
+    for table in ('member_meal', 'trainer_meal'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('total_fats_g')
+            batch_op.drop_column('total_carbs_g')
+            batch_op.drop_column('total_protein_g')
+            batch_op.drop_column('total_calories')
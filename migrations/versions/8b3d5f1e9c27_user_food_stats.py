@@ -0,0 +1,54 @@
+"""Add per-member food usage stats
+
+Revision ID: 8b3d5f1e9c27
+Revises: 7e1a4c9b2d56
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3d5f1e9c27'
+down_revision = '7e1a4c9b2d56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_food_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('food_id', sa.Integer(), sa.ForeignKey('food.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('log_count', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('last_logged_at', sa.DateTime(), nullable=False),
+        sa.Column('last_quantity', sa.Float(), nullable=True),
+        sa.Column('last_unit', sa.String(length=20), nullable=True),
+        sa.UniqueConstraint('user_id', 'food_id', name='uq_user_food_stats_user_food'),
+    )
+    with op.batch_alter_table('user_food_stats', schema=None) as batch_op:
+        batch_op.create_index('ix_user_food_stats_user_id_last_logged_at', ['user_id', 'last_logged_at'], unique=False)
+
+    # Seed from existing history: count per food, last entry by log id.
+    op.execute(
+        """
+        INSERT INTO user_food_stats (user_id, food_id, log_count, last_logged_at, last_quantity, last_unit)
+        SELECT grouped.user_id, grouped.food_id, grouped.log_count,
+               COALESCE(log.created_at, CURRENT_TIMESTAMP), log.quantity, log.unit
+        FROM (
+            SELECT user_id, food_id, COUNT(*) AS log_count, MAX(id) AS last_id
+            FROM user_food_log
+            GROUP BY user_id, food_id
+        ) AS grouped
+        JOIN user_food_log AS log ON log.id = grouped.last_id
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user_food_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_food_stats_user_id_last_logged_at')
+
+    op.drop_table('user_food_stats')
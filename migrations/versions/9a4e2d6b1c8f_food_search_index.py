@@ -0,0 +1,71 @@
+"""Add full-text search index for food names
+
+Revision ID: 9a4e2d6b1c8f
+Revises: 3f1c7a9e2b64
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4e2d6b1c8f'
+down_revision = '3f1c7a9e2b64'
+branch_labels = None
+depends_on = None
+
+# food_fts is an external-content table, so it only sees writes these triggers forward.
+SQLITE_SYNC_TRIGGERS = {
+    'food_fts_ai': (
+        "CREATE TRIGGER food_fts_ai AFTER INSERT ON food BEGIN "
+        "INSERT INTO food_fts(rowid, name) VALUES (new.id, new.name); END"
+    ),
+    'food_fts_ad': (
+        "CREATE TRIGGER food_fts_ad AFTER DELETE ON food BEGIN "
+        "INSERT INTO food_fts(food_fts, rowid, name) VALUES ('delete', old.id, old.name); END"
+    ),
+    'food_fts_au': (
+        "CREATE TRIGGER food_fts_au AFTER UPDATE OF id, name ON food BEGIN "
+        "INSERT INTO food_fts(food_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+        "INSERT INTO food_fts(rowid, name) VALUES (new.id, new.name); END"
+    ),
+}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE food_fts USING fts5("
+            "name, content='food', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        for statement in SQLITE_SYNC_TRIGGERS.values():
+            op.execute(statement)
+        op.execute("INSERT INTO food_fts(food_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            'ix_food_name_tsv',
+            'food',
+            [sa.text("to_tsvector('simple', name)")],
+            postgresql_using='gin',
+        )
+        op.create_index(
+            'ix_food_name_trgm',
+            'food',
+            ['name'],
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name in SQLITE_SYNC_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS food_fts")
+    elif dialect == 'postgresql':
+        op.drop_index('ix_food_name_trgm', table_name='food')
+        op.drop_index('ix_food_name_tsv', table_name='food')
@@ -0,0 +1,39 @@
+"""Add personal record table
+
+Revision ID: 9d4f6a2c8e31
+Revises: 8b3d5f1e9c27
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f6a2c8e31'
+down_revision = '8b3d5f1e9c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'personal_record',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('exercise_key', sa.String(length=200), nullable=False),
+        sa.Column('exercise_name', sa.String(length=200), nullable=False),
+        sa.Column('best_weight', sa.Float(), nullable=True),
+        sa.Column('best_weight_reps', sa.Integer(), nullable=True),
+        sa.Column('best_weight_at', sa.DateTime(), nullable=True),
+        sa.Column('best_e1rm', sa.Float(), nullable=True),
+        sa.Column('best_e1rm_at', sa.DateTime(), nullable=True),
+        sa.Column('best_volume', sa.Float(), nullable=True),
+        sa.Column('best_volume_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('user_id', 'exercise_key', name='uq_personal_record_user_exercise'),
+    )
+
+
+def downgrade():
+    op.drop_table('personal_record')
@@ -0,0 +1,44 @@
+"""Add last-performance workout snapshots
+
+Revision ID: a1c7e3f5b924
+Revises: 9d4f6a2c8e31
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c7e3f5b924'
+down_revision = '9d4f6a2c8e31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'workout_snapshot',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('template_id', sa.Integer(), sa.ForeignKey('exercise_template.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('session_id', sa.Integer(), sa.ForeignKey('workout_session.id'), nullable=False),
+        sa.Column('performed_at', sa.DateTime(), nullable=False),
+        sa.Column('exercises', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'template_id'),
+    )
+    op.create_table(
+        'exercise_snapshot',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('exercise_key', sa.String(length=200), nullable=False),
+        sa.Column('exercise_name', sa.String(length=200), nullable=False),
+        sa.Column('session_id', sa.Integer(), sa.ForeignKey('workout_session.id'), nullable=False),
+        sa.Column('template_name', sa.String(length=120), nullable=True),
+        sa.Column('performed_at', sa.DateTime(), nullable=False),
+        sa.Column('sets', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'exercise_key'),
+    )
+
+
+def downgrade():
+    op.drop_table('exercise_snapshot')
+    op.drop_table('workout_snapshot')
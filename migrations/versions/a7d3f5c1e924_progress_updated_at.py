@@ -0,0 +1,28 @@
+"""Add a change timestamp to weight entries
+
+Revision ID: a7d3f5c1e924
+Revises: e8a2c6d4f619
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3f5c1e924'
+down_revision = 'e8a2c6d4f619'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE progress SET updated_at = date")
+
+
+def downgrade():
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
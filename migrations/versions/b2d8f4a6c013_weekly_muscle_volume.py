@@ -0,0 +1,38 @@
+"""Add weekly muscle volume rollup
+
+Revision ID: b2d8f4a6c013
+Revises: a1c7e3f5b924
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d8f4a6c013'
+down_revision = 'a1c7e3f5b924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Not backfilled here: muscles are resolved against the exercise catalog in
+    # Python. Weeks without rows are summed from raw sets until
+    # rebuild_muscle_volume.py has run.
+    op.create_table(
+        'weekly_muscle_volume',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('muscle', sa.String(length=100), nullable=False),
+        sa.Column('sets', sa.Float(), nullable=False, server_default=sa.text('0')),
+        sa.Column('reps', sa.Float(), nullable=False, server_default=sa.text('0')),
+        sa.Column('tonnage', sa.Float(), nullable=False, server_default=sa.text('0')),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('user_id', 'week_start', 'muscle', name='uq_weekly_muscle_volume_user_week_muscle'),
+    )
+
+
+def downgrade():
+    op.drop_table('weekly_muscle_volume')
@@ -0,0 +1,30 @@
+"""Add catalog version table
+
+Revision ID: c4e9a7b1d258
+Revises: b2d8f4a6c013
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9a7b1d258'
+down_revision = 'b2d8f4a6c013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalog_version = op.create_table(
+        'catalog_version',
+        sa.Column('name', sa.String(length=50), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False, server_default=sa.text('1')),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.bulk_insert(catalog_version, [{'name': 'exercise', 'version': 1}])
+
+
+def downgrade():
+    op.drop_table('catalog_version')
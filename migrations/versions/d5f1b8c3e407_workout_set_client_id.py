@@ -0,0 +1,28 @@
+"""Add client id to workout sets for autosave
+
+Revision ID: d5f1b8c3e407
+Revises: c4e9a7b1d258
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f1b8c3e407'
+down_revision = 'c4e9a7b1d258'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('workout_set', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('client_id', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_workout_set_session_client', ['session_id', 'client_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('workout_set', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_workout_set_session_client', type_='unique')
+        batch_op.drop_column('client_id')
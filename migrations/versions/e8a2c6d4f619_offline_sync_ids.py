@@ -0,0 +1,42 @@
+"""Add client ids and a change timestamp for offline sync
+
+Revision ID: e8a2c6d4f619
+Revises: d5f1b8c3e407
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a2c6d4f619'
+down_revision = 'd5f1b8c3e407'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('workout_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('client_id', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.create_unique_constraint('uq_workout_session_user_client', ['user_id', 'client_id'])
+        batch_op.create_index('ix_workout_session_user_id_updated_at', ['user_id', 'updated_at'], unique=False)
+
+    op.execute("UPDATE workout_session SET updated_at = COALESCE(completed_at, started_at)")
+
+    with op.batch_alter_table('user_food_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('client_id', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_user_food_log_user_client', ['user_id', 'client_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('user_food_log', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_user_food_log_user_client', type_='unique')
+        batch_op.drop_column('client_id')
+
+    with op.batch_alter_table('workout_session', schema=None) as batch_op:
+        batch_op.drop_index('ix_workout_session_user_id_updated_at')
+        batch_op.drop_constraint('uq_workout_session_user_client', type_='unique')
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('client_id')
@@ -0,0 +1,39 @@
+"""Rebuild the per-member food usage stats behind the quick-log list.
+
+Usage::
+
+    python rebuild_food_stats.py [--user-id 42]
+
+Run from the project root after ``flask db upgrade``. Counts and last-logged
+times come from UserFoodLog history; because history stores grams, rebuilt
+rows suggest the last amount in grams until the member logs the food again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app import create_app
+from app.services.food_stats import rebuild_food_stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild per-member food usage stats")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this member's stats.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        written = rebuild_food_stats(user_id=args.user_id)
+        elapsed = time.perf_counter() - started
+
+    print(f"Stats rows written: {written}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""Backfill the cached macro totals on trainer and member meals.
+
+Usage::
+
+    python rebuild_meal_macros.py [--batch-size 500]
+
+Run from the project root after ``flask db upgrade``. Every meal's totals
+are recomputed from its ingredients, so it is also safe to re-run after
+correcting food nutrient data.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app import create_app
+from app.services.nutrition import rebuild_meal_macros
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute cached meal macro totals")
+    parser.add_argument("--batch-size", type=int, default=500, help="Meals loaded and committed per batch.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        updated = rebuild_meal_macros(batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+
+    print(f"Meals updated: {updated}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
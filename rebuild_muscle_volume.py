@@ -0,0 +1,40 @@
+"""Rebuild the weekly muscle volume rollup from saved workout history.
+
+Usage::
+
+    python rebuild_muscle_volume.py [--user-id 42]
+
+Run from the project root after ``flask db upgrade``, and again after
+changing exercise catalog or template muscles: rollup rows keep the muscles
+an exercise had when its week was summed. Rows in scope are deleted and
+recreated from every ``workout_set``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app import create_app
+from app.services.muscle_volume import rebuild_muscle_volume
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild weekly muscle volume")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this member's weeks.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        written = rebuild_muscle_volume(user_id=args.user_id)
+        elapsed = time.perf_counter() - started
+
+    print(f"Rows written: {written}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
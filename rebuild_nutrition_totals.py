@@ -0,0 +1,39 @@
+"""Backfill the ``daily_nutrition_total`` rollup from existing food logs.
+
+Usage::
+
+    python rebuild_nutrition_totals.py [--user-id 42] [--batch-size 1000]
+
+Run from the project root after ``flask db upgrade``. Existing rollup rows
+in scope are deleted and recreated from ``user_food_log``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app import create_app
+from app.services.nutrition_totals import rebuild_daily_totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild daily nutrition totals from food logs")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild totals for this member.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Logs streamed and rows inserted per batch.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        written = rebuild_daily_totals(user_id=args.user_id, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+
+    print(f"Daily totals written: {written}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
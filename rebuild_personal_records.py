@@ -0,0 +1,40 @@
+"""Rebuild personal records from saved workout history.
+
+Usage::
+
+    python rebuild_personal_records.py [--user-id 42] [--batch-size 5000]
+
+Run from the project root after ``flask db upgrade``. Records in scope are
+deleted and recreated from every ``workout_set``, streamed in batches, so it
+is also safe to re-run after editing or deleting sessions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app import create_app
+from app.services.personal_records import rebuild_personal_records
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild personal records")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this member's records.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Workout sets fetched per batch.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        written = rebuild_personal_records(user_id=args.user_id, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+
+    print(f"Records written: {written}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Backfill the last-performance snapshots used to prefill start_workout.
+
+Usage::
+
+    python rebuild_workout_snapshots.py [--user-id 42] [--batch-size 500]
+
+Run from the project root after ``flask db upgrade``. Snapshots in scope are
+deleted and recreated from each member's most recent session per template
+and per exercise. Until it runs, start_workout falls back to reading the
+latest session directly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app import create_app
+from app.services.workout_snapshots import rebuild_workout_snapshots
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild last-performance workout snapshots")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this member's snapshots.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Sessions loaded per batch.")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        written = rebuild_workout_snapshots(user_id=args.user_id, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+
+    print(f"Template snapshots written: {written}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Measure typeahead latency of the in-memory food autocomplete index.
+
+Usage::
+
+    python scripts/bench_food_autocomplete.py [--foods 400000] [--repeat 200]
+
+A synthetic catalog is generated in a throwaway SQLite database. "cold"
+clears the prefix cache before every lookup; "warm" is a user typing a
+prefix the index has seen before. "end to end" includes the recent-foods
+query for a member with a month of logs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.bench_food_search import _synthetic_names  # noqa: E402
+
+QUERIES = [
+    "c", "ch", "chi", "chick", "chicken b", "chicken breast", "brown rice", "greek yog",
+    "peanut butter", "olive oil", "chikcen", "brocoli", "strawbery", "zzz",
+]
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[max(0, int(len(samples) * 0.99) - 1)]
+
+
+def _time(fn, repeat, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return _percentiles(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark food autocomplete")
+    parser.add_argument("--foods", type=int, default=400_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    handle, db_path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from app import create_app, db
+    from app.models import Food, User, UserFoodLog
+    from app.services.food_autocomplete import autocomplete_foods, build_food_autocomplete_index
+
+    app = create_app()
+    try:
+        with app.app_context():
+            db.create_all()
+            db.session.execute(
+                Food.__table__.insert(),
+                [
+                    {"name": name, "calories": 100, "protein_g": 5, "carbs_g": 10, "fats_g": 3,
+                     "serving_size": 100, "serving_unit": "g"}
+                    for name in _synthetic_names(args.foods)
+                ],
+            )
+            member = User(first_name="Bench", last_name="Member", email="bench@local", password_hash="x", role="member")
+            db.session.add(member)
+            db.session.flush()
+            rng = random.Random(3)
+            today = date.today()
+            db.session.execute(
+                UserFoodLog.__table__.insert(),
+                [
+                    {"user_id": member.id, "food_id": rng.randint(1, args.foods), "quantity": 100,
+                     "unit": "g", "log_date": today - timedelta(days=offset % 30)}
+                    for offset in range(150)
+                ],
+            )
+            db.session.commit()
+
+            started = time.perf_counter()
+            index = build_food_autocomplete_index()
+            print(f"Built index over {len(index)} foods, {len(index.vocab)} words in "
+                  f"{time.perf_counter() - started:.1f}s\n")
+
+            print(f"{'query':<16} {'cold p50':>9} {'cold p99':>9} {'warm p50':>9} {'warm p99':>9} "
+                  f"{'e2e p50':>9} {'e2e p99':>9}")
+            worst = 0.0
+            for query in QUERIES:
+                cold = _time(lambda: index.search(query, limit=8), args.repeat, before=index._prefix_cache.clear)
+                warm = _time(lambda: index.search(query, limit=8), args.repeat)
+                e2e = _time(lambda: autocomplete_foods(query, limit=8, user_id=member.id, today=today), args.repeat)
+                worst = max(worst, cold[1], e2e[1])
+                print(f"{query:<16} {cold[0]:>7.2f}ms {cold[1]:>7.2f}ms {warm[0]:>7.2f}ms {warm[1]:>7.2f}ms "
+                      f"{e2e[0]:>7.2f}ms {e2e[1]:>7.2f}ms")
+            print(f"\nWorst p99: {worst:.2f}ms")
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(db_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Measure remaining-macro recommendation latency over a synthetic catalog.
+
+Usage::
+
+    python scripts/bench_food_recommender.py [--foods 400000] [--repeat 50]
+
+A synthetic catalog with varied macro profiles is generated in a throwaway
+SQLite database. The one-off matrix load is reported separately from the
+per-query ranking time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+GAPS = [
+    {"calories": 400, "protein": 40, "carbs": 10, "fats": 2},
+    {"calories": 250, "protein": 5, "carbs": 50, "fats": 3},
+    {"calories": 600, "protein": 30, "carbs": 60, "fats": 25},
+    {"calories": 150, "protein": None, "carbs": None, "fats": 15},
+]
+
+
+def _foods(count, seed=11):
+    rng = random.Random(seed)
+    for idx in range(count):
+        protein, carbs, fats = rng.uniform(0, 35), rng.uniform(0, 80), rng.uniform(0, 40)
+        yield {
+            "name": f"Food #{idx}",
+            "calories": round(protein * 4 + carbs * 4 + fats * 9, 1) if idx % 7 else None,
+            "protein_g": round(protein, 1),
+            "carbs_g": round(carbs, 1),
+            "fats_g": round(fats, 1),
+            "serving_size": rng.choice([100, 100, 100, 30, 250]),
+            "serving_unit": "g",
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the remaining-macro food recommender")
+    parser.add_argument("--foods", type=int, default=400_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    handle, db_path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from app import create_app, db
+    from app.models import Food
+    from app.services.food_recommender import food_matrix, recommend_foods
+
+    app = create_app()
+    try:
+        with app.app_context():
+            db.create_all()
+            db.session.execute(Food.__table__.insert(), list(_foods(args.foods)))
+            db.session.commit()
+
+            started = time.perf_counter()
+            matrix = food_matrix()
+            print(f"Loaded {len(matrix.ids)} foods into the matrix in {time.perf_counter() - started:.2f}s "
+                  f"({matrix.densities.nbytes / 1e6:.1f} MB)")
+
+            for gap in GAPS:
+                samples = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    results = recommend_foods(gap, limit=10)
+                    samples.append((time.perf_counter() - started) * 1000)
+                samples.sort()
+                p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+                top = results[0]
+                print(f"{gap}: median {statistics.median(samples):.1f}ms p95 {p95:.1f}ms "
+                      f"-> {top.grams:g} g of {top.name} {top.nutrients}")
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(db_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Compare food search latency between the full-text index and ILIKE scans.
+
+Usage::
+
+    python scripts/bench_food_search.py [--foods 400000] [--repeat 20]
+
+A synthetic catalog is generated in a throwaway SQLite database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+WORDS = [
+    "chicken", "beef", "pork", "turkey", "salmon", "tuna", "egg", "milk", "cheese", "yogurt",
+    "rice", "oats", "bread", "pasta", "potato", "sweet", "apple", "banana", "blueberries", "strawberries",
+    "broccoli", "spinach", "carrot", "peanut", "almond", "butter", "olive", "oil", "bean", "lentil",
+    "raw", "cooked", "roasted", "grilled", "fried", "boiled", "canned", "frozen", "dried", "whole",
+    "skinless", "boneless", "lean", "fat", "free", "low", "sodium", "brown", "white", "wheat",
+]
+QUERIES = ["chick", "chicken breast", "brown rice", "greek yog", "peanut butter", "olive oil", "zzz"]
+
+
+def _synthetic_names(count, seed=7):
+    rng = random.Random(seed)
+    for idx in range(count):
+        words = rng.sample(WORDS, rng.randint(2, 6))
+        yield f"{', '.join(words).capitalize()} #{idx}"
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark food name search")
+    parser.add_argument("--foods", type=int, default=400_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    handle, db_path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from app import create_app, db
+    from app.models import Food
+    from app.services.food_search import find_foods, rebuild_food_search_index
+
+    app = create_app()
+    try:
+        with app.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            db.session.execute(
+                Food.__table__.insert(),
+                [
+                    {"name": name, "calories": 100, "protein_g": 5, "carbs_g": 10, "fats_g": 3,
+                     "serving_size": 100, "serving_unit": "g"}
+                    for name in _synthetic_names(args.foods)
+                ],
+            )
+            db.session.commit()
+            print(f"Seeded {args.foods} foods in {time.perf_counter() - started:.1f}s")
+
+            started = time.perf_counter()
+            rebuild_food_search_index()
+            print(f"Built search index in {time.perf_counter() - started:.1f}s\n")
+
+            print(f"{'query':<16} {'fts p50':>9} {'fts p95':>9} {'ilike p50':>10} {'ilike p95':>10}")
+            for query in QUERIES:
+                fts = _time(lambda: find_foods(query, limit=10), args.repeat)
+                ilike = _time(
+                    lambda: Food.query.filter(Food.name.ilike(f"%{query}%")).limit(10).all(),
+                    max(3, args.repeat // 4),
+                )
+                print(f"{query:<16} {fts[0]:>8.2f}ms {fts[1]:>8.2f}ms {ilike[0]:>9.2f}ms {ilike[1]:>9.2f}ms")
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(db_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Compare scalar and batch nutrient scaling, and check they agree exactly.
+
+Usage::
+
+    python scripts/bench_nutrient_scaling.py [--rows 1000 100000] [--repeat 5]
+
+The object path uses in-memory foods; the id path seeds the same foods into
+a throwaway SQLite database and resolves them through the food cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _foods(count, rng):
+    foods = []
+    for idx in range(count):
+        # Mix in the edge cases the scalar path branches on.
+        kind = idx % 6
+        foods.append(SimpleNamespace(
+            id=idx + 1,
+            protein_g=0.0 if kind == 0 else rng.uniform(0, 40),
+            carbs_g=None if kind == 1 else rng.uniform(0, 80),
+            fats_g=0.0 if kind == 0 else rng.uniform(0, 30),
+            calories=None if kind == 2 else rng.uniform(0, 900),
+            serving_size=None if kind == 3 else rng.choice([100, 28.35, 240, 0]),
+            grams_per_unit=rng.choice([None, 55.0]),
+        ))
+    return foods
+
+
+def _rows(count, foods, rng):
+    row_foods = [None if rng.random() < 0.01 else rng.choice(foods) for _ in range(count)]
+    grams = [rng.choice([None, 0, rng.uniform(1, 500)]) for _ in range(count)]
+    days = [rng.randrange(30) for _ in range(count)]
+    return row_foods, grams, days
+
+
+def _scalar(row_foods, grams, days, keys):
+    from app.services.nutrition import scale_food_nutrients
+
+    totals = {}
+    for food, amount, day in zip(row_foods, grams, days):
+        scaled = scale_food_nutrients(food, amount)
+        bucket = totals.setdefault(day, {key: 0.0 for key in keys})
+        for key in keys:
+            bucket[key] += scaled[key]
+    return totals
+
+
+def _batch(row_foods, grams, days):
+    from app.services.nutrition import group_nutrient_totals, scale_nutrients_batch
+
+    return group_nutrient_totals(scale_nutrients_batch(row_foods, grams), days)
+
+
+def _seed_foods(db, models, foods):
+    db.session.bulk_insert_mappings(models.Food, [
+        {
+            "id": food.id, "name": f"Bench food {food.id}", "protein_g": food.protein_g,
+            "carbs_g": food.carbs_g, "fats_g": food.fats_g, "calories": food.calories,
+            "serving_size": food.serving_size, "grams_per_unit": food.grams_per_unit,
+        }
+        for food in foods
+    ])
+    db.session.commit()
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark batch nutrient scaling")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    handle, db_path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    import numpy as np
+    from app import create_app, db, models
+    from app.services.nutrition import (
+        NUTRIENT_KEYS,
+        group_nutrient_totals,
+        scale_food_ids_batch,
+        scale_food_nutrients,
+        scale_nutrients_batch,
+    )
+
+    rng = random.Random(11)
+    foods = _foods(500, rng)
+    app = create_app()
+    mismatches = 0
+    try:
+        with app.app_context():
+            db.create_all()
+            _seed_foods(db, models, foods)
+
+            print(f"{'rows':>8} {'scalar ms':>10} {'objects ms':>11} {'ids ms':>7} {'speedup':>8}  identical")
+            for count in args.rows:
+                row_foods, grams, days = _rows(count, foods, rng)
+                food_ids = np.array([food.id if food else 0 for food in row_foods])
+                grams_array = np.array([amount or 0.0 for amount in grams])
+                day_array = np.array(days)
+
+                scaled = scale_nutrients_batch(row_foods, grams)
+                by_id = scale_food_ids_batch(food_ids, grams_array)
+                rows_equal = all(
+                    scale_food_nutrients(food, amount)[key] == scaled[key][idx] == by_id[key][idx]
+                    for idx, (food, amount) in enumerate(zip(row_foods, grams))
+                    for key in NUTRIENT_KEYS
+                )
+                scalar_totals = _scalar(row_foods, grams, days, NUTRIENT_KEYS)
+                object_totals = _batch(row_foods, grams, days)
+                id_totals = group_nutrient_totals(by_id, day_array)
+                groups_equal = all(
+                    list(scalar_totals) == list(totals)
+                    and all(
+                        scalar_totals[day][key] == totals[day][key]
+                        for day in scalar_totals
+                        for key in NUTRIENT_KEYS
+                    )
+                    for totals in (object_totals, id_totals)
+                )
+                identical = rows_equal and groups_equal
+                mismatches += not identical
+
+                scalar_ms = _time(lambda: _scalar(row_foods, grams, days, NUTRIENT_KEYS), args.repeat)
+                object_ms = _time(lambda: _batch(row_foods, grams, days), args.repeat)
+                id_ms = _time(
+                    lambda: group_nutrient_totals(scale_food_ids_batch(food_ids, grams_array), day_array),
+                    args.repeat,
+                )
+                print(
+                    f"{count:>8} {scalar_ms:>10.2f} {object_ms:>11.2f} {id_ms:>7.2f} "
+                    f"{scalar_ms / id_ms:>7.1f}x  {identical}"
+                )
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(db_path)
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Measure trainer dashboard latency and query count as the roster grows.
+
+Usage::
+
+    python scripts/bench_trainer_dashboard.py [--clients 10 50 100 250] [--repeat 5]
+
+Each roster size is seeded into a throwaway SQLite database, so this never
+touches the development database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _seed(db, models, client_count, logs_per_client, weights_per_client):
+    from app.routes.member import _today_eastern
+
+    today = _today_eastern()
+    trainer = models.User(
+        first_name="Bench", last_name="Trainer", email="trainer@bench.local",
+        password_hash="x", role="trainer", email_verified=True,
+    )
+    db.session.add(trainer)
+    foods = [
+        models.Food(name=f"Bench food {idx}", calories=120 + idx, protein_g=10, carbs_g=15, fats_g=4,
+                    serving_size=100, serving_unit="g")
+        for idx in range(25)
+    ]
+    db.session.add_all(foods)
+    db.session.flush()
+
+    for idx in range(client_count):
+        member = models.User(
+            first_name=f"Client{idx:04d}", last_name="Bench", email=f"client{idx}@bench.local",
+            password_hash="x", role="member", trainer_id=trainer.id, email_verified=True,
+        )
+        db.session.add(member)
+        db.session.flush()
+        for log_idx in range(logs_per_client):
+            db.session.add(models.UserFoodLog(
+                user_id=member.id, food_id=foods[(idx + log_idx) % len(foods)].id,
+                quantity=100 + log_idx * 25, unit="g", log_date=today,
+            ))
+        for weight_idx in range(weights_per_client):
+            db.session.add(models.Progress(
+                user_id=member.id, date=datetime.utcnow() - timedelta(days=weight_idx),
+                weight=180 - weight_idx * 0.2,
+            ))
+    db.session.commit()
+    return trainer.id
+
+
+def run(client_count, repeat, use_rollup):
+    handle, db_path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    # Config reads DATABASE_URL at import time, so import lazily per run.
+    for name in [module for module in sys.modules if module == "config" or module.startswith("app")]:
+        del sys.modules[name]
+    from sqlalchemy import event
+    from app import create_app, db
+    from app import models
+    from app.services.nutrition_totals import rebuild_daily_totals
+
+    app = create_app()
+    try:
+        with app.app_context():
+            db.create_all()
+            trainer_id = _seed(db, models, client_count, logs_per_client=6, weights_per_client=20)
+            if use_rollup:
+                rebuild_daily_totals()
+
+            statements = []
+            event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(trainer_id)
+            sess["user_id"] = trainer_id
+            sess["role"] = "trainer"
+
+        client.get("/trainer/dashboard-trainer")  # warm up templates and caches
+        timings = []
+        query_counts = []
+        for _ in range(repeat):
+            statements.clear()
+            started = time.perf_counter()
+            response = client.get("/trainer/dashboard-trainer")
+            timings.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(statements))
+            if response.status_code != 200:
+                raise RuntimeError(f"Dashboard returned {response.status_code}")
+        return statistics.median(timings), max(query_counts)
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(db_path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the trainer dashboard roster")
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 100, 250])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-rollup", action="store_true", help="Skip the rollup backfill to time the log fallback path.")
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'median ms':>10} {'queries':>8}")
+    for count in args.clients:
+        median_ms, queries = run(count, args.repeat, use_rollup=not args.no_rollup)
+        print(f"{count:>8} {median_ms:>10.1f} {queries:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
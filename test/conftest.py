@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Config reads DATABASE_URL when it is imported: every test gets an in-memory database.
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import pytest
+from flask import g
+from flask.testing import FlaskClient
+
+
+class _Client(FlaskClient):
+    def open(self, *args, **kwargs):
+        # Requests share the fixture's app context, so forget the user the
+        # previous request loaded; each client is signed in as its own user.
+        g.pop("_login_user", None)
+        return super().open(*args, **kwargs)
+
+
+def _reset_caches():
+    """Forget the process-wide caches so one test's data never answers another's."""
+    from app.services import exercise_search, food_autocomplete, food_cache, food_search
+    from app.services.exercise_catalog import invalidate_exercise_catalog
+    from app.services.food_cache import invalidate_food
+    from app.services.food_recommender import invalidate_food_matrix
+    from app.services.summary_charts import invalidate_member_charts
+
+    invalidate_exercise_catalog()
+    invalidate_food()
+    invalidate_food_matrix()
+    invalidate_member_charts()
+    exercise_search._index = None
+    food_autocomplete._index = None
+    food_search._index_available = None
+    food_cache._checked_at = 0.0
+
+
+@pytest.fixture
+def app():
+    """The real application on an empty in-memory SQLite database, inside an app context."""
+    from app import create_app, db
+
+    app = create_app()
+    app.config["TESTING"] = True
+    app.test_client_class = _Client
+    with app.app_context():
+        db.create_all()
+        _reset_caches()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        _reset_caches()
+
+
+@pytest.fixture
+def login(app):
+    """``login(user_id, role)`` returns a test client with that user signed in."""
+    def _login(user_id, role):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(user_id)
+            sess["user_id"] = user_id
+            sess["role"] = role
+        return client
+    return _login
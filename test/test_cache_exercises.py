@@ -0,0 +1,173 @@
+"""``cache_exercises`` against a local stand-in for the Free Exercise DB."""
+
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+import cache_exercises
+
+EQUIPMENT = ["barbell", "dumbbell", "body only", "cable", "machine"]
+
+
+def build_dataset(count):
+    return [
+        {
+            "id": f"Fake_Exercise_{idx}",
+            "name": f"Fake Exercise {idx}",
+            "equipment": EQUIPMENT[idx % len(EQUIPMENT)],
+            "category": "strength",
+            "primaryMuscles": ["chest"],
+            "instructions": ["Lift.", "Lower."],
+            "images": ["0.jpg", "1.jpg"] if idx % 4 else ["0.jpg"],
+        }
+        for idx in range(count)
+    ]
+
+
+def image_bytes(path, size=48 * 1024):
+    seed = hashlib.sha256(path.encode("utf-8")).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+class FakeExerciseServer:
+    """Serves ``/exercises.json`` and deterministic images with ETags.
+
+    Honours ``If-None-Match``, counts requests per path in ``hits`` and
+    answers 503 to the first request for any path in ``fail_once`` (or to
+    every request for paths in ``always_fail``).
+    """
+
+    def __init__(self, count=12):
+        self.dataset = build_dataset(count)
+        self.hits = {}
+        self.fail_once = set()
+        self.always_fail = set()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self.image_base_url = f"{self.base_url}/exercises"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):  # noqa: A002 - keep the test output quiet
+                pass
+
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_GET(self):  # noqa: N802 - http.server naming
+                path = unquote(self.path.split("?", 1)[0])
+                if path == "/exercises.json":
+                    self._send(200, json.dumps(server.dataset).encode("utf-8"), {"Content-Type": "application/json"})
+                    return
+                with server._lock:
+                    hits = server.hits[path] = server.hits.get(path, 0) + 1
+                if path in server.always_fail or (path in server.fail_once and hits == 1):
+                    self._send(503)
+                    return
+                if not path.startswith("/exercises/"):
+                    self._send(404)
+                    return
+                body = image_bytes(path)
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, headers={"ETag": etag})
+                    return
+                self._send(200, body, {"Content-Type": "image/jpeg", "ETag": etag})
+
+        return Handler
+
+    def image_url(self, path):
+        return f"{self.base_url}{path}"
+
+    def image_hits(self):
+        return sum(hits for path, hits in self.hits.items() if path.startswith("/exercises/"))
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def exercise_server(monkeypatch):
+    """A running ``FakeExerciseServer``; retries back off for milliseconds, not seconds."""
+    monkeypatch.setattr(cache_exercises, "BACKOFF_SECONDS", 0.001)
+    server = FakeExerciseServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_second_run_skips_cached_images(app, exercise_server, tmp_path):
+    from app.models import ExerciseCatalog
+
+    data = cache_exercises.fetch_dataset(f"{exercise_server.base_url}/exercises.json")
+    expected = sum(len(item["images"]) for item in data)
+
+    first = cache_exercises.ImageCache(str(tmp_path), workers=4)
+    cache_exercises.upsert_catalog(data, image_cache=first, image_base_url=exercise_server.image_base_url)
+    assert first.stats["downloaded"] == expected
+    assert all(row.local_image_main for row in ExerciseCatalog.query.all())
+
+    hits = exercise_server.image_hits()
+    second = cache_exercises.ImageCache(str(tmp_path), workers=4)
+    cache_exercises.upsert_catalog(data, image_cache=second, image_base_url=exercise_server.image_base_url)
+    assert second.stats["skipped"] == expected
+    assert second.stats["downloaded"] == 0
+    assert exercise_server.image_hits() == hits
+
+
+def test_interrupted_download_is_fetched_again(exercise_server, tmp_path):
+    path = "/exercises/barbell/Fake_Exercise_0/0.jpg"
+    url = exercise_server.image_url(path)
+    cache = cache_exercises.ImageCache(str(tmp_path), workers=1)
+    assert cache.fetch(url, "bench.jpg") == "exercise_images/bench.jpg"
+    cache.save_manifest()
+
+    # An interrupted run leaves a truncated file behind and a stray .part next to it.
+    target = tmp_path / "bench.jpg"
+    with open(target, "r+b") as f:
+        f.truncate(100)
+    (tmp_path / "bench.jpg.part").write_bytes(b"partial")
+
+    resumed = cache_exercises.ImageCache(str(tmp_path), workers=1)
+    assert resumed.fetch(url, "bench.jpg") == "exercise_images/bench.jpg"
+    assert resumed.stats["downloaded"] == 1
+    assert target.read_bytes() == image_bytes(path)
+    assert not os.path.exists(f"{target}.part")
+
+
+def test_server_errors_are_retried(exercise_server, tmp_path):
+    flaky = "/exercises/cable/Fake_Exercise_3/0.jpg"
+    broken = "/exercises/cable/Fake_Exercise_8/0.jpg"
+    exercise_server.fail_once.add(flaky)
+    exercise_server.always_fail.add(broken)
+    cache = cache_exercises.ImageCache(str(tmp_path), workers=2)
+
+    paths = cache.fetch_all({
+        "flaky.jpg": exercise_server.image_url(flaky),
+        "broken.jpg": exercise_server.image_url(broken),
+    })
+
+    assert paths == {"flaky.jpg": "exercise_images/flaky.jpg", "broken.jpg": None}
+    assert (tmp_path / "flaky.jpg").read_bytes() == image_bytes(flaky)
+    assert exercise_server.hits[flaky] == 2
+    assert exercise_server.hits[broken] == cache_exercises.MAX_ATTEMPTS
+    assert cache.stats["failed"] == 1
+    assert cache.stats["retries"] == 1 + (cache_exercises.MAX_ATTEMPTS - 1)
@@ -0,0 +1,37 @@
+import json
+
+from app.models import Food
+from cache_usda_json import import_usda_file
+
+
+def _usda_food(fdc_id):
+    return {
+        "fdcId": fdc_id,
+        "description": f"Test food {fdc_id}",
+        "foodNutrients": [{"nutrient": {"name": "Protein", "unitName": "g"}, "amount": 10}],
+        "foodPortions": [{"measureUnit": {"name": "cup"}, "gramWeight": 240}],
+    }
+
+
+def test_truncated_file_keeps_committed_batches(app, tmp_path):
+    text = json.dumps({"SRLegacyFoods": [_usda_food(fdc_id) for fdc_id in range(1, 8)]})
+    path = tmp_path / "truncated.json"
+    # Cut the file inside the sixth food.
+    path.write_text(text[: text.index('"fdcId": 6') + 5], encoding="utf-8")
+
+    foods, portions = import_usda_file(str(path), path.name, batch_size=2)
+
+    # Two full batches were committed; the fifth food was still pending when the file ended.
+    assert (foods, portions) == (4, 4)
+    assert sorted(int(food.source_id) for food in Food.query.all()) == [1, 2, 3, 4]
+
+
+def test_unknown_format_is_reported_separately(app, tmp_path, capsys):
+    path = tmp_path / "other.json"
+    path.write_text(json.dumps({"SomethingElse": {"fdcId": 1}}), encoding="utf-8")
+
+    assert import_usda_file(str(path), path.name) == (0, 0)
+    out = capsys.readouterr().out
+    assert "Unknown data format" in out
+    assert "truncated" not in out
+    assert Food.query.count() == 0
@@ -0,0 +1,39 @@
+import time
+
+from app import db
+from app.models import Food
+from app.services import food_autocomplete
+from app.services.food_autocomplete import autocomplete_foods
+
+
+def _wait_for_build():
+    deadline = time.monotonic() + 10
+    while food_autocomplete._rebuilding and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not food_autocomplete._rebuilding
+
+
+def test_cold_lookup_builds_in_the_background(app):
+    db.session.add_all([Food(name="Chicken breast"), Food(name="Chickpeas"), Food(name="Rice")])
+    db.session.commit()
+
+    # The first lookup does not wait for the build; it answers once the index lands.
+    assert autocomplete_foods("chick") == []
+    _wait_for_build()
+    assert [match.name for match in autocomplete_foods("chick")] == ["Chickpeas", "Chicken breast"]
+    assert [match.name for match in autocomplete_foods("chikcen")] == ["Chicken breast"]
+
+
+def test_catalog_change_swaps_in_a_rebuilt_index(app):
+    db.session.add(Food(name="Oats"))
+    db.session.commit()
+    food_autocomplete.build_food_autocomplete_index()
+
+    db.session.add(Food(name="Oat milk"))
+    db.session.commit()
+    food_autocomplete.refresh_food_autocomplete()
+
+    # The stale index keeps answering while its replacement is built.
+    assert [match.name for match in autocomplete_foods("oat")] == ["Oats"]
+    _wait_for_build()
+    assert [match.name for match in autocomplete_foods("oat")] == ["Oats", "Oat milk"]
@@ -0,0 +1,30 @@
+from sqlalchemy import insert
+
+from app import db
+from app.models import CatalogVersion, Food, FoodMeasure
+from app.services import food_cache
+from app.services.food_cache import FOOD_CATALOG, bump_food_version, measure_grams
+
+
+def test_measure_import_in_another_process_reaches_cached_profiles(app):
+    food = Food(name="Blueberries, raw", calories=57, serving_size=100, serving_unit="g")
+    db.session.add(food)
+    db.session.commit()
+    assert measure_grams(food.id, "cup") is None
+
+    # What an import script commits: the measures plus a bumped version row,
+    # written without touching this process's cache.
+    db.session.add(FoodMeasure(food_id=food.id, measure_name="cup", grams=148))
+    db.session.execute(insert(CatalogVersion).values(name=FOOD_CATALOG, version=1))
+    db.session.commit()
+    assert measure_grams(food.id, "cup") is None  # until the next recheck
+
+    food_cache._checked_at = 0.0
+    assert measure_grams(food.id, "cup") == 148
+
+
+def test_bump_food_version_increments_the_version_row(app):
+    bump_food_version()
+    bump_food_version()
+    db.session.commit()
+    assert db.session.get(CatalogVersion, FOOD_CATALOG).version == 2
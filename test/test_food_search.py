@@ -0,0 +1,33 @@
+from app import db
+from app.models import Food
+from app.services.food_search import find_foods, rebuild_food_search_index
+
+
+def _names(query):
+    return [food.name for food in find_foods(query)]
+
+
+def test_index_follows_inserts_renames_and_deletes(app):
+    rebuild_food_search_index()
+    oats = Food(name="Rolled oats", calories=380)
+    db.session.add_all([oats, Food(name="Oat milk", calories=45)])
+    db.session.commit()
+    assert _names("oat") == ["Oat milk", "Rolled oats"]
+
+    oats.name = "Steel cut oats"
+    db.session.commit()
+    assert _names("rolled") == []
+    assert _names("steel") == ["Steel cut oats"]
+
+    db.session.delete(oats)
+    db.session.commit()
+    assert _names("oats") == []
+    assert _names("oat") == ["Oat milk"]
+
+
+def test_bulk_inserted_foods_are_searchable(app):
+    rebuild_food_search_index()
+    db.session.bulk_insert_mappings(Food, [{"name": f"Imported bean {idx}", "source_id": str(idx)} for idx in range(3)])
+    db.session.commit()
+
+    assert len(find_foods("imported bean")) == 3
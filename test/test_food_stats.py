@@ -0,0 +1,85 @@
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models import DailyNutritionTotal, Food, User, UserFoodLog, UserFoodStats
+from app.services.food_stats import quick_log_foods, record_food_stats
+from app.services.nutrition_totals import record_food_logs
+
+DAY = date(2026, 3, 16)
+
+
+@pytest.fixture
+def member(app):
+    member = User(first_name="Stats", last_name="Member", email="stats@test.local", password_hash="x", role="member")
+    db.session.add(member)
+    db.session.commit()
+    return member
+
+
+@pytest.fixture
+def foods(app):
+    foods = [
+        Food(name="Oats", calories=380, protein_g=13, carbs_g=68, fats_g=7, serving_size=100, serving_unit="g"),
+        Food(name="Milk", calories=61, protein_g=3.2, carbs_g=4.8, fats_g=3.3, serving_size=100, serving_unit="g"),
+    ]
+    db.session.add_all(foods)
+    db.session.commit()
+    return foods
+
+
+def _log(member, food, quantity, unit="g"):
+    """Log a food the way the routes do: the log, its rollup and its stats together."""
+    log = UserFoodLog(user_id=member.id, food_id=food.id, quantity=quantity, unit="g", log_date=DAY)
+    db.session.add(log)
+    db.session.flush()
+    record_food_logs([log])
+    record_food_stats(member.id, [(food.id, quantity, unit)])
+    db.session.commit()
+    return log
+
+
+def _counts(user_id):
+    return {row.food_id: row.log_count for row in UserFoodStats.query.filter_by(user_id=user_id)}
+
+
+def test_stats_count_logs_and_remember_the_last_amount(member, foods):
+    oats, milk = foods
+    _log(member, oats, 40)
+    _log(member, oats, 60)
+    _log(member, milk, 1, unit="cup")
+
+    assert _counts(member.id) == {oats.id: 2, milk.id: 1}
+    quick = {item.name: (item.quantity, item.unit, item.log_count) for item in quick_log_foods(member.id)}
+    assert quick == {"Oats": (60, "g", 2), "Milk": (1, "cup", 1)}
+
+
+def test_deleting_logs_drops_the_stats_row_at_zero(member, foods, login):
+    oats, milk = foods
+    first = _log(member, oats, 40)
+    second = _log(member, oats, 60)
+    only_milk = _log(member, milk, 200)
+    client = login(member.id, "member")
+
+    assert client.post(f"/member/delete-food-log/{first.id}").status_code == 200
+    assert _counts(member.id) == {oats.id: 1, milk.id: 1}
+
+    assert client.post(f"/member/delete-food-log/{only_milk.id}").status_code == 200
+    assert _counts(member.id) == {oats.id: 1}
+    assert [item.name for item in quick_log_foods(member.id)] == ["Oats"]
+
+    assert client.post(f"/member/delete-food-log/{second.id}").status_code == 200
+    assert _counts(member.id) == {}
+    assert DailyNutritionTotal.query.filter_by(user_id=member.id, day=DAY).one().entry_count == 0
+
+
+def test_one_batch_mixes_new_and_counted_foods(member, foods):
+    oats, milk = foods
+    _log(member, oats, 40)
+
+    record_food_stats(member.id, [(oats.id, 50, "g"), (milk.id, 1, "cup"), (milk.id, 2, "cup")])
+    db.session.commit()
+
+    rows = {row.food_id: (row.log_count, row.last_quantity, row.last_unit) for row in UserFoodStats.query}
+    assert rows == {oats.id: (2, 50, "g"), milk.id: (2, 2, "cup")}
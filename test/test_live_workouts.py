@@ -0,0 +1,118 @@
+import pytest
+
+from app import db
+from app.models import ExerciseTemplate, PersonalRecord, User, WorkoutSession, WorkoutSet
+
+
+@pytest.fixture
+def member(app):
+    member = User(first_name="Live", last_name="Member", email="live@test.local", password_hash="x", role="member")
+    db.session.add(member)
+    db.session.flush()
+    db.session.add(ExerciseTemplate(owner_id=member.id, name="Push"))
+    db.session.commit()
+    return member
+
+
+@pytest.fixture
+def client(member, login):
+    return login(member.id, "member")
+
+
+def _begin(client):
+    template = ExerciseTemplate.query.one()
+    response = client.post(f"/templates/workouts/{template.id}/sessions", json={})
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()
+
+
+def _set(client_id, reps=8, weight=100, set_number=1):
+    return {"clientId": client_id, "name": "Bench Press", "setNumber": set_number, "reps": reps, "weight": weight}
+
+
+def _stored():
+    return [(item.client_id, item.reps, item.weight) for item in WorkoutSet.query.order_by(WorkoutSet.id)]
+
+
+def test_retried_saves_never_duplicate_sets(client):
+    session_id = _begin(client)["sessionId"]
+    url = f"/templates/workouts/sessions/{session_id}/sets"
+
+    for _ in range(2):
+        response = client.post(url, json={"sets": [_set("a"), _set("b", set_number=2)]})
+        assert response.get_json() == {"status": "ok", "saved": 2}
+    assert _stored() == [("a", 8, 100), ("b", 8, 100)]
+
+    # The same clientId again overwrites; a repeat inside one request keeps the last.
+    client.post(url, json={"sets": [_set("a", reps=5), _set("c", reps=1), _set("c", reps=3)]})
+    assert _stored() == [("a", 5, 100), ("b", 8, 100), ("c", 3, 100)]
+
+
+def test_reopening_resumes_the_session_with_its_sets(client):
+    first = _begin(client)
+    client.post(f"/templates/workouts/sessions/{first['sessionId']}/sets", json={"sets": [_set("a")]})
+
+    resumed = _begin(client)
+    assert resumed["sessionId"] == first["sessionId"]
+    assert [item["clientId"] for item in resumed["sets"]] == ["a"]
+
+
+def test_patch_and_delete_by_client_id(client):
+    session_id = _begin(client)["sessionId"]
+    base = f"/templates/workouts/sessions/{session_id}/sets"
+    client.post(base, json={"sets": [_set("a"), _set("b", set_number=2)]})
+
+    assert client.patch(f"{base}/a", json={"reps": 10}).status_code == 200
+    assert client.patch(f"{base}/missing", json={"reps": 10}).status_code == 404
+    assert client.patch(f"{base}/a", json={}).status_code == 400
+    assert client.delete(f"{base}/b").status_code == 200
+    assert _stored() == [("a", 10, 100)]
+
+
+def test_complete_finishes_from_stored_sets_once(client, member):
+    session_id = _begin(client)["sessionId"]
+    client.post(f"/templates/workouts/sessions/{session_id}/sets", json={"sets": [_set("a", weight=100)]})
+    url = f"/templates/workouts/sessions/{session_id}/complete"
+
+    # Final sets sent with the finish are saved first.
+    response = client.post(url, json={"sets": [_set("b", weight=120, set_number=2)]})
+    assert response.status_code == 200, response.get_json()
+    workout_session = db.session.get(WorkoutSession, session_id)
+    assert workout_session.completed_at is not None
+    assert "Bench Press: 2 set(s)" in workout_session.summary
+    assert PersonalRecord.query.filter_by(user_id=member.id).one().best_weight == 120
+
+    # A retried finish succeeds without finishing (or recording) twice.
+    completed_at = workout_session.completed_at
+    retry = client.post(url, json={"sets": [_set("c", weight=200, set_number=3)]})
+    assert retry.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(WorkoutSession, session_id).completed_at == completed_at
+    assert [client_id for client_id, _, _ in _stored()] == ["a", "b"]
+    assert PersonalRecord.query.filter_by(user_id=member.id).one().best_weight == 120
+
+    # Finished sessions take no more sets.
+    late = client.post(f"/templates/workouts/sessions/{session_id}/sets", json={"sets": [_set("d")]})
+    assert late.status_code == 409
+
+
+def test_completing_a_session_without_sets_is_refused(client):
+    session_id = _begin(client)["sessionId"]
+
+    response = client.post(f"/templates/workouts/sessions/{session_id}/complete", json={})
+    assert response.status_code == 400
+    db.session.expire_all()
+    assert db.session.get(WorkoutSession, session_id).completed_at is None
+
+
+def test_other_members_cannot_write_to_the_session(client, login):
+    session_id = _begin(client)["sessionId"]
+    other = User(first_name="Other", last_name="Member", email="other@test.local", password_hash="x", role="member")
+    db.session.add(other)
+    db.session.commit()
+
+    response = login(other.id, "member").post(
+        f"/templates/workouts/sessions/{session_id}/sets", json={"sets": [_set("a")]}
+    )
+    assert response.status_code == 403
+    assert _stored() == []
@@ -0,0 +1,149 @@
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models import (
+    DailyNutritionTotal,
+    Food,
+    TrainerMeal,
+    TrainerMealIngredient,
+    User,
+    UserFoodLog,
+    UserFoodStats,
+)
+from app.services.meal_logging import MealLogEntry, log_meals
+from app.services.nutrition_totals import rebuild_daily_totals, record_food_logs
+
+MONDAY = date(2026, 3, 16)
+TUESDAY = date(2026, 3, 17)
+
+
+@pytest.fixture
+def member(app):
+    member = User(first_name="Meal", last_name="Member", email="meals@test.local", password_hash="x", role="member")
+    db.session.add(member)
+    db.session.commit()
+    return member
+
+
+@pytest.fixture
+def foods(app):
+    foods = [
+        Food(name="Chicken", calories=165, protein_g=31, carbs_g=0, fats_g=3.6, serving_size=100, serving_unit="g"),
+        Food(name="Rice", calories=130, protein_g=2.7, carbs_g=28, fats_g=0.3, serving_size=100, serving_unit="g"),
+    ]
+    db.session.add_all(foods)
+    db.session.commit()
+    return foods
+
+
+def _meal(member, foods, grams):
+    meal = TrainerMeal(trainer_id=member.id, member_id=member.id, name="Bowl")
+    for position, (food, amount) in enumerate(zip(foods, grams)):
+        meal.ingredients.append(TrainerMealIngredient(food_id=food.id, quantity_grams=amount, position=position))
+    db.session.add(meal)
+    db.session.commit()
+    return meal
+
+
+def _rollups(user_id):
+    return {
+        row.day: (round(row.calories, 6), round(row.protein, 6), round(row.carbs, 6), round(row.fats, 6), row.entry_count)
+        for row in DailyNutritionTotal.query.filter_by(user_id=user_id)
+    }
+
+
+def test_batch_log_across_days_updates_rollups_and_stats(member, foods):
+    meal = _meal(member, foods, [150, 200])
+    written = log_meals(member.id, [
+        MealLogEntry(meal, MONDAY, 1.0),
+        MealLogEntry(meal, MONDAY, 0.5),
+        MealLogEntry(meal, TUESDAY, 2.0),
+    ])
+    db.session.commit()
+
+    assert written == 6
+    rollups = _rollups(member.id)
+    assert {day: values[-1] for day, values in rollups.items()} == {MONDAY: 4, TUESDAY: 2}
+    # Chicken: 31g protein per 100g; Monday logs 150g + 75g, Tuesday 300g.
+    assert rollups[MONDAY][1] == pytest.approx(31 * 2.25 + 2.7 * 3.0)
+    assert rollups[TUESDAY][1] == pytest.approx(31 * 3.0 + 2.7 * 4.0)
+
+    # The incremental rollups match a rebuild from the logs themselves.
+    rebuild_daily_totals(member.id)
+    assert _rollups(member.id) == rollups
+
+    stats = {row.food_id: row.log_count for row in UserFoodStats.query.filter_by(user_id=member.id)}
+    assert stats == {foods[0].id: 3, foods[1].id: 3}
+
+
+def test_meal_without_gram_amounts_logs_nothing(member, foods):
+    meal = _meal(member, foods, [0])
+
+    assert log_meals(member.id, [MealLogEntry(meal, MONDAY, 1.0)]) == 0
+    assert DailyNutritionTotal.query.count() == 0
+
+
+def _food_log(member, food, day, grams):
+    log = UserFoodLog(user_id=member.id, food_id=food.id, quantity=grams, unit="g", log_date=day)
+    db.session.add(log)
+    db.session.flush()
+    record_food_logs([log])
+    db.session.commit()
+    return log
+
+
+def test_copy_day_duplicates_logs_and_rollups(member, foods, login):
+    chicken, rice = foods
+    _food_log(member, chicken, MONDAY, 150)
+    _food_log(member, rice, MONDAY, 200)
+    client = login(member.id, "member")
+
+    response = client.post("/member/food-logs/copy", json={"from": MONDAY.isoformat(), "to": TUESDAY.isoformat()})
+
+    assert response.status_code == 200, response.get_json()
+    assert list(response.get_json()["days"]) == [TUESDAY.isoformat()]
+    copied = UserFoodLog.query.filter_by(user_id=member.id, log_date=TUESDAY).order_by(UserFoodLog.id).all()
+    assert [(log.food_id, log.quantity) for log in copied] == [(chicken.id, 150), (rice.id, 200)]
+    rollups = _rollups(member.id)
+    assert rollups[TUESDAY] == rollups[MONDAY]
+    assert {row.food_id: row.log_count for row in UserFoodStats.query.filter_by(user_id=member.id)} == {
+        chicken.id: 1, rice.id: 1,
+    }
+
+
+def test_copy_selected_logs_only(member, foods, login):
+    chicken, rice = foods
+    _food_log(member, chicken, MONDAY, 150)
+    keep = _food_log(member, rice, MONDAY, 200)
+    client = login(member.id, "member")
+
+    response = client.post("/member/food-logs/copy", json={
+        "from": MONDAY.isoformat(), "to": TUESDAY.isoformat(), "log_ids": [keep.id],
+    })
+
+    assert response.status_code == 200
+    assert [log.food_id for log in UserFoodLog.query.filter_by(log_date=TUESDAY)] == [rice.id]
+    assert _rollups(member.id)[TUESDAY][-1] == 1
+
+
+def test_copy_onto_overlapping_days_is_rejected(member, foods, login):
+    _food_log(member, foods[0], MONDAY, 150)
+    client = login(member.id, "member")
+
+    response = client.post("/member/food-logs/copy", json={
+        "from": MONDAY.isoformat(), "through": TUESDAY.isoformat(), "to": TUESDAY.isoformat(),
+    })
+
+    assert response.status_code == 400
+    assert "overlap" in response.get_json()["message"]
+    assert UserFoodLog.query.count() == 1
+
+
+def test_copy_of_an_empty_day_is_a_404(member, login):
+    response = login(member.id, "member").post("/member/food-logs/copy", json={
+        "from": MONDAY.isoformat(), "to": TUESDAY.isoformat(),
+    })
+    assert response.status_code == 404
+    assert DailyNutritionTotal.query.count() == 0
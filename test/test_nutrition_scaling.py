@@ -0,0 +1,65 @@
+import pytest
+
+from app import db
+from app.models import Food
+from app.services.nutrition import (
+    NUTRIENT_KEYS,
+    scale_food_ids_batch,
+    scale_food_nutrients,
+    scale_nutrients_batch,
+)
+
+QUANTITIES = [0, None, 1e-3, 37.5, 100, 250.25]
+
+
+@pytest.fixture
+def foods(app):
+    foods = [
+        Food(name="Oats", calories=380, protein_g=13, carbs_g=68, fats_g=7, serving_size=100),
+        # Labelled calories far from the macros: the macros win.
+        Food(name="Mislabelled", calories=2000, protein_g=10, carbs_g=20, fats_g=5, serving_size=30),
+        # No macros at all: calories fall back to the labelled value.
+        Food(name="Black coffee", calories=2, protein_g=0, carbs_g=0, fats_g=0, serving_size=240),
+        Food(name="Diet soda", calories=None, protein_g=None, carbs_g=None, fats_g=None, serving_size=355),
+        # No serving size: per-unit grams, then 100 g.
+        Food(name="Egg", calories=72, protein_g=6.3, carbs_g=0.4, fats_g=4.8, grams_per_unit=50),
+        Food(name="Bulk flour", calories=364, protein_g=10.3, carbs_g=76.3, fats_g=1),
+    ]
+    db.session.add_all(foods)
+    db.session.commit()
+    return foods
+
+
+def _rows(foods):
+    return [(food, grams) for food in foods for grams in QUANTITIES]
+
+
+def _assert_rows_match(scaled, expected_rows):
+    for key in NUTRIENT_KEYS:
+        assert len(scaled[key]) == len(expected_rows)
+    for index, expected in enumerate(expected_rows):
+        # Exact equality: the batch path must be interchangeable with the scalar one.
+        assert {key: float(scaled[key][index]) for key in NUTRIENT_KEYS} == expected, index
+
+
+def test_batch_matches_scalar_per_row(foods):
+    rows = _rows(foods + [None])
+    scaled = scale_nutrients_batch([food for food, _ in rows], [grams for _, grams in rows])
+    _assert_rows_match(scaled, [scale_food_nutrients(food, grams) for food, grams in rows])
+
+
+def test_batch_by_id_matches_scalar_per_row(foods):
+    missing_ids = [None, 0, 99999]
+    rows = [(food.id, grams) for food in foods for grams in QUANTITIES]
+    rows += [(food_id, 50) for food_id in missing_ids]
+    scaled = scale_food_ids_batch([food_id for food_id, _ in rows], [grams for _, grams in rows])
+
+    by_id = {food.id: food for food in foods}
+    _assert_rows_match(scaled, [scale_food_nutrients(by_id.get(food_id), grams) for food_id, grams in rows])
+
+
+def test_zero_macro_foods_use_labelled_calories(foods):
+    coffee = foods[2]
+    scaled = scale_nutrients_batch([coffee], [480])
+    assert float(scaled["calories"][0]) == 4.0
+    assert float(scaled["protein"][0]) == 0.0
@@ -0,0 +1,77 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from app import db
+from app.models import DailyNutritionTotal, Food, User, UserFoodLog
+from app.services import nutrition_totals
+from app.services.nutrition_totals import daily_totals_range, record_food_logs
+from app.services.query_stats import capture_queries
+
+
+def _member_with_food():
+    member = User(first_name="Tot", last_name="Member", email="totals@test.local", password_hash="x", role="member")
+    food = Food(name="Oats", calories=380, protein_g=13, carbs_g=68, fats_g=7, serving_size=100, serving_unit="g")
+    db.session.add_all([member, food])
+    db.session.flush()
+    return member, food
+
+
+def _log(member, food, day, grams=100):
+    log = UserFoodLog(user_id=member.id, food_id=food.id, quantity=grams, unit="g", log_date=day)
+    db.session.add(log)
+    db.session.flush()
+    return log
+
+
+def test_range_mixes_rollup_rows_and_uncovered_days(app):
+    member, food = _member_with_food()
+    record_food_logs([_log(member, food, date(2026, 3, 1)), _log(member, food, date(2026, 3, 3))])
+    # Logged without a rollup row, as before the rollup was backfilled.
+    _log(member, food, date(2026, 3, 2), grams=200)
+    db.session.commit()
+
+    totals = daily_totals_range(member.id, date(2026, 3, 1), date(2026, 3, 5))
+
+    assert sorted(totals) == [date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 3)]
+    assert totals[date(2026, 3, 2)]["calories"] == 2 * totals[date(2026, 3, 1)]["calories"]
+    assert totals[date(2026, 3, 2)]["entry_count"] == 1
+
+
+def test_fallback_reads_only_uncovered_days(app):
+    member, food = _member_with_food()
+    record_food_logs([_log(member, food, date(2026, 3, day)) for day in range(1, 31)])
+    db.session.commit()
+    db.session.expire_all()
+
+    with capture_queries() as stats:
+        daily_totals_range(member.id, date(2026, 3, 1), date(2026, 3, 31))
+
+    fallback = [sql for sql in stats.statements if "FROM user_food_log" in sql]
+    assert len(fallback) == 1
+    assert "log_date IN" in fallback[0]
+    assert DailyNutritionTotal.query.count() == 30
+
+
+def test_first_write_racing_another_writer_increments_its_row(app, monkeypatch):
+    member, food = _member_with_food()
+    day = date(2026, 3, 1)
+    log = _log(member, food, day)
+    read_rows = nutrition_totals._rollup_rows
+
+    def _raced(keys):
+        # Nothing there when we look; another writer commits the day right after.
+        monkeypatch.setattr(nutrition_totals, "_rollup_rows", read_rows)
+        db.session.execute(insert(DailyNutritionTotal).values(
+            user_id=member.id, day=day, calories=100, protein=1, carbs=2, fats=3, entry_count=1,
+        ))
+        return {}
+
+    monkeypatch.setattr(nutrition_totals, "_rollup_rows", _raced)
+    record_food_logs([log])
+    db.session.commit()
+
+    row = DailyNutritionTotal.query.filter_by(user_id=member.id, day=day).one()
+    assert row.entry_count == 2
+    assert row.protein == pytest.approx(1 + 13)
@@ -0,0 +1,136 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import (
+    DailyNutritionTotal,
+    Food,
+    PersonalRecord,
+    User,
+    UserFoodLog,
+    UserFoodStats,
+    WorkoutSession,
+    WorkoutSet,
+)
+from app.services.offline_sync import parse_sync_request
+
+DAY = date(2026, 3, 16)
+STARTED = datetime(2026, 3, 16, 16)
+
+
+@pytest.fixture
+def member(app):
+    member = User(first_name="Sync", last_name="Member", email="sync@test.local", password_hash="x", role="member")
+    db.session.add(member)
+    db.session.commit()
+    return member
+
+
+@pytest.fixture
+def food(app):
+    food = Food(name="Rice", calories=130, protein_g=3, carbs_g=28, fats_g=0.3, serving_size=100, serving_unit="g")
+    db.session.add(food)
+    db.session.commit()
+    return food
+
+
+def _workout(client_id, sets, started=STARTED):
+    return {
+        "client_id": client_id,
+        "started_at": started.isoformat(),
+        "completed_at": (started + timedelta(hours=1)).isoformat(),
+        "sets": sets,
+    }
+
+
+def _set(client_id, reps=5, weight=100, name="Bench Press"):
+    return {"client_id": client_id, "name": name, "reps": reps, "weight": weight}
+
+
+def _sync(client, **payload):
+    return client.post("/member/sync", json=payload)
+
+
+def test_upload_stores_workouts_food_and_rollups(member, food, login):
+    client = login(member.id, "member")
+    response = _sync(
+        client,
+        sessions=[_workout("w1", [_set("s1"), _set("s2", reps=3, weight=110)])],
+        food_logs=[{"client_id": "f1", "food_id": food.id, "quantity": 200, "unit": "g", "date": DAY.isoformat()}],
+    )
+
+    body = response.get_json()
+    assert response.status_code == 200, body
+    assert set(body["stored"]["sessions"]) == {"w1"}
+    assert set(body["stored"]["food_logs"]) == {"f1"}
+    assert WorkoutSet.query.count() == 2
+    assert PersonalRecord.query.filter_by(user_id=member.id).one().best_weight == 110
+    totals = DailyNutritionTotal.query.filter_by(user_id=member.id, day=DAY).one()
+    assert totals.entry_count == 1
+    assert UserFoodStats.query.filter_by(user_id=member.id, food_id=food.id).one().log_count == 1
+
+
+def test_replayed_upload_stores_nothing_twice(member, food, login):
+    client = login(member.id, "member")
+    payload = {
+        "sessions": [_workout("w1", [_set("s1")])],
+        "food_logs": [{"client_id": "f1", "food_id": food.id, "quantity": 1, "unit": "g", "date": DAY.isoformat()}],
+    }
+    assert _sync(client, **payload).status_code == 200
+
+    replay = _sync(client, **payload).get_json()
+    assert replay["stored"] == {"sessions": {}, "food_logs": {}}
+    assert sorted(replay["duplicates"]) == ["f1", "w1"]
+    assert WorkoutSession.query.count() == 1
+    assert UserFoodLog.query.count() == 1
+    assert DailyNutritionTotal.query.filter_by(user_id=member.id, day=DAY).one().entry_count == 1
+
+
+def test_repeated_set_client_id_keeps_the_last_entry(member, login):
+    client = login(member.id, "member")
+    payload = {"sessions": [_workout("w1", [_set("a", reps=5), _set("a", reps=8)])]}
+
+    for _ in range(2):
+        response = _sync(client, **payload)
+        assert response.status_code == 200, response.get_json()
+
+    workout_set = WorkoutSet.query.one()
+    assert (workout_set.client_id, workout_set.reps, workout_set.set_number) == ("a", 8, 1)
+
+
+def test_parse_numbers_sets_after_dropping_repeats():
+    request = parse_sync_request({"sessions": [_workout("w1", [_set("a"), _set("b"), _set("a", reps=9)])]})
+    sets = request.sessions[0].sets
+    assert [(item.client_id, item.set_number, item.reps) for item in sets] == [("b", 1, 5), ("a", 2, 9)]
+    assert [item.id for item in sets] == [1, 2]
+
+
+def test_cursor_returns_only_later_changes(member, food, login):
+    client = login(member.id, "member")
+    first = _sync(client, sessions=[_workout("w1", [_set("s1")])]).get_json()
+    assert [item["client_id"] for item in first["changes"]["sessions"]] == []  # older than the history window
+
+    cursor = first["cursor"]
+    quiet = _sync(client, cursor=cursor).get_json()
+    assert [item["client_id"] for item in quiet["changes"]["sessions"]] == ["w1"]  # within the overlap
+
+    # Stored before the cursor, outside the overlap: not sent again.
+    WorkoutSession.query.update({"updated_at": datetime.utcnow() - timedelta(hours=1)})
+    db.session.commit()
+    later = _sync(
+        client,
+        cursor=cursor,
+        food_logs=[{"client_id": "f1", "food_id": food.id, "quantity": 50, "unit": "g", "date": DAY.isoformat()}],
+    ).get_json()
+    assert later["changes"]["sessions"] == []
+    assert [day["date"] for day in later["changes"]["food_days"]] == [DAY.isoformat()]
+    assert [log["client_id"] for log in later["changes"]["food_days"][0]["logs"]] == ["f1"]
+    assert datetime.fromisoformat(later["cursor"]) >= datetime.fromisoformat(cursor)
+
+
+def test_malformed_upload_is_rejected(member, login):
+    client = login(member.id, "member")
+    response = _sync(client, sessions=[_workout("", [_set("s1")])])
+    assert response.status_code == 400
+    assert WorkoutSession.query.count() == 0
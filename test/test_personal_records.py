@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from app.models import PersonalRecord
+from app.services.personal_records import _merge, session_bests
+
+
+def _bests(*sets):
+    return session_bests(("Bench Press", reps, weight) for reps, weight in sets)["bench press"]
+
+
+def test_repeating_a_set_is_not_a_new_record():
+    record = PersonalRecord(user_id=1, exercise_key="bench press")
+    # 100 x 4 estimates 113.33, stored as 113.3.
+    assert _merge(record, _bests((4, 100)), datetime(2026, 1, 1))
+    assert record.best_e1rm == 113.3
+
+    assert not _merge(record, _bests((4, 100)), datetime(2026, 1, 8))
+    assert record.best_e1rm_at == datetime(2026, 1, 1)
+
+
+def test_heavier_estimate_beats_the_stored_record():
+    record = PersonalRecord(user_id=1, exercise_key="bench press")
+    _merge(record, _bests((4, 100)), datetime(2026, 1, 1))
+
+    assert _merge(record, _bests((5, 100)), datetime(2026, 1, 8))
+    assert record.best_e1rm == 116.7
+    assert record.best_e1rm_at == datetime(2026, 1, 8)
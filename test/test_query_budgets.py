@@ -0,0 +1,148 @@
+"""Per-route SQL statement budgets for the heaviest member and trainer views.
+
+A route fails when it exceeds its budget, or when its statement count grows
+with the amount of history (the signature of a per-row loop).
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from flask import url_for
+
+from app import db
+from app.models import (
+    ExerciseTemplate,
+    Food,
+    MemberMeal,
+    MemberMealIngredient,
+    Progress,
+    TrainerMeal,
+    TrainerMealIngredient,
+    User,
+    UserFoodLog,
+    WorkoutSession,
+    WorkoutSet,
+)
+from app.routes.member import _today_eastern
+from app.services.muscle_volume import rebuild_muscle_volume
+from app.services.nutrition_totals import rebuild_daily_totals
+from app.services.query_stats import capture_queries
+
+# endpoint, url kwargs, signed-in role, maximum statements
+BUDGETS = [
+    ("member.dashboard", {}, "member", 15),
+    ("member.dashboard", {"view": "calendar"}, "member", 16),
+    ("member.member_summary", {}, "member", 12),
+    ("trainer.dashboard_trainer", {}, "trainer", 6),
+    ("trainer.client_detail", {"member_id": "{member_id}"}, "trainer", 17),
+    ("trainer.client_detail", {"member_id": "{member_id}", "view": "calendar"}, "trainer", 17),
+    ("trainer.client_summary_view", {"member_id": "{member_id}"}, "trainer", 12),
+]
+
+MEAL_PLAN_SIZE = 30
+SHORT_HISTORY_DAYS = 30
+LONG_HISTORY_DAYS = 120
+
+
+class _Gym:
+    """A trainer with one member, a full meal plan and ``add_history`` to grow the logs."""
+
+    def __init__(self):
+        self.trainer = User(
+            first_name="Budget", last_name="Trainer", email="trainer@budget.local",
+            password_hash="x", role="trainer", email_verified=True,
+        )
+        db.session.add(self.trainer)
+        db.session.flush()
+        self.member = User(
+            first_name="Budget", last_name="Member", email="member@budget.local", password_hash="x",
+            role="member", trainer_id=self.trainer.id, email_verified=True, calorie_goal=2200,
+        )
+        self.foods = [
+            Food(name=f"Budget food {idx}", calories=120 + idx, protein_g=10, carbs_g=15, fats_g=4,
+                 serving_size=100, serving_unit="g")
+            for idx in range(20)
+        ]
+        db.session.add(self.member)
+        db.session.add_all(self.foods)
+        db.session.flush()
+        self.template = ExerciseTemplate(owner_id=self.trainer.id, name="Budget Push")
+        db.session.add(self.template)
+        db.session.flush()
+
+        # A full meal plan: the dashboards render every meal with its ingredients.
+        for idx in range(MEAL_PLAN_SIZE):
+            meal_model, ingredient_model = (
+                (TrainerMeal, TrainerMealIngredient) if idx % 3 else (MemberMeal, MemberMealIngredient)
+            )
+            owner = {"trainer_id": self.trainer.id, "member_id": self.member.id} if idx % 3 else {"user_id": self.member.id}
+            meal = meal_model(name=f"Budget meal {idx}", meal_slot=("meal1", "meal2", "meal3", "snacks")[idx % 4], **owner)
+            for position in range(4):
+                meal.ingredients.append(ingredient_model(
+                    food_id=self.foods[(idx + position) % len(self.foods)].id, quantity_value=150,
+                    quantity_unit="g", quantity_grams=150, position=position,
+                ))
+            db.session.add(meal)
+        self.days = 0
+        db.session.commit()
+
+    def add_history(self, days):
+        """Log food, weigh-ins and workouts for the days before those already seeded."""
+        today = _today_eastern()
+        for offset in range(self.days, days):
+            day = today - timedelta(days=offset)
+            noon = datetime.combine(day, datetime.min.time()) + timedelta(hours=16)
+            for idx in range(4):
+                db.session.add(UserFoodLog(
+                    user_id=self.member.id, food_id=self.foods[(offset + idx) % len(self.foods)].id,
+                    quantity=100 + idx * 20, unit="g", log_date=day, created_at=noon,
+                ))
+            if offset % 2 == 0:
+                db.session.add(Progress(user_id=self.member.id, date=noon, weight=185 - offset * 0.1))
+            if offset % 3 == 0:
+                session = WorkoutSession(
+                    user_id=self.member.id, template_id=self.template.id,
+                    started_at=noon, completed_at=noon + timedelta(hours=1),
+                )
+                db.session.add(session)
+                db.session.flush()
+                for set_number in range(1, 4):
+                    db.session.add(WorkoutSet(
+                        session_id=session.id, exercise_name="Bench Press",
+                        set_number=set_number, reps=8, weight=135 + set_number * 10,
+                    ))
+        self.days = days
+        db.session.commit()
+        rebuild_daily_totals()
+        rebuild_muscle_volume()
+
+
+def _statement_count(client, url):
+    client.get(url)  # warm per-process caches; budgets describe the steady state
+    with capture_queries() as stats:
+        response = client.get(url)
+    assert response.status_code == 200, f"{url} returned {response.status_code}"
+    return stats
+
+
+@pytest.mark.parametrize(
+    "endpoint, kwargs, role, budget",
+    BUDGETS,
+    ids=[f"{endpoint}{'-' + kwargs['view'] if 'view' in kwargs else ''}" for endpoint, kwargs, _, _ in BUDGETS],
+)
+def test_route_within_query_budget(app, login, endpoint, kwargs, role, budget):
+    gym = _Gym()
+    user = gym.member if role == "member" else gym.trainer
+    client = login(user.id, role)
+    with app.test_request_context():
+        url = url_for(endpoint, **{key: value.format(member_id=gym.member.id) for key, value in kwargs.items()})
+
+    gym.add_history(SHORT_HISTORY_DAYS)
+    short = _statement_count(client, url)
+    gym.add_history(LONG_HISTORY_DAYS)
+    long = _statement_count(client, url)
+
+    assert long.count <= budget, f"{url} exceeded its budget of {budget}: {long.describe()}"
+    assert long.count == short.count, (
+        f"{url} grows with history ({short.count} -> {long.count}): {long.describe()}"
+    )
@@ -0,0 +1,97 @@
+"""The hot member/trainer/template query shapes must be served by their indexes.
+
+Fails when ``EXPLAIN QUERY PLAN`` stops naming the expected index, for
+example after a model change drops one.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from app import db
+from app.models import Food, FoodMeasure, Message, Progress, UserFoodLog, WorkoutSession, WorkoutSet
+
+TODAY = date(2026, 3, 15)
+RANGE_START = datetime.combine(TODAY - timedelta(days=30), datetime.min.time())
+RANGE_END = datetime.combine(TODAY + timedelta(days=1), datetime.min.time())
+
+
+def _session_time():
+    return func.coalesce(WorkoutSession.completed_at, WorkoutSession.started_at)
+
+
+# label, query builder, index the plan must use
+CASES = [
+    (
+        "daily food log (member dashboard)",
+        lambda: UserFoodLog.query.filter_by(user_id=1, log_date=TODAY).order_by(UserFoodLog.created_at),
+        "ix_user_food_log_user_id_log_date",
+    ),
+    (
+        "uncovered days (rollup fallback)",
+        lambda: UserFoodLog.query.filter(
+            UserFoodLog.user_id.in_([1, 2]),
+            UserFoodLog.log_date.in_([TODAY - timedelta(days=2), TODAY]),
+        ),
+        "ix_user_food_log_user_id_log_date",
+    ),
+    (
+        "weight entries in calendar window",
+        lambda: Progress.query.filter(Progress.user_id == 1)
+        .filter(Progress.date >= RANGE_START, Progress.date < RANGE_END),
+        "ix_progress_user_id_date",
+    ),
+    (
+        "weight trend (summary chart)",
+        lambda: db.session.query(Progress.date, Progress.weight).filter(Progress.user_id == 1).order_by(Progress.date),
+        "ix_progress_user_id_date",
+    ),
+    (
+        "calendar workouts",
+        lambda: WorkoutSession.query.filter(WorkoutSession.user_id == 1)
+        .filter(_session_time() >= RANGE_START, _session_time() < RANGE_END)
+        .order_by(WorkoutSession.started_at.desc()),
+        "ix_workout_session_user_id_started_at",
+    ),
+    (
+        "recent workout history",
+        lambda: WorkoutSession.query.filter(WorkoutSession.user_id == 1)
+        .order_by(WorkoutSession.started_at.desc()).limit(10),
+        "ix_workout_session_user_id_started_at",
+    ),
+    (
+        "sets for a session",
+        lambda: WorkoutSet.query.filter(WorkoutSet.session_id.in_([1, 2, 3])),
+        "ix_workout_set_session_id",
+    ),
+    (
+        "household measure lookup",
+        lambda: FoodMeasure.query.filter_by(food_id=1, measure_name="cup"),
+        "ix_food_measure_food_id_measure_name",
+    ),
+    (
+        "unread messages badge",
+        lambda: Message.query.filter_by(client_id=1, read_at=None),
+        "ix_message_client_id_read_at",
+    ),
+    (
+        "USDA import source_id lookup",
+        lambda: db.session.query(Food.id, Food.source_id).filter(Food.source_id.in_(["1001", "1002"])),
+        "ix_food_source_id",
+    ),
+]
+
+
+def _plan(query) -> str:
+    statement = getattr(query, "statement", query)
+    compiled = statement.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled.string}", params).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("build, index_name", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_query_uses_index(app, build, index_name):
+    plan = _plan(build())
+    assert index_name in plan, plan
@@ -0,0 +1,40 @@
+from datetime import date, datetime, timedelta
+
+from app import db
+from app.models import Progress, User, WorkoutSession
+from app.services.summary_charts import member_summary_charts
+
+TODAY = date(2026, 3, 18)
+
+
+def _member():
+    member = User(first_name="Chart", last_name="Member", email="charts@test.local", password_hash="x", role="member")
+    db.session.add(member)
+    db.session.commit()
+    return member
+
+
+def test_edited_weight_entry_refreshes_cached_chart(app):
+    member = _member()
+    entry = Progress(user_id=member.id, date=datetime(2026, 3, 16, 12), weight=180)
+    db.session.add(entry)
+    db.session.commit()
+    assert member_summary_charts(member.id, TODAY, "json")["weight"]["weights"] == [180.0]
+
+    entry.weight = 178.5
+    db.session.commit()
+    assert member_summary_charts(member.id, TODAY, "json")["weight"]["weights"] == [178.5]
+
+
+def test_moved_workout_refreshes_cached_chart(app):
+    member = _member()
+    started = datetime(2026, 3, 16, 16)
+    session = WorkoutSession(user_id=member.id, started_at=started, completed_at=started + timedelta(hours=1))
+    db.session.add(session)
+    db.session.commit()
+    assert member_summary_charts(member.id, TODAY, "json")["weekly_workouts"]["counts"][-1] == 1
+
+    session.started_at = started - timedelta(weeks=1)
+    db.session.commit()
+    counts = member_summary_charts(member.id, TODAY, "json")["weekly_workouts"]["counts"]
+    assert counts[-2:] == [1, 0]